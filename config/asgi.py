@@ -3,6 +3,11 @@ ASGI config for intranet-tickets-api project.
 
 It exposes the ASGI callable as a module-level variable named ``application``.
 
+Es el punto de entrada en producción (uvicorn config.asgi:application):
+los eventos en vivo de /api/events/ son vistas async que solo funcionan
+bajo ASGI. DisconnectMiddleware cierra sus suscripciones cuando el cliente
+se desconecta.
+
 For more information on this file, see
 https://docs.djangoproject.com/en/4.2/howto/deployment/asgi/
 """
@@ -13,4 +18,8 @@ from django.core.asgi import get_asgi_application
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'config.settings')
 
-application = get_asgi_application()
+django_application = get_asgi_application()
+
+from tickets.events import DisconnectMiddleware  # noqa: E402 (requiere Django configurado)
+
+application = DisconnectMiddleware(django_application)
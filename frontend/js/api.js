@@ -153,6 +153,13 @@ async function getAssignedTickets() {
     return await apiRequest('/tickets/assigned-to-me/');
 }
 
+/**
+ * Obtiene los contadores de tickets para el dashboard
+ */
+async function getTicketStats() {
+    return await apiRequest('/tickets/stats/');
+}
+
 /**
  * Obtiene un ticket específico por ID
  */
@@ -5,6 +5,7 @@ Personaliza cómo se muestran los modelos en /admin/
 from django.contrib import admin
 from django.utils.html import format_html
 from .models import Ticket, Comment, UserProfile
+from . import sla
 
 
 @admin.register(UserProfile)
@@ -68,6 +69,23 @@ class CommentInline(admin.TabularInline):
         return request.user.is_staff
 
 
+class SLABreachedFilter(admin.SimpleListFilter):
+    """Filtro por incumplimiento del SLA (ver tickets/sla.py)."""
+    
+    title = 'SLA'
+    parameter_name = 'sla_breached'
+    
+    def lookups(self, request, model_admin):
+        return [('1', 'Vencido'), ('0', 'En plazo')]
+    
+    def queryset(self, request, queryset):
+        if self.value() == '1':
+            return queryset.filter(sla.breached_q())
+        if self.value() == '0':
+            return queryset.exclude(sla.breached_q())
+        return queryset
+
+
 @admin.register(Ticket)
 class TicketAdmin(admin.ModelAdmin):
     """Configuración del admin para Ticket."""
@@ -86,6 +104,7 @@ class TicketAdmin(admin.ModelAdmin):
     list_filter = [
         'status',
         'priority',
+        SLABreachedFilter,
         'created_at',
         'updated_at',
         ('assigned_to', admin.EmptyFieldListFilter),
@@ -143,6 +162,14 @@ class TicketAdmin(admin.ModelAdmin):
     # Número de items por página
     list_per_page = 25
     
+    def get_queryset(self, request):
+        """Calcula la edad y el SLA en la consulta (ver tickets/sla.py)."""
+        return sla.annotate(super().get_queryset(request))
+    
+    @admin.display(description='Días abierto', ordering='age')
+    def days_open(self, obj):
+        return obj.days_open
+    
     # Métodos personalizados para badges de colores
     @admin.display(description='Estado')
     def status_badge(self, obj):
@@ -9,3 +9,6 @@ class TicketsConfig(AppConfig):
     def ready(self):
         # Importar signals para que se registren
         import tickets.models.user_profile  # noqa
+        import tickets.cache  # noqa
+        import tickets.thumbnails  # noqa
+        import tickets.tasks  # noqa
@@ -0,0 +1,208 @@
+"""
+Asignación automática de tickets nuevos.
+
+Al crear un ticket sin ``assigned_to`` (con la API o con la importación
+masiva), la estrategia de TICKETS_AUTO_ASSIGN elige un agente entre los
+usuarios activos con ``UserProfile.is_support_staff``:
+
+- round_robin: los agentes por turnos, en orden de ID.
+- least_open: el agente con menos tickets abiertos o en progreso.
+- department: como least_open, pero entre los agentes del departamento
+  del creador; si no hay ninguno, entre todos.
+
+TICKETS_AUTO_ASSIGN también acepta la ruta de una clase propia que
+herede de AssignmentStrategy. Vacío desactiva la asignación.
+
+La carga de cada agente se lee de los contadores del dashboard
+(TicketCounter, ámbito ``assigned_to``), que se actualizan en la misma
+transacción que cada ticket; no se cuentan tickets. Para un lote se leen
+una sola vez y se llevan en memoria, así que el costo por ticket no
+depende del tamaño del lote ni del número de tickets. El turno de
+round_robin es una secuencia de PostgreSQL: procesos concurrentes nunca
+reciben el mismo turno.
+
+least_open y department toman un advisory lock de transacción
+(ASSIGNMENT_LOCK) antes de leer la carga, y quien crea los tickets los
+inserta en la misma transacción: dos creaciones simultáneas eligen una
+después de la otra, y la segunda ya ve el ticket de la primera en los
+contadores. Por eso ``choose()`` se llama dentro de la transacción que
+inserta los tickets.
+"""
+import heapq
+
+from django.conf import settings
+from django.db import connections, router
+from django.db.models import Sum
+from django.utils.module_loading import import_string
+
+from .models import Ticket, TicketCounter, UserProfile
+from .models.ticket import OPEN_STATUSES
+
+
+# Secuencia con el turno de round_robin (ver la migración 0013)
+ROUND_ROBIN_SEQUENCE = 'tickets_assignment_turn_seq'
+
+# Advisory lock que serializa las asignaciones según la carga
+ASSIGNMENT_LOCK = 'tickets.assignment:workload'
+
+
+class AssignmentStrategy:
+    """
+    Estrategia de asignación. Las subclases implementan ``choose()``.
+    """
+
+    def __init__(self, using=None):
+        self.using = using or router.db_for_write(Ticket)
+
+    def agents(self):
+        """Retorna {ID de usuario: departamento} de los agentes, por ID."""
+        return dict(
+            UserProfile.objects.using(self.using)
+            .filter(is_support_staff=True, user__is_active=True)
+            .order_by('user_id')
+            .values_list('user_id', 'department')
+        )
+
+    def lock(self):
+        """
+        Espera el advisory lock de las asignaciones según la carga; se
+        libera al terminar la transacción en curso.
+        """
+        with connections[self.using].cursor() as cursor:
+            cursor.execute('SELECT pg_advisory_xact_lock(hashtext(%s))', [ASSIGNMENT_LOCK])
+
+    def workloads(self, agent_ids):
+        """Retorna {ID de agente: tickets abiertos} según TicketCounter."""
+        loads = dict.fromkeys(agent_ids, 0)
+        rows = TicketCounter.objects.using(self.using).filter(
+            scope=TicketCounter.SCOPE_ASSIGNED_TO,
+            user_id__in=loads,
+            status__in=OPEN_STATUSES
+        ).values('user_id').annotate(total=Sum('count')).values_list('user_id', 'total')
+        loads.update(rows)
+        return loads
+
+    def choose(self, created_by_ids):
+        """
+        Retorna el ID del agente para cada ticket nuevo, en el mismo orden
+        que los IDs de sus creadores (None si no hay agentes).
+        """
+        raise NotImplementedError
+
+
+class RoundRobinStrategy(AssignmentStrategy):
+    """Reparte los tickets entre los agentes por turnos."""
+
+    def choose(self, created_by_ids):
+        agents = list(self.agents())
+        if not agents or not created_by_ids:
+            return [None] * len(created_by_ids)
+        with connections[self.using].cursor() as cursor:
+            cursor.execute(
+                'SELECT nextval(%s) FROM generate_series(1, %s)',
+                [ROUND_ROBIN_SEQUENCE, len(created_by_ids)]
+            )
+            turns = [turn for turn, in cursor.fetchall()]
+        return [agents[(turn - 1) % len(agents)] for turn in turns]
+
+
+class LeastOpenStrategy(AssignmentStrategy):
+    """Asigna cada ticket al agente con menos tickets abiertos."""
+
+    def choose(self, created_by_ids):
+        agents = self.agents()
+        if not agents:
+            return [None] * len(created_by_ids)
+        self.lock()
+        loads = self.workloads(agents)
+        queue = self.queue(loads, agents)
+        return [self.take(queue, loads) for _ in created_by_ids]
+
+    @staticmethod
+    def queue(loads, agent_ids):
+        """Cola de prioridad (carga, ID) de ``agent_ids``."""
+        queue = [(loads[pk], pk) for pk in agent_ids]
+        heapq.heapify(queue)
+        return queue
+
+    @staticmethod
+    def take(queue, loads):
+        """
+        Saca de ``queue`` el agente con menos carga, le suma el ticket y
+        lo vuelve a poner en la cola.
+
+        Cada agente tiene una sola entrada por cola. Si su carga ya no
+        coincide con ``loads`` (recibió tickets desde otra cola), la
+        entrada se reinserta con la carga actual.
+        """
+        while True:
+            load, pk = heapq.heappop(queue)
+            if load == loads[pk]:
+                break
+            heapq.heappush(queue, (loads[pk], pk))
+        loads[pk] += 1
+        heapq.heappush(queue, (loads[pk], pk))
+        return pk
+
+
+class DepartmentStrategy(LeastOpenStrategy):
+    """
+    Asigna cada ticket al agente con menos tickets abiertos del
+    departamento de su creador, o de todos si el departamento no tiene
+    agentes.
+    """
+
+    def choose(self, created_by_ids):
+        agents = self.agents()
+        if not agents:
+            return [None] * len(created_by_ids)
+        self.lock()
+        loads = self.workloads(agents)
+
+        members = {}
+        for pk, department in agents.items():
+            if department:
+                members.setdefault(department, []).append(pk)
+        queues = {department: self.queue(loads, pks) for department, pks in members.items()}
+        everyone = self.queue(loads, agents)
+
+        departments = dict(
+            UserProfile.objects.using(self.using)
+            .filter(user_id__in=set(created_by_ids))
+            .values_list('user_id', 'department')
+        )
+
+        return [
+            self.take(queues.get(departments.get(created_by_id), everyone), loads)
+            for created_by_id in created_by_ids
+        ]
+
+
+STRATEGIES = {
+    'round_robin': RoundRobinStrategy,
+    'least_open': LeastOpenStrategy,
+    'department': DepartmentStrategy,
+}
+
+
+def get_strategy(name=None, using=None):
+    """
+    Retorna la estrategia ``name`` (por defecto TICKETS_AUTO_ASSIGN), o
+    None si la asignación automática está desactivada.
+    """
+    name = settings.TICKETS_AUTO_ASSIGN if name is None else name
+    if not name:
+        return None
+    strategy_class = STRATEGIES.get(name) or import_string(name)
+    return strategy_class(using=using)
+
+
+def choose_agent(created_by_id, using=None):
+    """
+    Retorna el ID del agente para un ticket nuevo, o None. Se llama en la
+    transacción que inserta el ticket.
+    """
+    strategy = get_strategy(using=using)
+    if strategy is None:
+        return None
+    return strategy.choose([created_by_id])[0]
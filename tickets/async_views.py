@@ -0,0 +1,98 @@
+"""
+Lecturas async de la API (TICKETS_ASYNC_READS).
+
+Con el setting activo, los GET del listado y detalle de tickets,
+my-tickets, assigned-to-me, /profiles/me/ y los listados de comentarios
+se atienden con los métodos ``a<acción>`` de los viewsets (``alist``,
+``aretrieve``, ...), que consultan con la API async del ORM (``acount``,
+``aget``, ``async for``) y retornan la misma respuesta que la versión
+sync. El resto de métodos y acciones siguen por la vista sync de DRF.
+
+Lo que no tiene equivalente async se ejecuta con sync_to_async: la
+autenticación y los permisos (pueden consultar la base de datos o un
+caché externo), la validación de django-filter (los filtros por
+usuario o ticket consultan el ID), el conteo estimado (EXPLAIN) y los
+serializadores de DRF sobre instancias, que pueden consultar relaciones
+o campos diferidos. Los listados compilados (tickets/compiled.py) se
+serializan en el event loop.
+
+Solo tiene sentido bajo ASGI (uvicorn config.asgi:application); con
+WSGI Django ejecuta cada vista async en su propio event loop.
+"""
+from asgiref.sync import sync_to_async
+from django.urls import URLPattern
+
+
+class AsyncReadViewMixin:
+    """
+    Ejecuta el ciclo de APIView.dispatch() con un handler async.
+    """
+
+    async def adispatch(self, request, handler, *args, **kwargs):
+        self.args = args
+        self.kwargs = kwargs
+        request = self.initialize_request(request, *args, **kwargs)
+        self.request = request
+        self.headers = self.default_response_headers
+
+        try:
+            await sync_to_async(self.initial)(request, *args, **kwargs)
+            response = await handler(request, *args, **kwargs)
+        except Exception as exc:
+            response = self.handle_exception(exc)
+
+        self.response = self.finalize_response(request, response, *args, **kwargs)
+        return self.response
+
+
+def async_read_view(view):
+    """
+    Envuelve la vista ``view`` de un ViewSet en una vista async que
+    atiende con ``a<acción>`` los GET cuya acción lo tiene, y con ``view``
+    todo lo demás.
+    """
+    cls, initkwargs, actions = view.cls, view.initkwargs, view.actions
+
+    async def async_view(request, *args, **kwargs):
+        action = actions.get(request.method.lower()) if request.method == 'GET' else None
+        if action is None or not hasattr(cls, f'a{action}'):
+            return await sync_to_async(view)(request, *args, **kwargs)
+
+        self = cls(**initkwargs)
+        self.action_map = actions
+        for method, name in actions.items():
+            setattr(self, method, getattr(self, name))
+        self.request = request
+        self.args = args
+        self.kwargs = kwargs
+        return await self.adispatch(request, getattr(self, f'a{action}'), *args, **kwargs)
+
+    async_view.__name__ = view.__name__
+    async_view.__doc__ = view.__doc__
+    async_view.cls = cls
+    async_view.initkwargs = initkwargs
+    async_view.actions = actions
+    async_view.csrf_exempt = True
+    return async_view
+
+
+def has_async_reads(view):
+    cls, actions = getattr(view, 'cls', None), getattr(view, 'actions', {})
+    return (
+        cls is not None
+        and issubclass(cls, AsyncReadViewMixin)
+        and hasattr(cls, f"a{actions.get('get')}")
+    )
+
+
+def async_read_urls(patterns):
+    """
+    Retorna ``patterns`` (las URLs de un router de DRF) con las vistas que
+    tienen lecturas async envueltas en ``async_read_view``.
+    """
+    return [
+        URLPattern(pattern.pattern, async_read_view(pattern.callback), pattern.default_args, pattern.name)
+        if isinstance(pattern, URLPattern) and has_async_reads(pattern.callback)
+        else pattern
+        for pattern in patterns
+    ]
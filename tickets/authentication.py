@@ -0,0 +1,159 @@
+"""
+Autenticación JWT con caché del usuario.
+
+JWTAuthentication consulta la tabla de usuarios en cada petición. Aquí el
+usuario (con su perfil) se guarda en un caché en memoria del proceso,
+limitado en tamaño y con un TTL corto, y solo se construye de nuevo
+cuando no está o cambió.
+
+Para saber si cambió, cada petición lee de la base principal una huella
+(md5) de la fila del usuario y la de su perfil: una consulta por PK que
+no construye objetos. Una entrada en memoria solo es válida con la misma
+huella, así que desactivar un usuario (o cambiar su contraseña, permisos
+o perfil) tiene efecto en la siguiente petición de cualquier proceso,
+también si el cambio no pasó por save() (por ejemplo, QuerySet.update()).
+"""
+import copy
+import threading
+import time
+from collections import OrderedDict
+
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.db import DEFAULT_DB_ALIAS, connections
+from django.utils.translation import gettext_lazy as _
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import AuthenticationFailed, InvalidToken
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.utils import get_md5_hash_password
+
+from .models import UserProfile
+from .routers import use_primary
+
+
+class UserCache:
+    """
+    Caché LRU en memoria de usuarios autenticados, con TTL.
+
+    Las entradas son (huella, vencimiento, usuario). ``get()`` retorna una
+    copia profunda del usuario (con su perfil) para que una petición no
+    modifique los objetos que ven las demás.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()
+
+    @property
+    def timeout(self):
+        return getattr(settings, 'TICKETS_AUTH_CACHE_TTL', 60)
+
+    @property
+    def max_entries(self):
+        return getattr(settings, 'TICKETS_AUTH_CACHE_MAX_ENTRIES', 1000)
+
+    def version(self, user_id):
+        """
+        Retorna la huella actual del usuario y su perfil, o None si el
+        usuario no existe.
+
+        Se lee directo de la base principal, sin pasar por el router:
+        db_for_write marcaría la petición como escritura y sus lecturas
+        dejarían de ir a las réplicas.
+        """
+        column = User._meta.get_field(api_settings.USER_ID_FIELD).column
+        with connections[DEFAULT_DB_ALIAS].cursor() as cursor:
+            cursor.execute(
+                f"""
+                SELECT md5(u::text || coalesce(p::text, ''))
+                FROM {User._meta.db_table} u
+                LEFT JOIN {UserProfile._meta.db_table} p ON p.user_id = u.id
+                WHERE u.{column} = %s
+                """,
+                [user_id]
+            )
+            row = cursor.fetchone()
+        return row[0] if row else None
+
+    def get(self, user_id, version):
+        """Retorna el usuario guardado con ``version``, o None si no hay."""
+        with self._lock:
+            entry = self._entries.get(user_id)
+            if entry is None:
+                return None
+            entry_version, expires, user = entry
+            if entry_version != version or expires <= time.monotonic():
+                del self._entries[user_id]
+                return None
+            self._entries.move_to_end(user_id)
+        return copy.deepcopy(user)
+
+    def set(self, user_id, version, user):
+        """
+        Guarda una copia de ``user`` con la huella leída antes de
+        consultarlo.
+
+        Si el usuario cambió mientras tanto, la entrada queda con la huella
+        anterior y nunca se usa.
+        """
+        if self.timeout <= 0 or version is None:
+            return
+        user = copy.deepcopy(user)
+        with self._lock:
+            self._entries[user_id] = (version, time.monotonic() + self.timeout, user)
+            self._entries.move_to_end(user_id)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+user_cache = UserCache()
+
+
+class CachedJWTAuthentication(JWTAuthentication):
+    """
+    JWTAuthentication que resuelve el usuario y su perfil desde
+    ``user_cache``.
+
+    Las validaciones de simplejwt (usuario activo, token revocado por
+    cambio de contraseña) se aplican en cada petición, también cuando el
+    usuario viene del caché.
+    """
+
+    def get_user(self, validated_token):
+        try:
+            user_id = validated_token[api_settings.USER_ID_CLAIM]
+        except KeyError as e:
+            raise InvalidToken(
+                _('Token contained no recognizable user identification')
+            ) from e
+
+        version = user_cache.version(user_id)
+        user = user_cache.get(user_id, version)
+        if user is None:
+            try:
+                # Lo que se guarda en caché no puede venir de una réplica atrasada
+                with use_primary():
+                    user = User.objects.select_related('profile').get(
+                        **{api_settings.USER_ID_FIELD: user_id}
+                    )
+            except User.DoesNotExist as e:
+                raise AuthenticationFailed(_('User not found'), code='user_not_found') from e
+            if user.is_active:
+                user_cache.set(user_id, version, user)
+
+        if api_settings.CHECK_USER_IS_ACTIVE and not user.is_active:
+            raise AuthenticationFailed(_('User is inactive'), code='user_inactive')
+
+        if api_settings.CHECK_REVOKE_TOKEN:
+            if validated_token.get(
+                api_settings.REVOKE_TOKEN_CLAIM
+            ) != get_md5_hash_password(user.password):
+                raise AuthenticationFailed(
+                    _("The user's password has been changed."), code='password_changed'
+                )
+
+        return user
@@ -0,0 +1,98 @@
+"""
+Operaciones masivas sobre tickets.
+
+Aplican un cambio a muchos tickets con unos pocos UPDATE en lugar de un
+Ticket.save() por ticket, manteniendo lo que haría save(): la fecha de
+cierre, ``updated_at``, los contadores del dashboard (TicketCounter) y la
+invalidación del caché de detalle.
+"""
+from collections import Counter
+
+from django.db import router, transaction
+from django.utils import timezone
+
+from .cache import ticket_detail_cache
+from .models import Ticket, TicketCounter
+
+
+OPERATIONS = ['close', 'assign', 'reprioritize']
+
+
+def apply_bulk_operation(queryset, operation, requested_ids=None,
+                         assigned_to_id=None, priority=None):
+    """
+    Aplica ``operation`` a los tickets de ``queryset``.
+
+    - close: cambia el estado a 'cerrado' y fija ``closed_at``.
+    - assign: asigna los tickets a ``assigned_to_id`` (None para quitar).
+    - reprioritize: cambia la prioridad a ``priority``.
+
+    Retorna un diccionario con los IDs modificados (``changed``) y los
+    omitidos (``skipped``), cada uno con su motivo:
+
+    - 'unchanged': el ticket ya tenía el valor pedido (ya cerrado, ya
+      asignado a ese usuario o ya sin asignar, misma prioridad).
+    - 'not_found': el ID está en ``requested_ids`` pero no en el queryset.
+    """
+    if operation not in OPERATIONS:
+        raise ValueError(f'Operación desconocida: {operation}')
+
+    using = router.db_for_write(Ticket)
+    now = timezone.now()
+
+    with transaction.atomic(using=using):
+        rows = list(
+            queryset.using(using).select_for_update(of=('self',)).order_by('pk')
+            .values('pk', *TicketCounter.TRACKED_FIELDS)
+        )
+
+        if operation == 'close':
+            field, value = 'status', 'cerrado'
+            changes = {'status': 'cerrado', 'closed_at': now}
+        elif operation == 'assign':
+            field, value = 'assigned_to_id', assigned_to_id
+            changes = {'assigned_to_id': assigned_to_id}
+        else:
+            field, value = 'priority', priority
+            changes = {'priority': priority}
+
+        changed = [row for row in rows if row[field] != value]
+        skipped = [
+            {'id': row['pk'], 'reason': 'unchanged'}
+            for row in rows if row[field] == value
+        ]
+
+        if requested_ids is not None:
+            found = {row['pk'] for row in rows}
+            skipped += [
+                {'id': pk, 'reason': 'not_found'}
+                for pk in sorted(set(requested_ids) - found)
+            ]
+
+        changed_ids = [row['pk'] for row in changed]
+        if changed_ids:
+            Ticket.objects.using(using).filter(pk__in=changed_ids).update(
+                updated_at=now,
+                **changes
+            )
+
+            deltas = Counter()
+            for row in changed:
+                old = {name: row[name] for name in TicketCounter.TRACKED_FIELDS}
+                new = {**old, field: value}
+                for key in TicketCounter.keys_for(old):
+                    deltas[key] -= 1
+                for key in TicketCounter.keys_for(new):
+                    deltas[key] += 1
+            TicketCounter.apply_deltas(deltas, using=using)
+
+            transaction.on_commit(
+                lambda: ticket_detail_cache.invalidate_tickets(changed_ids),
+                using=using
+            )
+
+    return {
+        'operation': operation,
+        'changed': changed_ids,
+        'skipped': sorted(skipped, key=lambda item: item['id']),
+    }
@@ -0,0 +1,188 @@
+"""
+Caché de respuestas para el detalle de tickets.
+
+Guarda la salida de TicketDetailSerializer en el caché ``tickets`` de
+Django (LocMemCache por defecto: LRU con tamaño máximo). Hay una variante
+para staff y otra para el resto de usuarios, porque solo staff ve los
+comentarios internos.
+
+La invalidación usa generaciones: cada ticket y cada usuario tiene un
+token en el caché que se reemplaza cuando cambian. La clave de una
+entrada incluye el token del ticket y la entrada guarda los tokens de los
+usuarios que aparecen en ella, de modo que:
+- Guardar/eliminar el ticket o uno de sus comentarios invalida sus
+  entradas.
+- Guardar/eliminar un usuario invalida todas las entradas donde aparece,
+  sin tener que buscar sus tickets.
+- Una respuesta calculada mientras ocurría un cambio queda guardada con el
+  token anterior y nunca se vuelve a leer.
+
+Para eso los tokens se leen antes de consultar la base (``generations()``)
+y se reemplazan al confirmar la transacción del cambio: si se
+reemplazaran antes, una lectura que ve la fila anterior podría guardarla
+con el token nuevo.
+
+El caché tiene que ser compartido por todos los procesos (Redis o
+Memcached, ver TICKETS_CACHE_BACKEND en config/settings.py): con
+LocMemCache cada worker tiene su copia y no ve las invalidaciones de los
+demás.
+"""
+import threading
+import uuid
+
+from django.contrib.auth.models import User
+from django.core.cache import caches
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import receiver
+
+from .models import Comment, Ticket
+
+
+class TicketDetailCache:
+    """
+    Caché del detalle de tickets con contadores de aciertos y fallos.
+
+    Los contadores son por proceso.
+    """
+    cache_alias = 'tickets'
+    key_prefix = 'ticket-detail'
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    @property
+    def cache(self):
+        return caches[self.cache_alias]
+
+    def _generation_key(self, kind, pk):
+        return f'{self.key_prefix}:gen:{kind}:{pk}'
+
+    def _generations(self, kind, pks):
+        """
+        Retorna {pk: token} para ``pks``.
+
+        Si un token no existe (nunca se creó o el LRU lo descartó) se crea
+        uno nuevo, lo que invalida cualquier entrada anterior.
+        """
+        keys = {self._generation_key(kind, pk): pk for pk in pks}
+        found = self.cache.get_many(list(keys))
+        for key in keys:
+            if key not in found:
+                self.cache.add(key, uuid.uuid4().hex, timeout=None)
+                found[key] = self.cache.get(key)
+        return {pk: found[key] for key, pk in keys.items()}
+
+    def _entry_key(self, ticket_id, variant, generation):
+        return f'{self.key_prefix}:{ticket_id}:{variant}:{generation}'
+
+    def _record(self, hit):
+        with self._lock:
+            if hit:
+                self.hits += 1
+            else:
+                self.misses += 1
+
+    def get(self, ticket_id, variant):
+        """Retorna los datos guardados o None si no hay entrada válida."""
+        generation = self._generations('ticket', [ticket_id])[ticket_id]
+        entry = self.cache.get(self._entry_key(ticket_id, variant, generation))
+
+        if entry is not None:
+            users = entry['users']
+            if self._generations('user', users) == users:
+                self._record(hit=True)
+                return entry['data']
+
+        self._record(hit=False)
+        return None
+
+    def generations(self, ticket_id, user_ids):
+        """
+        Retorna los tokens actuales del ticket y de sus usuarios, para
+        ``set()``. Se leen antes de consultar el detalle.
+
+        ``user_ids`` es una función que retorna los IDs de los usuarios: se
+        llama después de leer el token del ticket, así que un usuario que
+        aparece después (un comentario nuevo, otro asignado) también
+        cambia el token del ticket.
+        """
+        generation = self._generations('ticket', [ticket_id])[ticket_id]
+        return generation, self._generations('user', sorted(set(user_ids())))
+
+    def set(self, ticket_id, variant, data, generations):
+        """
+        Guarda ``data`` con los tokens que retornó ``generations()`` antes
+        de calcularlo.
+        """
+        generation, users = generations
+        self.cache.set(
+            self._entry_key(ticket_id, variant, generation),
+            {'data': data, 'users': users}
+        )
+
+    def invalidate_tickets(self, ticket_ids):
+        """Invalida todas las variantes de los tickets indicados."""
+        self.cache.set_many({
+            self._generation_key('ticket', pk): uuid.uuid4().hex
+            for pk in ticket_ids
+        }, timeout=None)
+
+    def invalidate_users(self, user_ids):
+        """Invalida las entradas en las que aparecen los usuarios indicados."""
+        self.cache.set_many({
+            self._generation_key('user', pk): uuid.uuid4().hex
+            for pk in user_ids
+        }, timeout=None)
+
+    def stats(self):
+        """Retorna los contadores de aciertos y fallos del proceso."""
+        with self._lock:
+            return {'hits': self.hits, 'misses': self.misses}
+
+    def reset_stats(self):
+        with self._lock:
+            self.hits = 0
+            self.misses = 0
+
+
+ticket_detail_cache = TicketDetailCache()
+
+
+@receiver(post_save, sender=Ticket)
+@receiver(post_delete, sender=Ticket)
+def invalidate_ticket_detail(sender, instance, using, **kwargs):
+    """Signal que invalida el detalle cacheado de un ticket al confirmar."""
+    ticket_ids = [instance.pk]
+    transaction.on_commit(lambda: ticket_detail_cache.invalidate_tickets(ticket_ids), using=using)
+
+
+@receiver(pre_save, sender=Comment)
+def remember_comment_ticket(sender, instance, **kwargs):
+    """
+    Signal que guarda el ticket anterior de un comentario editado, por si
+    el comentario se mueve a otro ticket.
+    """
+    if instance.pk is not None and not instance._state.adding:
+        instance._previous_ticket_id = Comment._base_manager.filter(
+            pk=instance.pk
+        ).values_list('ticket_id', flat=True).first()
+
+
+@receiver(post_save, sender=Comment)
+@receiver(post_delete, sender=Comment)
+def invalidate_comment_ticket_detail(sender, instance, using, **kwargs):
+    """Signal que invalida el detalle del ticket de un comentario al confirmar."""
+    ticket_ids = {instance.ticket_id, getattr(instance, '_previous_ticket_id', None)}
+    ticket_ids = [pk for pk in ticket_ids if pk is not None]
+    transaction.on_commit(lambda: ticket_detail_cache.invalidate_tickets(ticket_ids), using=using)
+
+
+@receiver(post_save, sender=User)
+@receiver(post_delete, sender=User)
+def invalidate_user_ticket_details(sender, instance, using, **kwargs):
+    """Signal que invalida los detalles en los que aparece un usuario al confirmar."""
+    user_ids = [instance.pk]
+    transaction.on_commit(lambda: ticket_detail_cache.invalidate_users(user_ids), using=using)
@@ -0,0 +1,348 @@
+"""
+Serialización compilada de solo lectura para los listados.
+
+CompiledSerializer analiza una vez un serializador de DRF (con sus
+``fields`` y ``expand``) y obtiene:
+
+- las columnas que necesita, para leerlas con ``values_list()`` sin
+  construir instancias del modelo, y
+- una función por campo que convierte el valor de la fila igual que su
+  ``to_representation()``, sin pasar por la maquinaria de cada campo.
+
+Solo se compilan los tipos de campo que se saben convertir exactamente;
+los campos calculados (propiedades y SerializerMethodField) se declaran
+en ``compiled_fields`` del serializador. Si algo no se puede compilar se
+lanza NotCompilable y la vista usa el serializador normal.
+"""
+import threading
+from collections import OrderedDict
+from functools import partial
+from operator import itemgetter
+
+from django.conf import settings
+from django.core.exceptions import FieldDoesNotExist
+from django.utils import timezone
+from rest_framework import ISO_8601, serializers
+from rest_framework.settings import api_settings
+
+from .serializers import ImageVariantsField, SearchResultMixin, SparseFieldsMixin
+from .thumbnails import variant_urls
+
+
+class NotCompilable(Exception):
+    """El serializador tiene un campo que no se puede compilar."""
+
+
+# Conversiones que dependen de la petición y se resuelven al serializar
+DATETIME = 'datetime'
+FILE = 'file'
+VARIANTS = 'variants'
+
+# Campos cuyo to_representation() equivale a una conversión simple
+SIMPLE_CONVERSIONS = {
+    serializers.BooleanField: bool,
+    serializers.IntegerField: int,
+    serializers.FloatField: float,
+    serializers.CharField: str,
+    serializers.EmailField: str,
+    serializers.SlugField: str,
+    serializers.URLField: str,
+}
+
+
+class CompiledSerializer:
+    """
+    Serializador de solo lectura compilado a partir de ``serializer_class``.
+
+    Uso::
+
+        compiled = CompiledSerializer.for_class(TicketSerializer, fields, expand)
+        rows = compiled.values_list(queryset)  # paginar ``rows`` si hace falta
+        data = compiled.serialize(rows, request)
+
+    El plan es una lista de (nombre, tipo, posiciones, conversión), donde
+    tipo es ``'value'`` (un campo del modelo), ``'computed'`` (un campo de
+    ``compiled_fields``) o ``'nested'`` (un serializador anidado; la
+    conversión es su plan).
+
+    Los compilados se cachean por proceso (LRU de ``cache_size``) según los
+    campos que resultan de ``fields`` y ``expand``, no según los parámetros
+    tal como llegan: nombres repetidos, desconocidos o en otro orden usan
+    la misma entrada.
+    """
+    cache_size = 128
+
+    _cache = OrderedDict()
+    _cache_lock = threading.Lock()
+
+    # {serializer_class: nombres de sus campos}
+    _field_names = {}
+
+    def __init__(self, serializer_class, fields=None, expand=None, extra_columns=()):
+        if issubclass(serializer_class, SparseFieldsMixin):
+            serializer = serializer_class(fields=fields, expand=expand)
+        else:
+            serializer = serializer_class()
+
+        self.serializer_class = serializer_class
+        self.model = serializer_class.Meta.model
+        self.columns = []
+        self.plan = self._compile(serializer, prefix='')
+
+        # La PK y ``extra_columns`` (por ejemplo, las de la paginación por
+        # cursor) se leen aunque la respuesta no las incluya
+        for column in [self.model._meta.pk.attname, *extra_columns]:
+            self._column(column)
+
+    @classmethod
+    def for_class(cls, serializer_class, fields=None, expand=None, extra_columns=()):
+        """
+        Retorna el serializador compilado, cacheado por los campos que
+        resultan de sus argumentos. Lanza NotCompilable si no se puede
+        compilar.
+        """
+        fields, expand = cls._resolve(serializer_class, fields, expand)
+        key = (serializer_class, fields, expand, tuple(extra_columns))
+        with cls._cache_lock:
+            compiled = cls._cache.get(key)
+            if compiled is not None:
+                cls._cache.move_to_end(key)
+
+        if compiled is None:
+            try:
+                compiled = cls(serializer_class, fields, expand, extra_columns)
+            except NotCompilable as exc:
+                compiled = exc
+            with cls._cache_lock:
+                cls._cache[key] = compiled
+                while len(cls._cache) > cls.cache_size:
+                    cls._cache.popitem(last=False)
+
+        if isinstance(compiled, NotCompilable):
+            raise compiled
+        return compiled
+
+    @classmethod
+    def _resolve(cls, serializer_class, fields, expand):
+        """
+        Retorna ``fields`` y ``expand`` (frozenset o None) reducidos a lo que
+        cambia la representación, igual que SparseFieldsMixin: los campos
+        que existen y las relaciones expandibles que se incluyen.
+        """
+        if not issubclass(serializer_class, SparseFieldsMixin):
+            return None, None
+
+        names = cls._field_names.get(serializer_class)
+        if names is None:
+            names = frozenset(serializer_class().fields)
+            cls._field_names[serializer_class] = names
+
+        if fields is not None:
+            fields = names.intersection(fields)
+        if expand is not None:
+            included = names if fields is None else fields
+            expand = included.intersection(serializer_class.expandable_fields, expand)
+        return fields, expand
+
+    def _column(self, name):
+        """Agrega ``name`` a las columnas y retorna su posición."""
+        if name not in self.columns:
+            self.columns.append(name)
+        return self.columns.index(name)
+
+    def _compile(self, serializer, prefix):
+        model = serializer.Meta.model
+        computed = getattr(serializer, 'compiled_fields', {})
+        plan = []
+
+        for name, field in serializer.fields.items():
+            if field.write_only:
+                continue
+
+            if name in computed:
+                sources, function = computed[name]
+                indexes = [self._column(prefix + source) for source in sources]
+                plan.append((name, 'computed', indexes, function))
+
+            elif isinstance(field, serializers.BaseSerializer):
+                if isinstance(field, serializers.ListSerializer):
+                    raise NotCompilable(name)
+                relation = f'{prefix}{field.source}__'
+                # Si la PK del objeto anidado es NULL, la relación no existe
+                pk = self._column(relation + field.Meta.model._meta.pk.name)
+                plan.append((name, 'nested', [pk], self._compile(field, relation)))
+
+            else:
+                column, convert = self._field(model, field)
+                plan.append((name, 'value', [self._column(prefix + column)], convert))
+
+        return plan
+
+    def _field(self, model, field):
+        """Retorna (columna, conversión) de un campo simple."""
+        source = field.source
+
+        if source.startswith('get_') and source.endswith('_display'):
+            model_field = self._model_field(model, source[len('get_'):-len('_display')])
+            choices = {value: str(label) for value, label in model_field.flatchoices}
+            return model_field.name, lambda value: choices.get(value, str(value))
+
+        model_field = self._model_field(model, source)
+
+        if isinstance(field, serializers.PrimaryKeyRelatedField):
+            if field.pk_field is not None:
+                raise NotCompilable(source)
+            return model_field.attname, None
+
+        if isinstance(field, serializers.FileField):
+            if not getattr(field, 'use_url', api_settings.UPLOADED_FILES_USE_URL):
+                return source, lambda value: value or None
+            return source, (FILE, model_field.storage)
+
+        if isinstance(field, ImageVariantsField):
+            return source, VARIANTS
+
+        if isinstance(field, serializers.DateTimeField):
+            output_format = getattr(field, 'format', api_settings.DATETIME_FORMAT)
+            if (
+                not settings.USE_TZ
+                or hasattr(field, 'timezone')
+                or not isinstance(output_format, str)
+                or output_format.lower() != ISO_8601
+            ):
+                raise NotCompilable(source)
+            return source, DATETIME
+
+        if type(field) is serializers.ChoiceField:
+            choices = field.choice_strings_to_values
+            return source, lambda value: value if value == '' else choices.get(str(value), value)
+
+        if type(field) is serializers.BigIntegerField:
+            if getattr(field, 'coerce_to_string', api_settings.COERCE_BIGINT_TO_STRING):
+                return source, str
+            return source, int
+
+        convert = SIMPLE_CONVERSIONS.get(type(field))
+        if convert is not None:
+            return source, convert
+
+        raise NotCompilable(source)
+
+    @staticmethod
+    def _model_field(model, name):
+        try:
+            model_field = model._meta.get_field(name)
+        except FieldDoesNotExist:
+            raise NotCompilable(name)
+        if not model_field.concrete:
+            raise NotCompilable(name)
+        return model_field
+
+    def values_list(self, queryset):
+        """
+        Retorna ``queryset`` como filas (namedtuple) con las columnas del
+        plan, más ``search_rank`` y ``search_headline`` si el queryset
+        viene de una búsqueda de texto completo.
+
+        Lanza NotCompilable si falta alguna anotación que usa el plan.
+        """
+        annotations = queryset.query.annotations
+        for column in self.columns:
+            if '__' not in column and column not in annotations:
+                self._model_field(self.model, column)
+
+        columns = list(self.columns)
+        if issubclass(self.serializer_class, SearchResultMixin) and 'search_rank' in annotations:
+            columns.append('search_rank')
+            if 'search_headline' in annotations:
+                columns.append('search_headline')
+        return queryset.values_list(*columns, named=True)
+
+    def serialize(self, rows, request=None):
+        """Convierte las filas de ``values_list()`` en una lista de diccionarios."""
+        getters = self._getters(self.plan, request)
+        data = [{name: get(row) for name, get in getters} for row in rows]
+
+        search = len(self.columns)
+        for item, row in zip(data, rows):
+            if len(row) > search:
+                item['search_rank'] = row[search]
+                item['search_headline'] = row[search + 1] if len(row) > search + 1 else None
+        return data
+
+    def _getters(self, plan, request):
+        """
+        Retorna [(nombre, función que recibe la fila)] según ``plan``.
+
+        La zona horaria actual y la petición (para las URL absolutas de
+        los archivos y sus variantes) se leen aquí una vez por respuesta.
+        """
+        getters = []
+        for name, kind, indexes, convert in plan:
+            if kind == 'computed':
+                getters.append((name, self._computed_getter(indexes, convert)))
+            elif kind == 'nested':
+                getters.append((name, self._nested_getter(indexes[0], self._getters(convert, request))))
+            elif convert == DATETIME:
+                getters.append((name, self._value_getter(indexes[0], datetime_converter())))
+            elif convert == VARIANTS:
+                urls = partial(variant_urls, request=request)
+                getters.append((name, self._value_getter(indexes[0], urls)))
+            elif isinstance(convert, tuple) and convert[0] == FILE:
+                getters.append((name, self._file_getter(indexes[0], convert[1], request)))
+            else:
+                getters.append((name, self._value_getter(indexes[0], convert)))
+        return getters
+
+    @staticmethod
+    def _value_getter(index, convert):
+        if convert is None:
+            return itemgetter(index)
+
+        def get(row):
+            value = row[index]
+            return None if value is None else convert(value)
+        return get
+
+    @staticmethod
+    def _computed_getter(indexes, function):
+        if len(indexes) == 1:
+            index = indexes[0]
+            return lambda row: function(row[index])
+        values = itemgetter(*indexes)
+        return lambda row: function(*values(row))
+
+    @staticmethod
+    def _nested_getter(index, getters):
+        def get(row):
+            if row[index] is None:
+                return None
+            return {name: get_value(row) for name, get_value in getters}
+        return get
+
+    @staticmethod
+    def _file_getter(index, storage, request):
+        def get(row):
+            name = row[index]
+            if not name:
+                return None
+            url = storage.url(name)
+            if request is not None:
+                return request.build_absolute_uri(url)
+            return url
+        return get
+
+
+def datetime_converter():
+    """
+    Retorna la conversión de DateTimeField de DRF (ISO 8601 en la zona
+    horaria actual, con ``Z`` para UTC).
+    """
+    current_timezone = timezone.get_current_timezone()
+
+    def convert(value):
+        value = value.astimezone(current_timezone).isoformat()
+        if value.endswith('+00:00'):
+            value = value[:-6] + 'Z'
+        return value
+    return convert
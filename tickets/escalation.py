@@ -0,0 +1,284 @@
+"""
+Escalamiento automático de tickets desatendidos.
+
+El worker revisa cada 5 minutos (tarea ``escalate_tickets``) las reglas
+de TICKETS_ESCALATION_RULES:
+
+- unanswered: ticket abierto o en progreso sin comentarios durante el
+  plazo de su prioridad (TICKETS_SLA_HOURS), contado desde el último
+  comentario o, si no tiene, desde su creación. Sube la prioridad un
+  nivel (alta se queda igual).
+- unassigned: ticket abierto sin asignar más de
+  TICKETS_ESCALATION_UNASSIGNED_HOURS horas desde su creación. Lo asigna
+  con la estrategia de TICKETS_AUTO_ASSIGN (least_open si está vacía).
+
+Cada ticket escalado queda registrado (Escalation) y se encola
+``notify_escalation``, que publica el evento ``escalation`` en
+/api/events/.
+
+La revisión es incremental: cada regla guarda hasta qué momento revisó
+(EscalationCheckpoint) y solo busca los tickets cuyo plazo venció desde
+entonces, con rangos sobre Ticket.created_at y Comment.created_at que
+resuelven sus índices; no se recorren todos los tickets abiertos. Solo la
+primera revisión de una regla considera todos los tickets. Los tickets se
+escalan en lotes, cada uno en su propia transacción y con operaciones
+masivas (ver tickets/bulk.py).
+
+Como se buscan los plazos que vencen, un ticket al que se le quita la
+asignación después de su plazo, o cuyo plazo cambia en la configuración,
+no se vuelve a revisar hasta su siguiente periodo.
+"""
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import connections, router, transaction
+from django.db.models import F, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+
+from . import sla
+from .assignment import get_strategy
+from .bulk import apply_bulk_operation
+from .events import CHANNEL
+from .jobs import task
+from .models import Comment, Escalation, EscalationCheckpoint, Ticket
+from .models.ticket import OPEN_STATUSES
+
+
+# Prioridad a la que sube un ticket sin respuesta
+NEXT_PRIORITY = {'baja': 'media', 'media': 'alta'}
+
+
+def last_activity():
+    """Fecha del último comentario del ticket, o de su creación si no tiene."""
+    return Coalesce(
+        Subquery(
+            Comment.objects.filter(ticket=OuterRef('pk'))
+            .order_by('-created_at')
+            .values('created_at')[:1]
+        ),
+        F('created_at')
+    )
+
+
+class EscalationRule:
+    """
+    Regla de escalamiento. Las subclases implementan ``thresholds()``,
+    ``pending()``, ``recent()`` y ``act()``.
+    """
+
+    name = None
+
+    def __init__(self, using=None):
+        self.using = using or router.db_for_write(Ticket)
+
+    def thresholds(self):
+        """Retorna {prioridad (None: todas): plazo}."""
+        raise NotImplementedError
+
+    def pending(self, priority, end):
+        """
+        Tickets de ``priority`` con el plazo vencido a más tardar en
+        ``end``, anotados con ``since`` (desde cuándo cuenta el plazo).
+        """
+        raise NotImplementedError
+
+    def recent(self, queryset, start, end):
+        """
+        Divide ``queryset`` (ya filtrado por ``since`` entre ``start`` y
+        ``end``) en consultas que se resuelven con un rango indexado.
+        """
+        raise NotImplementedError
+
+    def act(self, priority, rows):
+        """
+        Escala los tickets ``rows`` [(ID, since, ID del creador)].
+        Retorna {ID: acciones} de los que cambiaron.
+        """
+        raise NotImplementedError
+
+    def run(self, checked_until, now, batch_size):
+        """
+        Escala los tickets cuyo plazo venció entre ``checked_until``
+        (None: desde siempre) y ``now``. Retorna cuántos se escalaron.
+        """
+        total = 0
+        for priority, delta in self.thresholds().items():
+            end = now - delta
+            queryset = self.pending(priority, end)
+            if checked_until is None:
+                querysets = [queryset]
+            else:
+                start = checked_until - delta
+                querysets = self.recent(queryset.filter(since__gt=start), start, end)
+
+            rows = sorted(
+                {
+                    row
+                    for qs in querysets
+                    for row in qs.order_by().values_list('pk', 'since', 'created_by_id')
+                },
+                key=lambda row: (row[1], row[0])
+            )
+            for offset in range(0, len(rows), batch_size):
+                total += self.escalate(priority, end, rows[offset:offset + batch_size])
+        return total
+
+    def escalate(self, priority, end, rows):
+        """Escala un lote en una transacción. Retorna cuántos tickets escaló."""
+        with transaction.atomic(using=self.using):
+            # Bloquea los tickets y descarta los que ya no cumplen la regla
+            # (comentados o asignados mientras tanto) o que ya se escalaron
+            current = set(
+                self.pending(priority, end)
+                .filter(pk__in=[pk for pk, _, _ in rows])
+                .select_for_update(of=('self',))
+                .values_list('pk', 'since')
+            )
+            current -= set(
+                Escalation.objects.using(self.using)
+                .filter(rule=self.name, ticket_id__in=[pk for pk, _ in current])
+                .values_list('ticket_id', 'since')
+            )
+            rows = [row for row in rows if row[:2] in current]
+            if not rows:
+                return 0
+
+            actions = self.act(priority, rows)
+            Escalation.objects.using(self.using).bulk_create([
+                Escalation(ticket_id=pk, rule=self.name, since=since, actions=actions.get(pk, {}))
+                for pk, since, _ in rows
+            ])
+            notify_escalation.enqueue(rule=self.name, ticket_ids=[pk for pk, _, _ in rows])
+        return len(rows)
+
+
+class UnansweredRule(EscalationRule):
+    """Sube la prioridad de los tickets sin comentarios durante su plazo SLA."""
+
+    name = Escalation.RULE_UNANSWERED
+
+    def thresholds(self):
+        return sla.targets()
+
+    def pending(self, priority, end):
+        return Ticket.objects.using(self.using).filter(
+            priority=priority,
+            status__in=OPEN_STATUSES
+        ).annotate(since=last_activity()).filter(since__lte=end)
+
+    def recent(self, queryset, start, end):
+        # Sin comentarios en el rango: por created_at (índice parcial de
+        # tickets abiertos); con comentarios: por el índice de Comment
+        commented = Comment.objects.using(self.using).filter(
+            created_at__gt=start,
+            created_at__lte=end
+        ).values('ticket_id')
+        return [
+            queryset.filter(created_at__gt=start, created_at__lte=end),
+            queryset.filter(pk__in=commented),
+        ]
+
+    def act(self, priority, rows):
+        new_priority = NEXT_PRIORITY.get(priority)
+        if new_priority is None:
+            return {}
+        result = apply_bulk_operation(
+            Ticket.objects.filter(pk__in=[pk for pk, _, _ in rows]),
+            'reprioritize',
+            priority=new_priority
+        )
+        return {pk: {'priority': new_priority} for pk in result['changed']}
+
+
+class UnassignedRule(EscalationRule):
+    """Asigna los tickets que siguen sin asignar después del plazo."""
+
+    name = Escalation.RULE_UNASSIGNED
+
+    def thresholds(self):
+        hours = settings.TICKETS_ESCALATION_UNASSIGNED_HOURS
+        return {None: timedelta(hours=hours)} if hours > 0 else {}
+
+    def pending(self, priority, end):
+        return Ticket.objects.using(self.using).filter(
+            status='abierto',
+            assigned_to__isnull=True
+        ).annotate(since=F('created_at')).filter(since__lte=end)
+
+    def recent(self, queryset, start, end):
+        # since es created_at: el rango usa su índice
+        return [queryset]
+
+    def act(self, priority, rows):
+        strategy = get_strategy(settings.TICKETS_AUTO_ASSIGN or 'least_open', using=self.using)
+        agents = strategy.choose([created_by_id for _, _, created_by_id in rows])
+
+        tickets_by_agent = {}
+        for (pk, _, _), agent_id in zip(rows, agents):
+            if agent_id is not None:
+                tickets_by_agent.setdefault(agent_id, []).append(pk)
+
+        actions = {}
+        for agent_id, ticket_ids in tickets_by_agent.items():
+            result = apply_bulk_operation(
+                Ticket.objects.filter(pk__in=ticket_ids),
+                'assign',
+                assigned_to_id=agent_id
+            )
+            actions.update({pk: {'assigned_to': agent_id} for pk in result['changed']})
+        return actions
+
+
+RULES = {
+    Escalation.RULE_UNANSWERED: UnansweredRule,
+    Escalation.RULE_UNASSIGNED: UnassignedRule,
+}
+
+
+def escalate(rules=None, now=None, batch_size=None, using=None):
+    """
+    Revisa ``rules`` (por defecto TICKETS_ESCALATION_RULES) hasta ``now``.
+    Retorna {regla: tickets escalados}.
+    """
+    rules = settings.TICKETS_ESCALATION_RULES if rules is None else rules
+    unknown = [name for name in rules if name not in RULES]
+    if unknown:
+        raise ValueError(f'Regla de escalamiento desconocida: {", ".join(unknown)}')
+
+    using = using or router.db_for_write(Ticket)
+    now = now or timezone.now()
+    batch_size = batch_size or settings.TICKETS_ESCALATION_BATCH_SIZE
+
+    escalated = {}
+    for name in rules:
+        checked_until = EscalationCheckpoint.checked(name, using=using)
+        escalated[name] = RULES[name](using).run(checked_until, now, batch_size)
+        EscalationCheckpoint.advance(name, now, using=using)
+    return escalated
+
+
+@task(max_attempts=3)
+def notify_escalation(rule, ticket_ids):
+    """
+    Publica un evento ``escalation`` por ticket en /api/events/ (solo para
+    el personal de soporte). Otros avisos (correo, chat) van aquí.
+    """
+    using = router.db_for_write(Ticket)
+    with connections[using].cursor() as cursor:
+        cursor.execute(
+            f"""
+            SELECT pg_notify(%s, json_build_object(
+                'event', 'escalation',
+                'ticket', id,
+                'rule', %s,
+                'status', status,
+                'priority', priority,
+                'assigned_to', assigned_to_id,
+                'is_internal', true
+            )::text)
+            FROM {Ticket._meta.db_table}
+            WHERE id = ANY(%s)
+            """,
+            [CHANNEL, rule, ticket_ids]
+        )
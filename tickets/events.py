@@ -0,0 +1,209 @@
+"""
+Eventos en vivo de tickets (Server-Sent Events).
+
+Los triggers de la migración 0006 publican con NOTIFY en el canal
+``tickets_events`` los cambios de estado, las asignaciones y los
+comentarios nuevos; el escalamiento automático (tickets/escalation.py)
+publica ahí los tickets escalados. Cada proceso ASGI mantiene una sola conexión con
+LISTEN, registrada en el event loop con ``add_reader``, y reparte cada
+evento a las suscripciones que le corresponden. Una suscripción es solo
+una cola de asyncio, así que miles de conexiones inactivas no ocupan un
+hilo cada una.
+
+La conexión LISTEN se abre con la primera suscripción y se cierra con la
+última; ``DisconnectMiddleware`` (en config.asgi) libera la suscripción
+en cuanto el cliente se desconecta. Si se pierde, o si un cliente no consume sus eventos a tiempo, se
+cierran las suscripciones afectadas: el navegador (EventSource) se
+reconecta solo y puede recuperar lo perdido con /api/tickets/changes/.
+"""
+import asyncio
+import json
+
+import psycopg2
+from django.db import connections
+
+
+CHANNEL = 'tickets_events'
+
+# Eventos pendientes por suscripción antes de cerrarla
+QUEUE_SIZE = 100
+
+
+class Subscription:
+    """
+    Cola de eventos de un cliente.
+
+    ``match(event)`` decide qué eventos recibe. ``None`` en la cola indica
+    que la suscripción se cerró.
+    """
+
+    def __init__(self, match):
+        self.match = match
+        self.queue = asyncio.Queue(maxsize=QUEUE_SIZE)
+        self.closed = False
+
+    def put(self, event):
+        if self.closed:
+            return
+        try:
+            self.queue.put_nowait(event)
+        except asyncio.QueueFull:
+            self.close()
+
+    def close(self):
+        if self.closed:
+            return
+        self.closed = True
+        while not self.queue.empty():
+            self.queue.get_nowait()
+        self.queue.put_nowait(None)
+
+    async def get(self, timeout):
+        """Espera el siguiente evento; lanza asyncio.TimeoutError."""
+        return await asyncio.wait_for(self.queue.get(), timeout)
+
+
+class EventBroker:
+    """
+    Reparte los eventos de LISTEN entre las suscripciones del proceso.
+    """
+
+    def __init__(self, channel=CHANNEL, using='default'):
+        self.channel = channel
+        self.using = using
+        self.subscriptions = set()
+        self.connection = None
+        self.loop = None
+        self._lock = None
+
+    def _connect(self):
+        params = connections[self.using].get_connection_params()
+        connection = psycopg2.connect(**params)
+        connection.set_isolation_level(psycopg2.extensions.ISOLATION_LEVEL_AUTOCOMMIT)
+        with connection.cursor() as cursor:
+            cursor.execute(f'LISTEN {self.channel}')
+        return connection
+
+    async def _listen(self):
+        """Abre la conexión LISTEN en el event loop actual si no existe."""
+        loop = asyncio.get_running_loop()
+        if self.loop is not loop:
+            # Primer uso o un event loop nuevo: lo anterior ya no sirve
+            self._close_connection()
+            self.loop = loop
+            self._lock = asyncio.Lock()
+
+        async with self._lock:
+            if self.connection is None:
+                self.connection = await loop.run_in_executor(None, self._connect)
+                loop.add_reader(self.connection.fileno(), self._on_readable)
+
+    def _on_readable(self):
+        try:
+            self.connection.poll()
+        except psycopg2.Error:
+            self._disconnect()
+            return
+
+        while self.connection.notifies:
+            notify = self.connection.notifies.pop(0)
+            try:
+                event = json.loads(notify.payload)
+            except ValueError:
+                continue
+            for subscription in list(self.subscriptions):
+                if subscription.match(event):
+                    subscription.put(event)
+
+    def _close_connection(self):
+        if self.connection is None:
+            return
+        if self.loop is not None and not self.loop.is_closed():
+            self.loop.remove_reader(self.connection.fileno())
+        try:
+            self.connection.close()
+        except psycopg2.Error:
+            pass
+        self.connection = None
+
+    def _disconnect(self):
+        """Cierra la conexión y todas las suscripciones."""
+        self._close_connection()
+        for subscription in self.subscriptions:
+            subscription.close()
+        self.subscriptions.clear()
+
+    async def subscribe(self, match):
+        """
+        Retorna una suscripción a los eventos que cumplen ``match``.
+
+        Cuando retorna, LISTEN ya está activo: no se pierde ningún evento
+        confirmado después de la suscripción.
+        """
+        await self._listen()
+        subscription = Subscription(match)
+        self.subscriptions.add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription):
+        subscription.closed = True
+        self.subscriptions.discard(subscription)
+        if not self.subscriptions:
+            self._close_connection()
+
+
+broker = EventBroker()
+
+
+def format_event(event):
+    """Formatea un evento como mensaje SSE."""
+    data = json.dumps(event, separators=(',', ':'))
+    return f"event: {event['event']}\ndata: {data}\n\n"
+
+
+class DisconnectMiddleware:
+    """
+    Middleware ASGI que cancela las conexiones de ``path_prefix`` cuando
+    el cliente se desconecta.
+
+    Django 4.2 no lee ``http.disconnect`` mientras envía una respuesta
+    streaming, y uvicorn descarta sin error lo que se envía a un cliente
+    desconectado: sin este middleware la suscripción seguiría abierta
+    hasta SSE_MAX_AGE. Al cancelar, el ``finally`` del stream la libera.
+    """
+
+    def __init__(self, app, path_prefix='/api/events/'):
+        self.app = app
+        self.path_prefix = path_prefix
+
+    async def __call__(self, scope, receive, send):
+        if scope['type'] != 'http' or not scope['path'].startswith(self.path_prefix):
+            return await self.app(scope, receive, send)
+
+        body_received = asyncio.Event()
+
+        async def receive_body():
+            message = await receive()
+            if message['type'] != 'http.request' or not message.get('more_body', False):
+                body_received.set()
+            return message
+
+        async def wait_disconnect():
+            # Django ya leyó el cuerpo: lo siguiente solo puede ser la desconexión
+            await body_received.wait()
+            while (await receive())['type'] != 'http.disconnect':
+                pass
+
+        handler = asyncio.ensure_future(self.app(scope, receive_body, send))
+        disconnect = asyncio.ensure_future(wait_disconnect())
+        try:
+            await asyncio.wait([handler, disconnect], return_when=asyncio.FIRST_COMPLETED)
+        finally:
+            disconnect.cancel()
+            if not handler.done():
+                handler.cancel()
+        try:
+            await handler
+        except asyncio.CancelledError:
+            if not disconnect.done() or disconnect.cancelled():
+                raise
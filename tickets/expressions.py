@@ -0,0 +1,18 @@
+"""
+Expresiones de consulta reutilizables.
+"""
+from django.db.models import ExpressionWrapper
+from django.db.models.expressions import Col
+
+
+class RowExpression(ExpressionWrapper):
+    """
+    Expresión calculada solo con columnas de la fila.
+
+    Junto a un agregado (por ejemplo ``comments_count``), Django agrupa
+    por la expresión completa; aquí agrupa por sus columnas, que
+    PostgreSQL reduce a la clave primaria del ticket.
+    """
+
+    def get_group_by_cols(self):
+        return [expression for expression in self.flatten() if isinstance(expression, Col)]
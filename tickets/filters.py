@@ -0,0 +1,138 @@
+"""
+Backends de filtrado para la API de tickets.
+"""
+import re
+from datetime import timedelta
+
+from django.contrib.postgres.search import SearchHeadline, SearchQuery, SearchRank
+from django.db.models import F, FloatField, TextField
+from django.template import loader
+from rest_framework import filters
+from rest_framework.exceptions import ValidationError
+from rest_framework.settings import api_settings
+
+from . import sla
+from .expressions import RowExpression
+
+
+class FullTextSearchFilter(filters.SearchFilter):
+    """
+    Búsqueda de texto completo de PostgreSQL.
+
+    Sustituye los ``icontains`` de SearchFilter por una consulta sobre la
+    columna ``tsvector`` indexada con GIN. Los resultados se anotan con
+    ``search_rank`` y ``search_headline`` (fragmento resaltado con
+    ``<mark>``) y, si el cliente no pide otro orden con ``?ordering=``,
+    se ordenan por relevancia. Por eso este backend debe ir después de
+    OrderingFilter.
+
+    Las dos anotaciones son RowExpression: junto a un agregado (por
+    ejemplo ``comments_count``) no entran en el GROUP BY, así que
+    PostgreSQL calcula el fragmento solo para las filas de la página y no
+    para cada fila que coincide.
+
+    Atributos de la vista:
+    - search_vector_field: columna ``tsvector`` (por defecto 'search_vector')
+    - search_headline_field: campo de texto para el fragmento resaltado
+    - search_id_field: campo para búsquedas exactas ``#123`` (opcional)
+    """
+    search_config = 'spanish'
+    id_pattern = re.compile(r'^#(\d+)$')
+    headline_options = {
+        'start_sel': '<mark>',
+        'stop_sel': '</mark>',
+        'max_words': 35,
+        'min_words': 15,
+    }
+
+    def get_search_text(self, request):
+        """Retorna el texto de búsqueda completo, sin dividir en términos."""
+        return request.query_params.get(self.search_param, '').strip()
+
+    def filter_queryset(self, request, queryset, view):
+        text = self.get_search_text(request)
+        if not text:
+            return queryset
+
+        # Búsqueda exacta por ID: "#123"
+        id_field = getattr(view, 'search_id_field', None)
+        match = self.id_pattern.match(text)
+        if id_field and match:
+            return queryset.filter(**{id_field: int(match.group(1))})
+
+        vector_field = getattr(view, 'search_vector_field', 'search_vector')
+        query = SearchQuery(text, config=self.search_config, search_type='websearch')
+
+        queryset = queryset.filter(**{vector_field: query}).annotate(
+            search_rank=RowExpression(SearchRank(F(vector_field), query), output_field=FloatField())
+        )
+
+        headline_field = getattr(view, 'search_headline_field', None)
+        if headline_field:
+            queryset = queryset.annotate(
+                search_headline=RowExpression(
+                    SearchHeadline(
+                        headline_field,
+                        query,
+                        config=self.search_config,
+                        **self.headline_options
+                    ),
+                    output_field=TextField()
+                )
+            )
+
+        if api_settings.ORDERING_PARAM not in request.query_params:
+            queryset = queryset.order_by('-search_rank', *queryset.query.order_by)
+
+        return queryset
+
+    def to_html(self, request, queryset, view):
+        context = {
+            'param': self.search_param,
+            'term': self.get_search_text(request),
+        }
+        template = loader.get_template(self.template)
+        return template.render(context)
+
+
+class TicketAgeFilter(filters.BaseFilterBackend):
+    """
+    Filtros por edad y SLA de los tickets (ver tickets/sla.py).
+
+    - ?sla_breached=true - Tickets que incumplen su SLA (false: los demás)
+    - ?min_days_open=3 - Abiertos (o resueltos en) al menos 3 días
+    - ?max_days_open=7 - Abiertos (o resueltos en) como máximo 7 días
+
+    Las condiciones son rangos sobre columnas, así que PostgreSQL las
+    resuelve con los índices parciales de Ticket en lugar de recorrer la
+    tabla.
+    """
+    boolean_values = {'true': True, '1': True, 'false': False, '0': False}
+
+    def get_days(self, request, param):
+        value = request.query_params.get(param, '').strip()
+        if not value:
+            return None
+        if not value.isdigit():
+            raise ValidationError({param: ['Debe ser un número entero positivo.']})
+        return int(value)
+
+    def filter_queryset(self, request, queryset, view):
+        breached = request.query_params.get('sla_breached', '').strip().lower()
+        if breached:
+            if breached not in self.boolean_values:
+                raise ValidationError({'sla_breached': ['Usa true o false.']})
+            if self.boolean_values[breached]:
+                queryset = queryset.filter(sla.breached_q())
+            else:
+                queryset = queryset.exclude(sla.breached_q())
+
+        min_days = self.get_days(request, 'min_days_open')
+        if min_days:
+            queryset = queryset.filter(sla.age_at_least_q(timedelta(days=min_days)))
+
+        max_days = self.get_days(request, 'max_days_open')
+        if max_days is not None:
+            queryset = queryset.exclude(sla.age_at_least_q(timedelta(days=max_days + 1)))
+
+        return queryset
@@ -0,0 +1,584 @@
+"""
+Importación masiva de tickets y comentarios.
+
+Lee CSV o NDJSON en streaming y procesa las filas por lotes:
+
+1. Valida cada fila con las mismas reglas que los serializadores
+   (validate_title, validate_description, validate_content).
+2. Carga el lote válido con COPY en una tabla temporal de staging.
+3. Descarta las filas que chocan con datos existentes (ID duplicado,
+   ticket inexistente) y las reporta como rechazadas.
+4. Inserta el resto con un solo INSERT ... SELECT y actualiza los
+   contadores del dashboard en la misma sentencia.
+
+Cada lote se confirma en su propia transacción, de modo que la memoria
+usada depende del tamaño del lote y no del archivo. No se ejecutan
+Ticket.save() ni los signals de post_save, y no se publican eventos en
+vivo (tickets.skip_notify).
+
+Con ``auto_assign`` (``--auto-assign``), los tickets no cerrados sin
+asignar reciben un agente al validar el lote (ver tickets/assignment.py).
+
+Rendimiento: el objetivo era 50.000 filas/s y no se alcanza; con 100.000
+tickets la importación ronda las 18.000 filas/s. Más de la mitad del
+tiempo es el INSERT ... SELECT en PostgreSQL, que mantiene los 17 índices
+de tickets_ticket (incluido el GIN de búsqueda): solo esa sentencia queda
+por debajo de 30.000 filas/s. El COPY en sí es una fracción menor (COPY
+binario no cambiaría el total) y la validación en Python, que no se omite
+para ninguna columna, cuesta alrededor de un tercio. Llegar al objetivo
+exigiría quitar y recrear los índices alrededor de la importación, lo que
+bloquea la tabla para el resto de la API.
+"""
+import csv
+import io
+import json
+
+from django.contrib.auth.models import User
+from django.db import connections, router, transaction
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+from rest_framework import serializers
+
+from .assignment import get_strategy
+from .cache import ticket_detail_cache
+from .models import ArchivedComment, ArchivedTicket, Comment, Ticket, TicketCounter
+from .serializers import CommentSerializer, TicketCreateSerializer
+
+
+FORMATS = ['csv', 'ndjson']
+
+
+def read_rows(stream, format):
+    """
+    Genera ``(línea, fila)`` a partir de un stream de texto.
+
+    En CSV la primera línea es el encabezado; en NDJSON cada línea es un
+    objeto JSON. Las líneas que no se pueden leer se generan con ``None``
+    como fila.
+    """
+    if format == 'csv':
+        reader = csv.DictReader(stream)
+        for row in reader:
+            yield reader.line_num, row
+    elif format == 'ndjson':
+        for line_num, line in enumerate(stream, start=1):
+            if not line.strip():
+                continue
+            try:
+                row = json.loads(line)
+            except ValueError:
+                row = None
+            yield line_num, row if isinstance(row, dict) else None
+    else:
+        raise ValueError(f'Formato desconocido: {format}')
+
+
+class RowError(Exception):
+    """Error de validación de una fila."""
+
+
+class BaseImporter:
+    """
+    Importador por lotes con COPY.
+
+    Las subclases definen la tabla de staging (``staging_columns``), la
+    validación de cada fila (``clean_row``) y la sentencia que pasa las
+    filas de staging a la tabla definitiva (``merge``).
+    """
+    model = None
+    # Tabla de archivo del modelo: sus IDs tampoco se pueden reutilizar
+    archived_model = None
+    staging_table = None
+    staging_columns = []
+
+    def __init__(self, batch_size=10000, on_reject=None, using=None):
+        self.batch_size = batch_size
+        self.on_reject = on_reject or (lambda line, errors: None)
+        self.using = using or router.db_for_write(self.model)
+        self.connection = connections[self.using]
+        self.result = {'total': 0, 'imported': 0, 'rejected': 0}
+
+    # -- Validación ---------------------------------------------------------
+
+    def reject(self, line, errors):
+        self.result['rejected'] += 1
+        self.on_reject(line, errors)
+
+    def run_validator(self, validator, value, errors, field):
+        """Ejecuta un validador de serializador y acumula su error."""
+        if value is not None and not isinstance(value, str):
+            value = str(value)
+        try:
+            return validator(value)
+        except serializers.ValidationError as exc:
+            errors[field] = [str(detail) for detail in exc.detail]
+            return None
+
+    @staticmethod
+    def clean_datetime(value, errors, field):
+        if value in (None, ''):
+            return None
+        parsed = parse_datetime(str(value))
+        if parsed is None:
+            errors[field] = ['Fecha no válida.']
+            return None
+        if timezone.is_naive(parsed):
+            parsed = timezone.make_aware(parsed)
+        return parsed
+
+    @staticmethod
+    def clean_id(value, errors, field, required=False):
+        if value in (None, ''):
+            if required:
+                errors[field] = ['Este campo es requerido.']
+            return None
+        try:
+            value = int(value)
+        except (TypeError, ValueError):
+            errors[field] = ['Debe ser un número entero.']
+            return None
+        if value < 1:
+            errors[field] = ['Debe ser un número positivo.']
+            return None
+        return value
+
+    @staticmethod
+    def clean_choice(value, choices, default, errors, field):
+        if value in (None, ''):
+            return default
+        value = str(value)
+        if value not in dict(choices):
+            errors[field] = [f'"{value}" no es una opción válida.']
+        return value
+
+    @staticmethod
+    def username(row, key):
+        """Retorna el username de la columna ``key`` o None si está vacía."""
+        value = row.get(key)
+        return str(value) if value not in (None, '') else None
+
+    def clean_row(self, row, users):
+        """
+        Retorna la tupla de columnas de staging para ``row``.
+
+        Lanza RowError con un diccionario de errores si la fila no es válida.
+        """
+        raise NotImplementedError
+
+    def usernames(self, row):
+        """Retorna los nombres de usuario referenciados por ``row``."""
+        raise NotImplementedError
+
+    def prepare(self, rows):
+        """Ajusta las filas válidas del lote antes de cargarlas."""
+        return rows
+
+    # -- Carga --------------------------------------------------------------
+
+    def create_staging_table(self, cursor):
+        columns = ', '.join(f'{name} {type}' for name, type in self.staging_columns)
+        cursor.execute(
+            f'CREATE TEMP TABLE IF NOT EXISTS {self.staging_table} '
+            f'(line integer, {columns})'
+        )
+
+    def copy_batch(self, cursor, rows):
+        """Carga ``rows`` en la tabla de staging con COPY."""
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        for row in rows:
+            writer.writerow([
+                value.isoformat() if hasattr(value, 'isoformat') else value
+                for value in row
+            ])
+        buffer.seek(0)
+
+        columns = ', '.join(['line'] + [name for name, _ in self.staging_columns])
+        cursor.execute(f'TRUNCATE {self.staging_table}')
+        cursor.copy_expert(
+            f'COPY {self.staging_table} ({columns}) FROM STDIN WITH (FORMAT csv)',
+            buffer
+        )
+
+    def discard_conflicts(self, cursor):
+        """
+        Elimina de staging las filas que no se pueden insertar.
+
+        Retorna una lista de ``(línea, mensaje)``.
+        """
+        return []
+
+    def merge(self, cursor):
+        """Inserta las filas de staging y retorna cuántas se insertaron."""
+        raise NotImplementedError
+
+    def sync_sequence(self, cursor):
+        """Ajusta la secuencia del ID tras insertar IDs explícitos."""
+        table = self.model._meta.db_table
+        cursor.execute("SELECT pg_get_serial_sequence(%s, 'id')", [table])
+        sequence = cursor.fetchone()[0]
+        archived = ''
+        if self.archived_model is not None:
+            archived = f'(SELECT MAX(id) FROM {self.archived_model._meta.db_table}), '
+        cursor.execute(
+            f'SELECT setval(%s, GREATEST((SELECT MAX(id) FROM {table}), {archived}'
+            f'(SELECT last_value FROM {sequence})))',
+            [sequence]
+        )
+
+    def process_batch(self, batch):
+        """Valida y carga un lote de ``(línea, fila)``."""
+        names = set()
+        for _, row in batch:
+            if row is not None:
+                names.update(self.usernames(row))
+        users = dict(
+            User.objects.using(self.using)
+            .filter(username__in=names)
+            .values_list('username', 'pk')
+        )
+
+        valid = []
+        for line, row in batch:
+            if row is None:
+                self.reject(line, {'non_field_errors': ['Fila no válida.']})
+                continue
+            try:
+                valid.append((line, *self.clean_row(row, users)))
+            except RowError as exc:
+                self.reject(line, exc.args[0])
+
+        if not valid:
+            return
+
+        with transaction.atomic(using=self.using), self.connection.cursor() as cursor:
+            # Un lote perdido por una caída se puede volver a importar; no
+            # hace falta esperar a que el WAL llegue a disco en cada commit.
+            cursor.execute('SET LOCAL synchronous_commit = off')
+            # En la transacción del lote: la asignación automática se
+            # serializa hasta que se insertan sus tickets
+            valid = self.prepare(valid)
+            self.create_staging_table(cursor)
+            self.copy_batch(cursor, valid)
+            for line, message in self.discard_conflicts(cursor):
+                self.reject(line, {'non_field_errors': [message]})
+            self.result['imported'] += self.merge(cursor)
+            if any(row[1] is not None for row in valid):
+                self.sync_sequence(cursor)
+
+    def run(self, rows):
+        """
+        Importa ``rows`` (iterable de ``(línea, fila)``) y retorna un
+        resumen con el total de filas, las importadas y las rechazadas.
+        """
+        batch = []
+        for item in rows:
+            self.result['total'] += 1
+            batch.append(item)
+            if len(batch) >= self.batch_size:
+                self.process_batch(batch)
+                batch = []
+        if batch:
+            self.process_batch(batch)
+        return self.result
+
+
+class TicketImporter(BaseImporter):
+    """
+    Importa tickets.
+
+    Columnas: id (opcional, conserva el ID original), title, description,
+    status, priority, created_by (username), assigned_to (username,
+    opcional), created_at y closed_at (ISO 8601, opcionales).
+    """
+    model = Ticket
+    archived_model = ArchivedTicket
+    staging_table = 'tickets_import_ticket'
+    staging_columns = [
+        ('id', 'bigint'),
+        ('title', 'text'),
+        ('description', 'text'),
+        ('status', 'text'),
+        ('priority', 'text'),
+        ('created_by_id', 'bigint'),
+        ('assigned_to_id', 'bigint'),
+        ('created_at', 'timestamptz'),
+        ('closed_at', 'timestamptz'),
+    ]
+
+    def __init__(self, *args, auto_assign=False, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.validators = TicketCreateSerializer()
+        # Con auto_assign, los tickets no cerrados sin asignar reciben un
+        # agente de TICKETS_AUTO_ASSIGN (ver tickets/assignment.py)
+        self.strategy = get_strategy(using=self.using) if auto_assign else None
+
+    def usernames(self, row):
+        names = [self.username(row, key) for key in ('created_by', 'assigned_to')]
+        return [name for name in names if name]
+
+    def clean_row(self, row, users):
+        errors = {}
+
+        pk = self.clean_id(row.get('id'), errors, 'id')
+        title = self.run_validator(
+            self.validators.validate_title, row.get('title'), errors, 'title'
+        )
+        if title and len(title) > Ticket._meta.get_field('title').max_length:
+            errors['title'] = ['El título no puede exceder 200 caracteres.']
+        description = self.run_validator(
+            self.validators.validate_description, row.get('description'), errors, 'description'
+        )
+        status = self.clean_choice(
+            row.get('status'), Ticket.STATUS_CHOICES, 'abierto', errors, 'status'
+        )
+        priority = self.clean_choice(
+            row.get('priority'), Ticket.PRIORITY_CHOICES, 'media', errors, 'priority'
+        )
+
+        created_by = users.get(self.username(row, 'created_by'))
+        if created_by is None:
+            errors['created_by'] = ['Usuario no encontrado.']
+        assigned_to = None
+        if self.username(row, 'assigned_to'):
+            assigned_to = users.get(self.username(row, 'assigned_to'))
+            if assigned_to is None:
+                errors['assigned_to'] = ['Usuario no encontrado.']
+
+        created_at = self.clean_datetime(row.get('created_at'), errors, 'created_at')
+        closed_at = self.clean_datetime(row.get('closed_at'), errors, 'closed_at')
+
+        if errors:
+            raise RowError(errors)
+
+        return (
+            pk, title, description, status, priority,
+            created_by, assigned_to, created_at, closed_at,
+        )
+
+    def prepare(self, rows):
+        if self.strategy is None:
+            return rows
+        # Columnas: (línea, id, título, descripción, estado, prioridad,
+        # creador, asignado, ...)
+        pending = [i for i, row in enumerate(rows) if row[7] is None and row[4] != 'cerrado']
+        agents = self.strategy.choose([rows[i][6] for i in pending])
+        for i, agent in zip(pending, agents):
+            rows[i] = (*rows[i][:7], agent, *rows[i][8:])
+        return rows
+
+    def discard_conflicts(self, cursor):
+        table = Ticket._meta.db_table
+        archived = ArchivedTicket._meta.db_table
+        cursor.execute(
+            f"""
+            DELETE FROM {self.staging_table} s
+            WHERE s.id IS NOT NULL AND (
+                EXISTS (SELECT 1 FROM {table} t WHERE t.id = s.id)
+                OR EXISTS (SELECT 1 FROM {archived} a WHERE a.id = s.id)
+                OR EXISTS (
+                    SELECT 1 FROM {self.staging_table} d
+                    WHERE d.id = s.id AND d.line < s.line
+                )
+            )
+            RETURNING s.line
+            """
+        )
+        return [(line, 'El ID ya existe.') for line, in cursor.fetchall()]
+
+    def merge(self, cursor):
+        # El INSERT y la actualización de contadores van en una sola
+        # sentencia: los contadores se agregan desde las filas insertadas.
+        # Los tickets nuevos aún no tienen comentarios, así que el vector de
+        # búsqueda se calcula aquí en lugar de en el trigger por fila.
+        table = Ticket._meta.db_table
+        counters = TicketCounter._meta.db_table
+        cursor.execute("SET LOCAL tickets.skip_search_refresh = 'on'")
+        cursor.execute("SET LOCAL tickets.skip_notify = 'on'")
+        cursor.execute(
+            f"""
+            WITH inserted AS (
+                INSERT INTO {table} (
+                    id, title, description, status, priority,
+                    created_by_id, assigned_to_id,
+                    created_at, updated_at, closed_at, search_vector
+                )
+                SELECT
+                    COALESCE(s.id, nextval(pg_get_serial_sequence(%s, 'id'))),
+                    s.title, s.description, s.status, s.priority,
+                    s.created_by_id, s.assigned_to_id,
+                    COALESCE(s.created_at, now()), now(),
+                    CASE WHEN s.status = 'cerrado'
+                        THEN COALESCE(s.closed_at, s.created_at, now())
+                    END,
+                    setweight(to_tsvector('spanish', s.title), 'A')
+                        || setweight(to_tsvector('spanish', s.description), 'B')
+                FROM {self.staging_table} s
+                ORDER BY s.line
+                RETURNING status, priority, assigned_to_id, created_by_id
+            ),
+            deltas AS (
+                SELECT %s AS scope, 0::bigint AS user_id, status, priority, COUNT(*) AS count
+                FROM inserted GROUP BY status, priority
+                UNION ALL
+                SELECT %s, COALESCE(assigned_to_id, 0), status, priority, COUNT(*)
+                FROM inserted GROUP BY COALESCE(assigned_to_id, 0), status, priority
+                UNION ALL
+                SELECT %s, created_by_id, status, priority, COUNT(*)
+                FROM inserted GROUP BY created_by_id, status, priority
+            ),
+            counted AS (
+                INSERT INTO {counters} (scope, user_id, status, priority, count)
+                SELECT * FROM deltas
+                ORDER BY scope, user_id, status, priority
+                ON CONFLICT (scope, user_id, status, priority)
+                DO UPDATE SET count = {counters}.count + EXCLUDED.count
+            )
+            SELECT COUNT(*) FROM inserted
+            """,
+            [
+                table,
+                TicketCounter.SCOPE_ALL,
+                TicketCounter.SCOPE_ASSIGNED_TO,
+                TicketCounter.SCOPE_CREATED_BY,
+            ]
+        )
+        inserted = cursor.fetchone()[0]
+        cursor.execute("SET LOCAL tickets.skip_search_refresh = 'off'")
+        cursor.execute("SET LOCAL tickets.skip_notify = 'off'")
+        return inserted
+
+
+class CommentImporter(BaseImporter):
+    """
+    Importa comentarios.
+
+    Columnas: id (opcional), ticket (ID del ticket), author (username),
+    content, is_internal (true/false, opcional) y created_at (ISO 8601,
+    opcional). Los adjuntos no se importan.
+    """
+    model = Comment
+    archived_model = ArchivedComment
+    staging_table = 'tickets_import_comment'
+    staging_columns = [
+        ('id', 'bigint'),
+        ('ticket_id', 'bigint'),
+        ('author_id', 'bigint'),
+        ('content', 'text'),
+        ('is_internal', 'boolean'),
+        ('created_at', 'timestamptz'),
+    ]
+    true_values = ('true', '1', 'yes', 'si', 'sí')
+    false_values = ('false', '0', 'no', '', 'none')
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.validators = CommentSerializer()
+
+    def usernames(self, row):
+        name = self.username(row, 'author')
+        return [name] if name else []
+
+    def clean_row(self, row, users):
+        errors = {}
+
+        pk = self.clean_id(row.get('id'), errors, 'id')
+        ticket = self.clean_id(row.get('ticket'), errors, 'ticket', required=True)
+        author = users.get(self.username(row, 'author'))
+        if author is None:
+            errors['author'] = ['Usuario no encontrado.']
+        content = self.run_validator(
+            self.validators.validate_content, row.get('content'), errors, 'content'
+        )
+
+        is_internal = str(row.get('is_internal')).strip().lower()
+        if is_internal in self.true_values:
+            is_internal = True
+        elif is_internal in self.false_values:
+            is_internal = False
+        else:
+            errors['is_internal'] = ['Debe ser true o false.']
+
+        created_at = self.clean_datetime(row.get('created_at'), errors, 'created_at')
+
+        if errors:
+            raise RowError(errors)
+
+        return pk, ticket, author, content, is_internal, created_at
+
+    def discard_conflicts(self, cursor):
+        table = Comment._meta.db_table
+        archived = ArchivedComment._meta.db_table
+        tickets = Ticket._meta.db_table
+        cursor.execute(
+            f"""
+            DELETE FROM {self.staging_table} s
+            WHERE NOT EXISTS (SELECT 1 FROM {tickets} t WHERE t.id = s.ticket_id)
+            RETURNING s.line
+            """
+        )
+        rejected = [(line, 'El ticket no existe.') for line, in cursor.fetchall()]
+        cursor.execute(
+            f"""
+            DELETE FROM {self.staging_table} s
+            WHERE s.id IS NOT NULL AND (
+                EXISTS (SELECT 1 FROM {table} c WHERE c.id = s.id)
+                OR EXISTS (SELECT 1 FROM {archived} a WHERE a.id = s.id)
+                OR EXISTS (
+                    SELECT 1 FROM {self.staging_table} d
+                    WHERE d.id = s.id AND d.line < s.line
+                )
+            )
+            RETURNING s.line
+            """
+        )
+        rejected += [(line, 'El ID ya existe.') for line, in cursor.fetchall()]
+        return rejected
+
+    def merge(self, cursor):
+        table = Comment._meta.db_table
+        tickets = Ticket._meta.db_table
+
+        # El vector de búsqueda de cada ticket se recalcula una sola vez al
+        # final del lote en lugar de una vez por comentario.
+        cursor.execute("SET LOCAL tickets.skip_search_refresh = 'on'")
+        cursor.execute("SET LOCAL tickets.skip_notify = 'on'")
+        cursor.execute(
+            f"""
+            INSERT INTO {table} (
+                id, ticket_id, author_id, content, is_internal,
+                attachment_variants, created_at, updated_at
+            )
+            SELECT
+                COALESCE(s.id, nextval(pg_get_serial_sequence(%s, 'id'))),
+                s.ticket_id, s.author_id, s.content, s.is_internal,
+                '{{}}'::jsonb, COALESCE(s.created_at, now()), COALESCE(s.created_at, now())
+            FROM {self.staging_table} s
+            ORDER BY s.line
+            """,
+            [table]
+        )
+        inserted = cursor.rowcount
+        cursor.execute("SET LOCAL tickets.skip_search_refresh = 'off'")
+        cursor.execute("SET LOCAL tickets.skip_notify = 'off'")
+
+        cursor.execute(
+            f"""
+            UPDATE {tickets} t
+            SET search_vector = tickets_ticket_document(t.id, t.title, t.description)
+            WHERE t.id IN (SELECT DISTINCT ticket_id FROM {self.staging_table})
+            RETURNING t.id
+            """
+        )
+        ticket_ids = [pk for pk, in cursor.fetchall()]
+        transaction.on_commit(
+            lambda: ticket_detail_cache.invalidate_tickets(ticket_ids),
+            using=self.using
+        )
+        return inserted
+
+
+IMPORTERS = {
+    'tickets': TicketImporter,
+    'comments': CommentImporter,
+}
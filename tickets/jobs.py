@@ -0,0 +1,333 @@
+"""
+Tareas en segundo plano sobre PostgreSQL, sin Redis ni broker.
+
+Una tarea es una función registrada con ``@task``; ``enqueue`` inserta
+una fila Job en la transacción actual, así que la tarea solo existe si la
+transacción se confirma (y nunca ve datos que no se confirmaron). Los
+workers (``manage.py run_jobs``) reclaman las filas con
+``FOR UPDATE SKIP LOCKED`` y despiertan con NOTIFY en cuanto se encola
+algo.
+
+    @task(max_attempts=3)
+    def notify_assignee(ticket_id):
+        ...
+
+    notify_assignee.enqueue(ticket_id=ticket.pk)
+    notify_assignee.enqueue(delay=timedelta(minutes=5), ticket_id=ticket.pk)
+
+Además:
+
+- Reintentos: si la tarea lanza una excepción se reintenta con espera
+  exponencial (``backoff``) hasta ``max_attempts`` veces.
+- Tareas programadas: ``run_at``/``delay`` al encolar, o ``every`` para
+  tareas periódicas que los workers mantienen encoladas.
+- Tareas únicas: con ``singleton=True`` (implícito en las periódicas) la
+  tarea toma un advisory lock de PostgreSQL y nunca corren dos a la vez;
+  si el lock está tomado, se pospone sin contar el intento.
+- Modo local (TICKETS_JOBS_LOCAL = True, para pruebas y desarrollo): la
+  tarea se ejecuta al confirmar la transacción, en el mismo hilo.
+
+Los argumentos se guardan como JSON: se pasan IDs, no instancias.
+"""
+import logging
+import os
+import random
+import select
+import signal
+import socket
+import threading
+import traceback
+from contextlib import contextmanager
+from datetime import timedelta
+
+import psycopg2
+from django.conf import settings
+from django.db import close_old_connections, connections, router, transaction
+from django.utils import timezone
+
+from .models import Job
+
+
+logger = logging.getLogger(__name__)
+
+CHANNEL = 'tickets_jobs'
+
+# Espera antes del reintento n: BACKOFF_BASE * 2 ** (n - 1), hasta BACKOFF_MAX
+BACKOFF_BASE = timedelta(seconds=10)
+BACKOFF_MAX = timedelta(hours=1)
+
+# Espera de una tarea única cuyo lock está tomado
+SINGLETON_RETRY = timedelta(seconds=30)
+
+# Advisory lock con el que los workers programan las tareas periódicas
+SCHEDULE_LOCK = 'tickets.jobs:schedule'
+
+TASKS = {}
+
+
+class Task:
+    """Función registrada como tarea (ver ``task``)."""
+
+    def __init__(self, func, name, max_attempts, singleton, every):
+        self.func = func
+        self.name = name
+        self.max_attempts = max_attempts
+        self.singleton = singleton or every is not None
+        self.every = every
+        self.__doc__ = func.__doc__
+
+    def __call__(self, *args, **kwargs):
+        return self.func(*args, **kwargs)
+
+    def __repr__(self):
+        return f'<Task {self.name}>'
+
+    def enqueue(self, run_at=None, delay=None, **kwargs):
+        return enqueue(self, run_at=run_at, delay=delay, **kwargs)
+
+
+def task(name=None, max_attempts=5, singleton=False, every=None):
+    """
+    Registra una función como tarea.
+
+    ``name`` identifica la tarea en la tabla (por defecto
+    ``<módulo>.<función>``): cambiarlo deja huérfanas las filas
+    pendientes. ``every`` (timedelta) la vuelve periódica.
+    """
+    def decorator(func):
+        task_name = name or f'{func.__module__}.{func.__name__}'
+        if task_name in TASKS:
+            raise ValueError(f'La tarea {task_name} ya está registrada.')
+        TASKS[task_name] = Task(func, task_name, max_attempts, singleton, every)
+        return TASKS[task_name]
+    return decorator
+
+
+def enqueue(task, run_at=None, delay=None, **kwargs):
+    """
+    Encola ``task`` (Task o nombre) con ``kwargs`` en la transacción
+    actual. Retorna el Job.
+    """
+    task = TASKS[task] if isinstance(task, str) else task
+    if run_at is None:
+        run_at = timezone.now() + (delay or timedelta(0))
+
+    job = Job.objects.create(
+        task=task.name,
+        kwargs=kwargs,
+        run_at=run_at,
+        max_attempts=task.max_attempts
+    )
+
+    if getattr(settings, 'TICKETS_JOBS_LOCAL', False):
+        if run_at <= timezone.now():
+            transaction.on_commit(lambda: run_pending(pk=job.pk))
+    else:
+        # NOTIFY se entrega al confirmar la transacción
+        with connections[_using()].cursor() as cursor:
+            cursor.execute('SELECT pg_notify(%s, %s)', [CHANNEL, task.name])
+    return job
+
+
+def backoff(attempts):
+    """Espera antes de reintentar una tarea que falló ``attempts`` veces."""
+    delay = min(BACKOFF_BASE * 2 ** (attempts - 1), BACKOFF_MAX)
+    # Hasta 10% aleatorio para no reintentar todas a la vez
+    return delay * (1 + random.random() / 10)
+
+
+@contextmanager
+def advisory_lock(key):
+    """
+    Intenta tomar el advisory lock ``key`` en la conexión actual; produce
+    True si lo obtuvo. Se libera al salir.
+    """
+    using = _using()
+    with connections[using].cursor() as cursor:
+        cursor.execute('SELECT pg_try_advisory_lock(hashtext(%s))', [key])
+        acquired = cursor.fetchone()[0]
+    try:
+        yield acquired
+    finally:
+        if acquired:
+            with connections[using].cursor() as cursor:
+                cursor.execute('SELECT pg_advisory_unlock(hashtext(%s))', [key])
+
+
+def run_job(job):
+    """Ejecuta una tarea ya reclamada y registra su resultado."""
+    task = TASKS.get(job.task)
+    if task is None:
+        job.fail(f'Tarea desconocida: {job.task}')
+        return
+
+    if not task.singleton:
+        _execute(task, job)
+        return
+
+    with advisory_lock(f'tickets.jobs:{task.name}') as acquired:
+        if not acquired:
+            # Otra ejecución sigue en curso: se pospone sin contar el intento
+            job.retry(timezone.now() + SINGLETON_RETRY, count_attempt=False)
+            return
+        _execute(task, job)
+
+
+def _execute(task, job):
+    try:
+        task.func(**job.kwargs)
+    except Exception:
+        error = traceback.format_exc()
+        logger.exception('La tarea %s #%s falló (intento %s)', job.task, job.pk, job.attempts)
+        if job.attempts < job.max_attempts:
+            job.retry(timezone.now() + backoff(job.attempts), error)
+        else:
+            job.fail(error)
+        return
+
+    with transaction.atomic(using=_using()):
+        job.finish()
+        if task.every is not None:
+            enqueue(task, run_at=timezone.now() + task.every)
+
+
+def run_pending(worker=None, limit=None, pk=None):
+    """
+    Ejecuta en el hilo actual las tareas vencidas (o solo la tarea ``pk``)
+    hasta que no quede ninguna o se alcance ``limit``. Retorna cuántas
+    ejecutó.
+    """
+    worker = worker or worker_name()
+    count = 0
+    while limit is None or count < limit:
+        jobs = Job.claim(worker, pk=pk)
+        if not jobs:
+            break
+        run_job(jobs[0])
+        count += 1
+    return count
+
+
+def schedule_periodic():
+    """
+    Encola las tareas periódicas que no tengan una fila pendiente o en
+    ejecución. Retorna cuántas encoló.
+    """
+    periodic = [task for task in TASKS.values() if task.every is not None]
+    if not periodic:
+        return 0
+
+    using = _using()
+    with transaction.atomic(using=using), connections[using].cursor() as cursor:
+        # Un solo worker a la vez, para no encolarlas dos veces
+        cursor.execute('SELECT pg_advisory_xact_lock(hashtext(%s))', [SCHEDULE_LOCK])
+        scheduled = set(Job.objects.using(using).filter(
+            task__in=[task.name for task in periodic],
+            status__in=[Job.STATUS_PENDING, Job.STATUS_RUNNING]
+        ).values_list('task', flat=True))
+        missing = [task for task in periodic if task.name not in scheduled]
+        for task in missing:
+            enqueue(task)
+    return len(missing)
+
+
+def _using():
+    return router.db_for_write(Job)
+
+
+def worker_name():
+    return f'{socket.gethostname()}:{os.getpid()}:{threading.current_thread().name}'[:100]
+
+
+class Worker:
+    """
+    Ejecuta tareas con ``threads`` hilos en el proceso actual.
+
+    El hilo principal escucha NOTIFY para despertar a los demás en cuanto
+    se encola una tarea; además revisa la cola cada ``poll_interval``
+    segundos (tareas con ``run_at`` futuro, reintentos), recupera las
+    tareas de workers caídos y programa las periódicas.
+    """
+
+    def __init__(self, threads=1, poll_interval=5):
+        self.threads = max(threads, 1)
+        self.poll_interval = poll_interval
+        self.stopping = threading.Event()
+        self.wakeup = threading.Event()
+
+    def stop(self, *args):
+        self.stopping.set()
+        self.wakeup.set()
+
+    def run(self):
+        """Atiende la cola hasta que se llame a ``stop`` (SIGTERM o SIGINT)."""
+        if threading.current_thread() is threading.main_thread():
+            signal.signal(signal.SIGTERM, self.stop)
+            signal.signal(signal.SIGINT, self.stop)
+
+        threads = [
+            threading.Thread(target=self._loop, name=f'jobs-{index}')
+            for index in range(self.threads)
+        ]
+        for thread in threads:
+            thread.start()
+
+        listener = None
+        try:
+            while not self.stopping.is_set():
+                try:
+                    if listener is None:
+                        listener = self._listen()
+                    self._maintain()
+                    if select.select([listener], [], [], self.poll_interval)[0]:
+                        listener.poll()
+                        listener.notifies.clear()
+                except (psycopg2.Error, OSError):
+                    logger.exception('Error en la conexión LISTEN de los workers')
+                    listener = self._close(listener)
+                    self.stopping.wait(self.poll_interval)
+                finally:
+                    close_old_connections()
+                self.wakeup.set()
+        finally:
+            self.stop()
+            self._close(listener)
+            for thread in threads:
+                thread.join()
+            connections.close_all()
+
+    def _loop(self):
+        worker = worker_name()
+        while not self.stopping.is_set():
+            try:
+                count = run_pending(worker, limit=1)
+            except Exception:
+                logger.exception('Error al reclamar tareas')
+                count = 0
+            finally:
+                close_old_connections()
+            if not count:
+                self.wakeup.wait(self.poll_interval)
+                self.wakeup.clear()
+        connections.close_all()
+
+    def _maintain(self):
+        timeout = getattr(settings, 'TICKETS_JOBS_TIMEOUT', 3600)
+        Job.requeue_stale(timezone.now() - timedelta(seconds=timeout))
+        schedule_periodic()
+
+    def _listen(self):
+        params = connections[_using()].get_connection_params()
+        listener = psycopg2.connect(**params)
+        listener.set_isolation_level(psycopg2.extensions.ISOLATION_LEVEL_AUTOCOMMIT)
+        with listener.cursor() as cursor:
+            cursor.execute(f'LISTEN {CHANNEL}')
+        return listener
+
+    def _close(self, listener):
+        if listener is not None:
+            try:
+                listener.close()
+            except psycopg2.Error:
+                pass
+        return None
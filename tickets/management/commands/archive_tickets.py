@@ -0,0 +1,50 @@
+"""
+Comando para mover al archivo los tickets cerrados hace tiempo (ver
+tickets/models/archived_ticket.py), o devolver uno a las tablas activas.
+
+Uso:
+    python manage.py archive_tickets
+    python manage.py archive_tickets --days 30 --batch-size 1000
+    python manage.py archive_tickets --restore 123
+"""
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from tickets.models import ArchivedTicket
+
+
+class Command(BaseCommand):
+    help = 'Mueve al archivo los tickets cerrados hace más de N días, con sus comentarios.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--days',
+            type=int,
+            default=settings.TICKETS_ARCHIVE_AFTER_DAYS,
+            help=f'Días desde el cierre (por defecto {settings.TICKETS_ARCHIVE_AFTER_DAYS}).'
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=settings.TICKETS_ARCHIVE_BATCH_SIZE,
+            help=f'Tickets por transacción (por defecto {settings.TICKETS_ARCHIVE_BATCH_SIZE}).'
+        )
+        parser.add_argument(
+            '--restore',
+            type=int,
+            metavar='ID',
+            help='Devuelve el ticket archivado ID a las tablas activas.'
+        )
+
+    def handle(self, *args, **options):
+        if options['restore'] is not None:
+            if not ArchivedTicket.restore(options['restore']):
+                raise CommandError(f'El ticket #{options["restore"]} no está archivado.')
+            self.stdout.write(self.style.SUCCESS(f'Ticket #{options["restore"]} restaurado.'))
+            return
+
+        archived = ArchivedTicket.archive(
+            ArchivedTicket.cutoff(options['days']),
+            batch_size=options['batch_size']
+        )
+        self.stdout.write(self.style.SUCCESS(f'{archived} tickets archivados.'))
@@ -0,0 +1,171 @@
+"""
+Comando para comparar las lecturas sync y async bajo uvicorn.
+
+Inicia uvicorn (config.asgi) con TICKETS_ASYNC_READS desactivado y luego
+activado, y en cada caso abre N conexiones keep-alive que piden la misma
+URL sin pausa durante ``--duration`` segundos. Verifica que las dos
+versiones respondan lo mismo y muestra peticiones por segundo y latencias
+para cada nivel de concurrencia.
+
+Uso:
+    python manage.py benchmark_async_reads
+    python manage.py benchmark_async_reads --path "/api/tickets/?pagination=cursor" --concurrency 1,50,200
+"""
+import asyncio
+import os
+import socket
+import subprocess
+import sys
+import time
+from contextlib import contextmanager
+
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+from rest_framework_simplejwt.tokens import AccessToken
+
+
+class Command(BaseCommand):
+    help = 'Compara el rendimiento de las lecturas sync y async bajo uvicorn.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--path', default='/api/tickets/', help='URL a pedir (por defecto /api/tickets/).')
+        parser.add_argument('--concurrency', default='1,10,50,200', help='Conexiones simultáneas (por defecto 1,10,50,200).')
+        parser.add_argument('--duration', type=float, default=5, help='Segundos por medición (por defecto 5).')
+        parser.add_argument('--user', help='Usuario que hace las peticiones (por defecto, el primer staff).')
+        parser.add_argument('--port', type=int, default=8765, help='Puerto de uvicorn (por defecto 8765).')
+
+    def handle(self, *args, **options):
+        users = User.objects.filter(is_active=True).order_by('-is_staff', 'pk')
+        if options['user']:
+            users = users.filter(username=options['user'])
+        user = users.first()
+        if user is None:
+            raise CommandError('No hay un usuario activo para autenticar las peticiones.')
+
+        levels = [int(level) for level in options['concurrency'].split(',')]
+        headers = {'Authorization': f'Bearer {AccessToken.for_user(user)}'}
+
+        results = {}
+        bodies = {}
+        for mode in ('sync', 'async'):
+            with self.server(options['port'], async_reads=mode == 'async'):
+                status, bodies[mode] = asyncio.run(
+                    self.fetch(options['port'], options['path'], headers)
+                )
+                if status != 200:
+                    raise CommandError(f'{options["path"]} respondió {status} ({mode}).')
+                results[mode] = [
+                    asyncio.run(self.load(
+                        options['port'], options['path'], headers, level, options['duration']
+                    ))
+                    for level in levels
+                ]
+
+        if bodies['sync'] != bodies['async']:
+            raise CommandError('Las respuestas sync y async no coinciden.')
+
+        self.stdout.write(f'{options["path"]} ({user.username}), {options["duration"]:g} s por medición')
+        self.stdout.write(f'{"conexiones":>10}  {"modo":<5}  {"pet/s":>8}  {"p50 ms":>7}  {"p99 ms":>7}  {"errores":>7}')
+        for index, level in enumerate(levels):
+            for mode in ('sync', 'async'):
+                rate, p50, p99, errors = results[mode][index]
+                self.stdout.write(
+                    f'{level:>10}  {mode:<5}  {rate:>8.1f}  {p50:>7.1f}  {p99:>7.1f}  {errors:>7}'
+                )
+        self.stdout.write(self.style.SUCCESS('Respuestas idénticas en los dos modos.'))
+
+    @contextmanager
+    def server(self, port, async_reads):
+        """Ejecuta uvicorn mientras dura el bloque."""
+        env = {**os.environ, 'TICKETS_ASYNC_READS': str(async_reads)}
+        env.setdefault('DJANGO_SETTINGS_MODULE', settings.SETTINGS_MODULE)
+        process = subprocess.Popen(
+            [sys.executable, '-m', 'uvicorn', 'config.asgi:application',
+             '--port', str(port), '--log-level', 'warning', '--no-access-log'],
+            cwd=settings.BASE_DIR,
+            env=env
+        )
+        try:
+            self.wait_for_port(port, process)
+            yield process
+        finally:
+            process.terminate()
+            process.wait()
+
+    @staticmethod
+    def wait_for_port(port, process, timeout=30):
+        deadline = time.monotonic() + timeout
+        while time.monotonic() < deadline:
+            if process.poll() is not None:
+                raise CommandError('uvicorn terminó al iniciar.')
+            try:
+                socket.create_connection(('127.0.0.1', port), timeout=1).close()
+                return
+            except OSError:
+                time.sleep(0.2)
+        raise CommandError(f'uvicorn no respondió en el puerto {port}.')
+
+    @staticmethod
+    async def request(reader, writer, path, headers):
+        """Envía un GET por una conexión keep-alive; retorna (status, cuerpo)."""
+        lines = [f'GET {path} HTTP/1.1', 'Host: 127.0.0.1']
+        lines += [f'{name}: {value}' for name, value in headers.items()]
+        writer.write(('\r\n'.join(lines) + '\r\n\r\n').encode('latin-1'))
+        await writer.drain()
+
+        head = await reader.readuntil(b'\r\n\r\n')
+        status_line, *header_lines = head.decode('latin-1').split('\r\n')
+        length = None
+        for line in header_lines:
+            name, _, value = line.partition(':')
+            if name.strip().lower() == 'content-length':
+                length = int(value)
+        if length is None:
+            raise CommandError('La respuesta no trae Content-Length.')
+        return int(status_line.split()[1]), await reader.readexactly(length)
+
+    async def fetch(self, port, path, headers):
+        reader, writer = await asyncio.open_connection('127.0.0.1', port)
+        try:
+            return await self.request(reader, writer, path, headers)
+        finally:
+            writer.close()
+
+    async def load(self, port, path, headers, connections, duration):
+        """
+        ``connections`` conexiones pidiendo ``path`` durante ``duration``
+        segundos. Retorna (peticiones/s, p50 ms, p99 ms, errores).
+        """
+        latencies = []
+        errors = 0
+        deadline = time.perf_counter() + duration
+
+        async def client():
+            nonlocal errors
+            reader, writer = await asyncio.open_connection('127.0.0.1', port)
+            try:
+                while time.perf_counter() < deadline:
+                    start = time.perf_counter()
+                    status, _ = await self.request(reader, writer, path, headers)
+                    if status == 200:
+                        latencies.append(time.perf_counter() - start)
+                    else:
+                        errors += 1
+            except (OSError, asyncio.IncompleteReadError):
+                errors += 1
+            finally:
+                writer.close()
+
+        start = time.perf_counter()
+        await asyncio.gather(*(client() for _ in range(connections)))
+        elapsed = time.perf_counter() - start
+
+        latencies.sort()
+        if not latencies:
+            return 0.0, 0.0, 0.0, errors
+
+        def percentile(fraction):
+            return latencies[min(int(len(latencies) * fraction), len(latencies) - 1)] * 1000
+
+        return len(latencies) / elapsed, percentile(0.5), percentile(0.99), errors
@@ -0,0 +1,68 @@
+"""
+Comando para comparar la serialización de DRF con la compilada.
+
+Serializa y renderiza a JSON una página de tickets de las dos formas,
+verifica que el resultado sea idéntico y muestra el tiempo de cada una.
+
+Uso:
+    python manage.py benchmark_serializers
+    python manage.py benchmark_serializers --rows 100 --repeat 50
+"""
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db.models import Count
+from rest_framework.renderers import JSONRenderer
+
+from tickets import sla
+from tickets.compiled import CompiledSerializer
+from tickets.models import Ticket
+from tickets.renderers import ORJSONRenderer
+from tickets.serializers import TicketSerializer
+
+
+class Command(BaseCommand):
+    help = 'Compara el tiempo de TicketSerializer con su versión compilada.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rows', type=int, default=100, help='Tickets por página (por defecto 100).')
+        parser.add_argument('--repeat', type=int, default=30, help='Repeticiones (por defecto 30).')
+
+    def handle(self, *args, **options):
+        rows = options['rows']
+        queryset = sla.annotate(Ticket.objects.select_related('created_by', 'assigned_to').defer(
+            'search_vector'
+        )).annotate(comments_count=Count('comments')).order_by('-created_at', '-id')[:rows]
+
+        compiled = CompiledSerializer.for_class(TicketSerializer)
+
+        def drf():
+            return JSONRenderer().render(TicketSerializer(list(queryset), many=True).data)
+
+        def fast():
+            return ORJSONRenderer().render(compiled.serialize(list(compiled.values_list(queryset))))
+
+        if drf() != fast():
+            raise CommandError('La salida compilada no coincide con la de DRF.')
+
+        count = queryset.count()
+        if count < rows:
+            self.stdout.write(self.style.WARNING(f'Solo hay {count} tickets.'))
+
+        drf_time = self.measure(drf, options['repeat'])
+        fast_time = self.measure(fast, options['repeat'])
+
+        self.stdout.write(f'DRF + JSONRenderer:          {drf_time * 1000:.2f} ms')
+        self.stdout.write(f'Compilado + ORJSONRenderer:  {fast_time * 1000:.2f} ms')
+        self.stdout.write(self.style.SUCCESS(
+            f'{count} tickets: {drf_time / fast_time:.1f}x más rápido.'
+        ))
+
+    @staticmethod
+    def measure(function, repeat):
+        """Tiempo promedio de ``function`` (incluye la consulta)."""
+        function()
+        start = time.perf_counter()
+        for _ in range(repeat):
+            function()
+        return (time.perf_counter() - start) / repeat
@@ -0,0 +1,46 @@
+"""
+Comando para pasar los adjuntos existentes al almacenamiento deduplicado.
+
+Los adjuntos subidos antes del almacenamiento por contenido siguen en
+``attachments/%Y/%m/%d/``. Este comando los copia como blobs (los
+archivos repetidos quedan una sola vez), actualiza los comentarios y
+elimina los archivos originales.
+
+Uso:
+    python manage.py dedupe_attachments
+"""
+from django.core.files import File
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from tickets.models import Comment
+
+
+class Command(BaseCommand):
+    help = 'Convierte los adjuntos anteriores en blobs deduplicados.'
+
+    def handle(self, *args, **options):
+        storage = Comment._meta.get_field('attachment').storage
+        comments = Comment.objects.exclude(attachment='').exclude(
+            attachment__isnull=True
+        ).exclude(attachment__startswith=f'{storage.prefix}/').only('pk', 'attachment')
+
+        converted = 0
+        missing = 0
+        for comment in comments.iterator():
+            old_name = comment.attachment.name
+            if not storage.exists(old_name):
+                missing += 1
+                continue
+
+            with transaction.atomic(), storage.open(old_name) as content:
+                comment.attachment.save(old_name.rsplit('/', 1)[-1], File(content), save=False)
+                comment.save(update_fields=['attachment', 'updated_at'])
+            converted += 1
+
+            if not Comment.objects.filter(attachment=old_name).exists():
+                storage.delete(old_name)
+
+        self.stdout.write(self.style.SUCCESS(f'{converted} adjuntos convertidos.'))
+        if missing:
+            self.stdout.write(self.style.WARNING(f'{missing} adjuntos no se encontraron en disco.'))
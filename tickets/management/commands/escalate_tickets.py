@@ -0,0 +1,46 @@
+"""
+Comando para escalar los tickets desatendidos (ver tickets/escalation.py).
+
+El worker lo hace cada 5 minutos con las reglas de
+TICKETS_ESCALATION_RULES; este comando sirve sin worker o para revisar
+una regla en particular.
+
+Uso:
+    python manage.py escalate_tickets
+    python manage.py escalate_tickets --rule unassigned --batch-size 500
+"""
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from tickets.escalation import RULES, escalate
+
+
+class Command(BaseCommand):
+    help = 'Escala los tickets sin respuesta o sin asignar después de su plazo.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--rule',
+            action='append',
+            choices=list(RULES),
+            help='Regla a revisar (se puede repetir; por defecto TICKETS_ESCALATION_RULES).'
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=settings.TICKETS_ESCALATION_BATCH_SIZE,
+            help=f'Tickets por transacción (por defecto {settings.TICKETS_ESCALATION_BATCH_SIZE}).'
+        )
+
+    def handle(self, *args, **options):
+        rules = options['rule'] or settings.TICKETS_ESCALATION_RULES
+        if not rules:
+            raise CommandError('No hay reglas: usa --rule o configura TICKETS_ESCALATION_RULES.')
+
+        try:
+            escalated = escalate(rules, batch_size=options['batch_size'])
+        except ValueError as exc:
+            raise CommandError(str(exc))
+
+        summary = ', '.join(f'{rule}: {count}' for rule, count in escalated.items())
+        self.stdout.write(self.style.SUCCESS(f'Tickets escalados ({summary}).'))
@@ -0,0 +1,54 @@
+"""
+Comando para generar las variantes WebP de los avatares e imágenes
+adjuntas existentes.
+
+Cada archivo se procesa una vez aunque lo usen varios comentarios, y
+solo se generan las variantes que falten.
+
+Uso:
+    python manage.py generate_thumbnails
+    python manage.py generate_thumbnails --workers 4
+"""
+from concurrent.futures import ThreadPoolExecutor
+
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections
+from django.db.models import Min
+
+from tickets.thumbnails import IMAGE_FIELDS, is_image, process
+
+
+class Command(BaseCommand):
+    help = 'Genera las variantes WebP de avatares e imágenes adjuntas existentes.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--workers',
+            type=int,
+            default=4,
+            help='Hilos en paralelo (por defecto 4).'
+        )
+
+    def handle(self, *args, **options):
+        pending = []
+        for model, (file_field, _) in IMAGE_FIELDS.items():
+            # Una instancia por archivo: process() actualiza todas las demás
+            rows = model.objects.exclude(**{file_field: ''}).exclude(
+                **{f'{file_field}__isnull': True}
+            ).values(file_field).annotate(pk=Min('pk'))
+            pending += [
+                (model, row['pk']) for row in rows.order_by()
+                if is_image(row[file_field])
+            ]
+
+        def run(item):
+            try:
+                process(*item)
+            finally:
+                close_old_connections()
+
+        with ThreadPoolExecutor(max_workers=max(options['workers'], 1)) as executor:
+            for _ in executor.map(run, pending):
+                pass
+
+        self.stdout.write(self.style.SUCCESS(f'{len(pending)} imágenes procesadas.'))
@@ -0,0 +1,97 @@
+"""
+Comando para importar tickets o comentarios de forma masiva.
+
+Uso:
+    python manage.py import_tickets tickets.csv
+    python manage.py import_tickets comentarios.ndjson --kind comments
+    python manage.py import_tickets - --format ndjson < tickets.ndjson
+    python manage.py import_tickets pendientes.csv --auto-assign
+"""
+import json
+import os
+import sys
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from tickets.importer import FORMATS, IMPORTERS, read_rows
+
+
+class Command(BaseCommand):
+    help = 'Importa tickets o comentarios desde CSV o NDJSON usando COPY.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help="Archivo a importar ('-' para stdin)")
+        parser.add_argument(
+            '--kind',
+            choices=sorted(IMPORTERS),
+            default='tickets',
+            help='Tipo de registros (por defecto: tickets)'
+        )
+        parser.add_argument(
+            '--format',
+            choices=FORMATS,
+            help='Formato del archivo (por defecto se deduce de la extensión)'
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=10000,
+            help='Filas por lote (por defecto: 10000)'
+        )
+        parser.add_argument(
+            '--rejects',
+            help='Archivo NDJSON donde escribir las filas rechazadas'
+        )
+        parser.add_argument(
+            '--auto-assign',
+            action='store_true',
+            help='Asigna los tickets no cerrados sin asignar según TICKETS_AUTO_ASSIGN'
+        )
+
+    def handle(self, *args, **options):
+        path = options['path']
+        format = options['format']
+        if format is None:
+            extension = os.path.splitext(path)[1].lower()
+            format = 'csv' if extension == '.csv' else 'ndjson' if extension in ('.ndjson', '.jsonl') else None
+        if format is None:
+            raise CommandError('No se pudo deducir el formato; usa --format.')
+
+        extra = {}
+        if options['auto_assign']:
+            if options['kind'] != 'tickets':
+                raise CommandError('--auto-assign solo aplica a tickets.')
+            if not settings.TICKETS_AUTO_ASSIGN:
+                raise CommandError('TICKETS_AUTO_ASSIGN está vacío; no hay estrategia de asignación.')
+            extra['auto_assign'] = True
+
+        rejects = open(options['rejects'], 'w', encoding='utf-8') if options['rejects'] else None
+
+        def on_reject(line, errors):
+            if rejects is not None:
+                rejects.write(json.dumps({'line': line, 'errors': errors}, ensure_ascii=False) + '\n')
+
+        importer = IMPORTERS[options['kind']](
+            batch_size=options['batch_size'],
+            on_reject=on_reject,
+            **extra
+        )
+
+        stream = sys.stdin if path == '-' else open(path, newline='', encoding='utf-8')
+        started = time.monotonic()
+        try:
+            result = importer.run(read_rows(stream, format))
+        finally:
+            if stream is not sys.stdin:
+                stream.close()
+            if rejects is not None:
+                rejects.close()
+        elapsed = time.monotonic() - started
+
+        rate = result['total'] / elapsed if elapsed else 0
+        self.stdout.write(self.style.SUCCESS(
+            f"{result['imported']} de {result['total']} filas importadas, "
+            f"{result['rejected']} rechazadas ({elapsed:.1f} s, {rate:,.0f} filas/s)."
+        ))
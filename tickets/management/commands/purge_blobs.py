@@ -0,0 +1,38 @@
+"""
+Comando para eliminar los adjuntos deduplicados que ya no se usan.
+
+Elimina los blobs sin referencias, los archivos de ``blobs/`` sin fila en
+la tabla Blob y los temporales de subidas interrumpidas, siempre que sean
+más antiguos que ``--hours`` (para no tocar subidas en curso). Los
+temporales de las subidas por partes los elimina ``purge_uploads``.
+
+Uso:
+    python manage.py purge_blobs
+    python manage.py purge_blobs --hours 6
+"""
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from tickets.models import Blob
+
+
+class Command(BaseCommand):
+    help = 'Elimina blobs de adjuntos sin referencias y archivos huérfanos.'
+
+    def add_arguments(self, parser):
+        hours = int(Blob.GRACE.total_seconds() // 3600)
+        parser.add_argument(
+            '--hours',
+            type=int,
+            default=hours,
+            help=f'Antigüedad mínima en horas (por defecto {hours}).'
+        )
+
+    def handle(self, *args, **options):
+        before = timezone.now() - timedelta(hours=options['hours'])
+        blobs, files = Blob.purge(before)
+        self.stdout.write(self.style.SUCCESS(
+            f'{blobs} blobs sin referencias y {files} archivos huérfanos eliminados.'
+        ))
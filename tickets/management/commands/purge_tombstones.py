@@ -0,0 +1,32 @@
+"""
+Comando para purgar las marcas de eliminación antiguas.
+
+Uso:
+    python manage.py purge_tombstones
+    python manage.py purge_tombstones --days 60
+"""
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from tickets.models import Tombstone
+
+
+class Command(BaseCommand):
+    help = 'Elimina las marcas de eliminación (Tombstone) más antiguas que la retención.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--days',
+            type=int,
+            default=Tombstone.RETENTION.days,
+            help=f'Días a conservar (por defecto {Tombstone.RETENTION.days}).'
+        )
+
+    def handle(self, *args, **options):
+        before = timezone.now() - timedelta(days=options['days'])
+        deleted = Tombstone.purge(before)
+        self.stdout.write(self.style.SUCCESS(
+            f'{deleted} marcas de eliminación purgadas.'
+        ))
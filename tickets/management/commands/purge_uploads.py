@@ -0,0 +1,33 @@
+"""
+Comando para eliminar las subidas por partes abandonadas.
+
+Uso:
+    python manage.py purge_uploads
+    python manage.py purge_uploads --hours 6
+"""
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from tickets.models import UploadSession
+
+
+class Command(BaseCommand):
+    help = 'Elimina las subidas por partes sin actividad y sus archivos temporales.'
+
+    def add_arguments(self, parser):
+        hours = int(UploadSession.TTL.total_seconds() // 3600)
+        parser.add_argument(
+            '--hours',
+            type=int,
+            default=hours,
+            help=f'Horas sin actividad (por defecto {hours}).'
+        )
+
+    def handle(self, *args, **options):
+        before = timezone.now() - timedelta(hours=options['hours'])
+        deleted = UploadSession.purge(before)
+        self.stdout.write(self.style.SUCCESS(
+            f'{deleted} subidas abandonadas eliminadas.'
+        ))
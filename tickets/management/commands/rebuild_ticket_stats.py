@@ -0,0 +1,20 @@
+"""
+Comando para recalcular los contadores de tickets del dashboard.
+
+Uso:
+    python manage.py rebuild_ticket_stats
+"""
+from django.core.management.base import BaseCommand
+
+from tickets.models import TicketCounter
+
+
+class Command(BaseCommand):
+    help = 'Recalcula desde cero los contadores de tickets (TicketCounter).'
+
+    def handle(self, *args, **options):
+        TicketCounter.rebuild()
+        rows = TicketCounter.objects.count()
+        self.stdout.write(self.style.SUCCESS(
+            f'Contadores recalculados ({rows} filas).'
+        ))
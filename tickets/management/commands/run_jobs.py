@@ -0,0 +1,89 @@
+"""
+Comando que ejecuta las tareas en segundo plano (ver tickets/jobs.py).
+
+Se pueden ejecutar varios workers a la vez, en la misma máquina o en
+otras: cada tarea la toma uno solo. SIGTERM o Ctrl+C detienen el worker
+después de terminar las tareas en curso.
+
+Uso:
+    python manage.py run_jobs
+    python manage.py run_jobs --threads 4
+    python manage.py run_jobs --processes 2 --threads 4
+    python manage.py run_jobs --once
+"""
+import multiprocessing
+import signal
+
+from django.core.management.base import BaseCommand
+from django.db import connections
+
+from tickets.jobs import Worker, run_pending, schedule_periodic
+
+
+def serve(threads, poll_interval):
+    Worker(threads=threads, poll_interval=poll_interval).run()
+
+
+class Command(BaseCommand):
+    help = 'Ejecuta las tareas en segundo plano de la cola.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--threads',
+            type=int,
+            default=1,
+            help='Hilos por proceso (por defecto 1).'
+        )
+        parser.add_argument(
+            '--processes',
+            type=int,
+            default=1,
+            help='Procesos (por defecto 1).'
+        )
+        parser.add_argument(
+            '--poll',
+            type=float,
+            default=5,
+            help='Segundos entre revisiones de la cola (por defecto 5).'
+        )
+        parser.add_argument(
+            '--once',
+            action='store_true',
+            help='Ejecuta las tareas vencidas y termina.'
+        )
+
+    def handle(self, *args, **options):
+        if options['once']:
+            schedule_periodic()
+            count = run_pending()
+            self.stdout.write(self.style.SUCCESS(f'{count} tareas ejecutadas.'))
+            return
+
+        threads, processes = options['threads'], options['processes']
+        self.stdout.write(self.style.SUCCESS(
+            f'Worker iniciado: {processes} procesos x {threads} hilos.'
+        ))
+
+        if processes <= 1:
+            serve(threads, options['poll'])
+            return
+
+        # Los procesos hijos no deben heredar las conexiones del padre
+        connections.close_all()
+        context = multiprocessing.get_context('fork')
+        children = [
+            context.Process(target=serve, args=(threads, options['poll']), name=f'jobs-{index}')
+            for index in range(processes)
+        ]
+        for child in children:
+            child.start()
+
+        def stop(*args):
+            for child in children:
+                if child.is_alive():
+                    child.terminate()
+
+        signal.signal(signal.SIGTERM, stop)
+        signal.signal(signal.SIGINT, stop)
+        for child in children:
+            child.join()
@@ -0,0 +1,105 @@
+# Generated by Django 4.2.30 on 2026-10-17 11:38
+
+import django.contrib.postgres.indexes
+import django.contrib.postgres.search
+from django.db import migrations
+
+
+# Vector de un ticket: título (A) > descripción (B) > comentarios públicos (C).
+# Los comentarios internos se excluyen para que la búsqueda no revele su
+# contenido a usuarios que no son staff.
+SEARCH_TRIGGERS_SQL = """
+CREATE OR REPLACE FUNCTION tickets_ticket_document(
+    p_ticket_id bigint, p_title text, p_description text
+) RETURNS tsvector AS $$
+    SELECT setweight(to_tsvector('spanish', coalesce(p_title, '')), 'A')
+        || setweight(to_tsvector('spanish', coalesce(p_description, '')), 'B')
+        || setweight(to_tsvector('spanish', coalesce((
+            SELECT string_agg(c.content, ' ')
+            FROM tickets_comment c
+            WHERE c.ticket_id = p_ticket_id AND NOT c.is_internal
+        ), '')), 'C');
+$$ LANGUAGE sql STABLE;
+
+CREATE OR REPLACE FUNCTION tickets_ticket_search_vector_trigger() RETURNS trigger AS $$
+BEGIN
+    NEW.search_vector := tickets_ticket_document(NEW.id, NEW.title, NEW.description);
+    RETURN NEW;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE TRIGGER tickets_ticket_search_vector_update
+    BEFORE INSERT OR UPDATE OF title, description ON tickets_ticket
+    FOR EACH ROW EXECUTE FUNCTION tickets_ticket_search_vector_trigger();
+
+CREATE OR REPLACE FUNCTION tickets_comment_search_vector_trigger() RETURNS trigger AS $$
+BEGIN
+    NEW.search_vector := setweight(to_tsvector('spanish', coalesce(NEW.content, '')), 'A');
+    RETURN NEW;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE TRIGGER tickets_comment_search_vector_update
+    BEFORE INSERT OR UPDATE OF content ON tickets_comment
+    FOR EACH ROW EXECUTE FUNCTION tickets_comment_search_vector_trigger();
+
+CREATE OR REPLACE FUNCTION tickets_comment_refresh_ticket_trigger() RETURNS trigger AS $$
+BEGIN
+    UPDATE tickets_ticket t
+    SET search_vector = tickets_ticket_document(t.id, t.title, t.description)
+    WHERE t.id IN (
+        CASE WHEN TG_OP = 'DELETE' THEN NULL ELSE NEW.ticket_id END,
+        CASE WHEN TG_OP = 'INSERT' THEN NULL ELSE OLD.ticket_id END
+    );
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE TRIGGER tickets_comment_refresh_ticket
+    AFTER INSERT OR DELETE OR UPDATE OF content, is_internal, ticket_id ON tickets_comment
+    FOR EACH ROW EXECUTE FUNCTION tickets_comment_refresh_ticket_trigger();
+
+UPDATE tickets_comment SET search_vector =
+    setweight(to_tsvector('spanish', coalesce(content, '')), 'A');
+UPDATE tickets_ticket SET search_vector =
+    tickets_ticket_document(id, title, description);
+"""
+
+DROP_SEARCH_TRIGGERS_SQL = """
+DROP TRIGGER IF EXISTS tickets_comment_refresh_ticket ON tickets_comment;
+DROP TRIGGER IF EXISTS tickets_comment_search_vector_update ON tickets_comment;
+DROP TRIGGER IF EXISTS tickets_ticket_search_vector_update ON tickets_ticket;
+DROP FUNCTION IF EXISTS tickets_comment_refresh_ticket_trigger();
+DROP FUNCTION IF EXISTS tickets_comment_search_vector_trigger();
+DROP FUNCTION IF EXISTS tickets_ticket_search_vector_trigger();
+DROP FUNCTION IF EXISTS tickets_ticket_document(bigint, text, text);
+"""
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tickets', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='comment',
+            name='search_vector',
+            field=django.contrib.postgres.search.SearchVectorField(editable=False, null=True, verbose_name='Vector de búsqueda'),
+        ),
+        migrations.AddField(
+            model_name='ticket',
+            name='search_vector',
+            field=django.contrib.postgres.search.SearchVectorField(editable=False, null=True, verbose_name='Vector de búsqueda'),
+        ),
+        migrations.AddIndex(
+            model_name='comment',
+            index=django.contrib.postgres.indexes.GinIndex(fields=['search_vector'], name='tickets_comment_search_gin'),
+        ),
+        migrations.AddIndex(
+            model_name='ticket',
+            index=django.contrib.postgres.indexes.GinIndex(fields=['search_vector'], name='tickets_ticket_search_gin'),
+        ),
+        migrations.RunSQL(SEARCH_TRIGGERS_SQL, DROP_SEARCH_TRIGGERS_SQL),
+    ]
@@ -0,0 +1,47 @@
+# Generated by Django 4.2.30 on 2026-10-17 11:40
+
+from django.db import migrations, models
+
+
+# Carga inicial de los contadores a partir de los tickets existentes
+POPULATE_COUNTERS_SQL = """
+INSERT INTO tickets_ticketcounter (scope, user_id, status, priority, count)
+SELECT 'all', 0, status, priority, COUNT(*)
+FROM tickets_ticket GROUP BY status, priority
+UNION ALL
+SELECT 'assigned_to', COALESCE(assigned_to_id, 0), status, priority, COUNT(*)
+FROM tickets_ticket GROUP BY COALESCE(assigned_to_id, 0), status, priority
+UNION ALL
+SELECT 'created_by', created_by_id, status, priority, COUNT(*)
+FROM tickets_ticket GROUP BY created_by_id, status, priority;
+"""
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tickets', '0002_search_vector'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TicketCounter',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('scope', models.CharField(choices=[('all', 'Todos'), ('assigned_to', 'Asignado a'), ('created_by', 'Creado por')], max_length=20, verbose_name='Ámbito')),
+                ('user_id', models.BigIntegerField(default=0, help_text='ID del usuario del ámbito (0 = sin usuario)', verbose_name='Usuario')),
+                ('status', models.CharField(choices=[('abierto', 'Abierto'), ('en_progreso', 'En Progreso'), ('cerrado', 'Cerrado')], max_length=20, verbose_name='Estado')),
+                ('priority', models.CharField(choices=[('alta', 'Alta'), ('media', 'Media'), ('baja', 'Baja')], max_length=10, verbose_name='Prioridad')),
+                ('count', models.IntegerField(default=0, verbose_name='Cantidad')),
+            ],
+            options={
+                'verbose_name': 'Contador de tickets',
+                'verbose_name_plural': 'Contadores de tickets',
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='ticketcounter',
+            constraint=models.UniqueConstraint(fields=('scope', 'user_id', 'status', 'priority'), name='tickets_counter_unique_key'),
+        ),
+        migrations.RunSQL(POPULATE_COUNTERS_SQL, migrations.RunSQL.noop),
+    ]
@@ -0,0 +1,69 @@
+from django.db import migrations
+
+
+# Con SET LOCAL tickets.skip_search_refresh = 'on' los triggers dejan que
+# quien escribe mantenga los vectores de búsqueda: un ticket insertado con
+# search_vector lo conserva y los comentarios no recalculan el de su ticket.
+# Lo usa la importación masiva, que calcula los vectores en el mismo INSERT
+# y recalcula los de los tickets afectados con un solo UPDATE.
+SKIPPABLE_REFRESH_SQL = """
+CREATE OR REPLACE FUNCTION tickets_ticket_search_vector_trigger() RETURNS trigger AS $$
+BEGIN
+    IF current_setting('tickets.skip_search_refresh', true) = 'on'
+            AND NEW.search_vector IS NOT NULL THEN
+        RETURN NEW;
+    END IF;
+
+    NEW.search_vector := tickets_ticket_document(NEW.id, NEW.title, NEW.description);
+    RETURN NEW;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE OR REPLACE FUNCTION tickets_comment_refresh_ticket_trigger() RETURNS trigger AS $$
+BEGIN
+    IF current_setting('tickets.skip_search_refresh', true) = 'on' THEN
+        RETURN NULL;
+    END IF;
+
+    UPDATE tickets_ticket t
+    SET search_vector = tickets_ticket_document(t.id, t.title, t.description)
+    WHERE t.id IN (
+        CASE WHEN TG_OP = 'DELETE' THEN NULL ELSE NEW.ticket_id END,
+        CASE WHEN TG_OP = 'INSERT' THEN NULL ELSE OLD.ticket_id END
+    );
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+"""
+
+ORIGINAL_REFRESH_SQL = """
+CREATE OR REPLACE FUNCTION tickets_ticket_search_vector_trigger() RETURNS trigger AS $$
+BEGIN
+    NEW.search_vector := tickets_ticket_document(NEW.id, NEW.title, NEW.description);
+    RETURN NEW;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE OR REPLACE FUNCTION tickets_comment_refresh_ticket_trigger() RETURNS trigger AS $$
+BEGIN
+    UPDATE tickets_ticket t
+    SET search_vector = tickets_ticket_document(t.id, t.title, t.description)
+    WHERE t.id IN (
+        CASE WHEN TG_OP = 'DELETE' THEN NULL ELSE NEW.ticket_id END,
+        CASE WHEN TG_OP = 'INSERT' THEN NULL ELSE OLD.ticket_id END
+    );
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+"""
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tickets', '0003_ticket_counter'),
+    ]
+
+    operations = [
+        migrations.RunSQL(SKIPPABLE_REFRESH_SQL, ORIGINAL_REFRESH_SQL),
+    ]
@@ -0,0 +1,39 @@
+# Generated by Django 4.2.30 on 2026-10-17 11:51
+
+from django.db import migrations, models
+import django.utils.timezone
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tickets', '0004_search_refresh_skip'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Tombstone',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('kind', models.CharField(choices=[('ticket', 'Ticket'), ('comment', 'Comentario')], max_length=10, verbose_name='Tipo')),
+                ('object_id', models.BigIntegerField(verbose_name='ID eliminado')),
+                ('deleted_at', models.DateTimeField(default=django.utils.timezone.now, verbose_name='Fecha de eliminación')),
+            ],
+            options={
+                'verbose_name': 'Eliminación',
+                'verbose_name_plural': 'Eliminaciones',
+            },
+        ),
+        migrations.AddIndex(
+            model_name='comment',
+            index=models.Index(fields=['updated_at', 'id'], name='tickets_com_updated_add816_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='ticket',
+            index=models.Index(fields=['updated_at', 'id'], name='tickets_tic_updated_a117e3_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='tombstone',
+            index=models.Index(fields=['deleted_at', 'id'], name='tickets_tom_deleted_e22684_idx'),
+        ),
+    ]
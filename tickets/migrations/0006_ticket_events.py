@@ -0,0 +1,91 @@
+from django.db import migrations
+
+
+# Eventos en vivo para /api/events/ (ver tickets/events.py).
+# Los triggers publican con NOTIFY en el canal 'tickets_events' un JSON
+# pequeño con el tipo de evento y los IDs involucrados; el cliente pide los
+# datos completos a la API REST. NOTIFY es transaccional: el evento se
+# entrega solo si la transacción se confirma.
+# Con SET LOCAL tickets.skip_notify = 'on' no se publican eventos (lo usa la
+# importación masiva).
+NOTIFY_TRIGGERS_SQL = """
+CREATE OR REPLACE FUNCTION tickets_ticket_notify_trigger() RETURNS trigger AS $$
+DECLARE
+    previous_assigned_to bigint;
+BEGIN
+    IF current_setting('tickets.skip_notify', true) = 'on' THEN
+        RETURN NULL;
+    END IF;
+
+    IF TG_OP = 'UPDATE' THEN
+        previous_assigned_to := OLD.assigned_to_id;
+    END IF;
+
+    IF TG_OP = 'UPDATE' AND NEW.status IS DISTINCT FROM OLD.status THEN
+        PERFORM pg_notify('tickets_events', json_build_object(
+            'event', 'status',
+            'ticket', NEW.id,
+            'status', NEW.status,
+            'previous_status', OLD.status,
+            'assigned_to', NEW.assigned_to_id
+        )::text);
+    END IF;
+
+    IF NEW.assigned_to_id IS DISTINCT FROM previous_assigned_to THEN
+        PERFORM pg_notify('tickets_events', json_build_object(
+            'event', 'assignment',
+            'ticket', NEW.id,
+            'status', NEW.status,
+            'assigned_to', NEW.assigned_to_id,
+            'previous_assigned_to', previous_assigned_to
+        )::text);
+    END IF;
+
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE TRIGGER tickets_ticket_notify
+    AFTER INSERT OR UPDATE OF status, assigned_to_id ON tickets_ticket
+    FOR EACH ROW EXECUTE FUNCTION tickets_ticket_notify_trigger();
+
+CREATE OR REPLACE FUNCTION tickets_comment_notify_trigger() RETURNS trigger AS $$
+BEGIN
+    IF current_setting('tickets.skip_notify', true) = 'on' THEN
+        RETURN NULL;
+    END IF;
+
+    PERFORM pg_notify('tickets_events', json_build_object(
+        'event', 'comment',
+        'ticket', NEW.ticket_id,
+        'comment', NEW.id,
+        'author', NEW.author_id,
+        'is_internal', NEW.is_internal,
+        'assigned_to', (SELECT assigned_to_id FROM tickets_ticket WHERE id = NEW.ticket_id)
+    )::text);
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE TRIGGER tickets_comment_notify
+    AFTER INSERT ON tickets_comment
+    FOR EACH ROW EXECUTE FUNCTION tickets_comment_notify_trigger();
+"""
+
+DROP_NOTIFY_TRIGGERS_SQL = """
+DROP TRIGGER IF EXISTS tickets_comment_notify ON tickets_comment;
+DROP FUNCTION IF EXISTS tickets_comment_notify_trigger();
+DROP TRIGGER IF EXISTS tickets_ticket_notify ON tickets_ticket;
+DROP FUNCTION IF EXISTS tickets_ticket_notify_trigger();
+"""
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tickets', '0005_sync_feed'),
+    ]
+
+    operations = [
+        migrations.RunSQL(NOTIFY_TRIGGERS_SQL, DROP_NOTIFY_TRIGGERS_SQL),
+    ]
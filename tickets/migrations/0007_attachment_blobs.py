@@ -0,0 +1,33 @@
+# Generated by Django 4.2.30 on 2026-10-17 12:08
+
+from django.db import migrations, models
+import tickets.storage
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tickets', '0006_ticket_events'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Blob',
+            fields=[
+                ('name', models.CharField(max_length=255, primary_key=True, serialize=False, verbose_name='Nombre')),
+                ('digest', models.CharField(max_length=64, verbose_name='SHA-256')),
+                ('size', models.PositiveBigIntegerField(verbose_name='Tamaño (bytes)')),
+                ('ref_count', models.PositiveIntegerField(default=0, verbose_name='Referencias')),
+                ('created_at', models.DateTimeField(auto_now_add=True, verbose_name='Fecha de creación')),
+            ],
+            options={
+                'verbose_name': 'Blob',
+                'verbose_name_plural': 'Blobs',
+            },
+        ),
+        migrations.AlterField(
+            model_name='comment',
+            name='attachment',
+            field=models.FileField(blank=True, help_text='Archivo adjunto opcional (máximo 10MB)', null=True, storage=tickets.storage.ContentAddressedStorage(), upload_to='attachments/%Y/%m/%d/', verbose_name='Adjunto'),
+        ),
+    ]
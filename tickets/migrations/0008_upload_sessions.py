@@ -0,0 +1,34 @@
+# Generated by Django 4.2.30 on 2026-10-17 12:11
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+import uuid
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('tickets', '0007_attachment_blobs'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='UploadSession',
+            fields=[
+                ('id', models.UUIDField(default=uuid.uuid4, editable=False, primary_key=True, serialize=False)),
+                ('filename', models.CharField(max_length=255, verbose_name='Nombre del archivo')),
+                ('size', models.PositiveBigIntegerField(verbose_name='Tamaño (bytes)')),
+                ('received', models.PositiveBigIntegerField(default=0, verbose_name='Bytes recibidos')),
+                ('created_at', models.DateTimeField(auto_now_add=True, verbose_name='Fecha de creación')),
+                ('updated_at', models.DateTimeField(auto_now=True, verbose_name='Última actividad')),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='upload_sessions', to=settings.AUTH_USER_MODEL, verbose_name='Usuario')),
+            ],
+            options={
+                'verbose_name': 'Subida por partes',
+                'verbose_name_plural': 'Subidas por partes',
+                'indexes': [models.Index(fields=['updated_at'], name='tickets_upl_updated_3d32de_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 4.2.30 on 2026-10-17 12:14
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tickets', '0008_upload_sessions'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='comment',
+            name='attachment_variants',
+            field=models.JSONField(blank=True, default=dict, editable=False, verbose_name='Variantes del adjunto'),
+        ),
+        migrations.AddField(
+            model_name='userprofile',
+            name='avatar_variants',
+            field=models.JSONField(blank=True, default=dict, editable=False, verbose_name='Variantes del avatar'),
+        ),
+    ]
@@ -0,0 +1,36 @@
+# Generated by Django 4.2.30 on 2026-10-17 12:19
+
+from django.db import migrations, models
+import django.utils.timezone
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tickets', '0009_image_variants'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Job',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('task', models.CharField(max_length=100, verbose_name='Tarea')),
+                ('kwargs', models.JSONField(blank=True, default=dict, verbose_name='Argumentos')),
+                ('status', models.CharField(choices=[('pending', 'Pendiente'), ('running', 'En ejecución'), ('done', 'Terminada'), ('failed', 'Fallida')], default='pending', max_length=10, verbose_name='Estado')),
+                ('run_at', models.DateTimeField(default=django.utils.timezone.now, verbose_name='Ejecutar a partir de')),
+                ('attempts', models.PositiveIntegerField(default=0, verbose_name='Intentos')),
+                ('max_attempts', models.PositiveIntegerField(default=5, verbose_name='Intentos máximos')),
+                ('last_error', models.TextField(blank=True, verbose_name='Último error')),
+                ('locked_by', models.CharField(blank=True, max_length=100, verbose_name='Worker')),
+                ('locked_at', models.DateTimeField(blank=True, null=True, verbose_name='Inicio de la ejecución')),
+                ('created_at', models.DateTimeField(auto_now_add=True, verbose_name='Fecha de creación')),
+                ('finished_at', models.DateTimeField(blank=True, null=True, verbose_name='Fecha de término')),
+            ],
+            options={
+                'verbose_name': 'Tarea',
+                'verbose_name_plural': 'Tareas',
+                'indexes': [models.Index(condition=models.Q(('status', 'pending')), fields=['run_at', 'id'], name='tickets_job_pending_idx'), models.Index(condition=models.Q(('status', 'running')), fields=['locked_at'], name='tickets_job_running_idx'), models.Index(fields=['task', 'status'], name='tickets_job_task_ce6b5d_idx')],
+            },
+        ),
+    ]
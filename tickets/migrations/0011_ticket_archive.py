@@ -0,0 +1,120 @@
+# Generated by Django 4.2.30 on 2026-10-17 12:44
+
+import django.contrib.postgres.search
+from django.db import migrations, models
+import tickets.storage
+
+
+# Archivo de tickets cerrados (ver tickets/models/archived_ticket.py).
+# Tablas particionadas por mes de cierre; las particiones las crea
+# ArchivedTicket.create_partitions() al archivar. Los índices se declaran
+# en la tabla principal y PostgreSQL los crea en cada partición. La clave
+# primaria debe incluir la columna de partición.
+# Sin claves foráneas a auth_user: son tablas que Django no administra y
+# bloquearían el TRUNCATE de ``manage.py flush``. Al eliminar un usuario,
+# Django aplica CASCADE y SET_NULL igual que en las tablas activas.
+ARCHIVE_TABLES_SQL = """
+CREATE TABLE tickets_archivedticket (
+    id bigint NOT NULL,
+    title varchar(200) NOT NULL,
+    description text NOT NULL,
+    status varchar(20) NOT NULL,
+    priority varchar(10) NOT NULL,
+    created_at timestamp with time zone NOT NULL,
+    updated_at timestamp with time zone NOT NULL,
+    closed_at timestamp with time zone NOT NULL,
+    assigned_to_id integer NULL,
+    created_by_id integer NOT NULL,
+    search_vector tsvector NULL,
+    archived_at timestamp with time zone NOT NULL,
+    PRIMARY KEY (id, closed_at)
+) PARTITION BY RANGE (closed_at);
+
+CREATE INDEX tickets_archivedticket_created_idx ON tickets_archivedticket (created_at, id);
+CREATE INDEX tickets_archivedticket_created_by_idx ON tickets_archivedticket (created_by_id);
+CREATE INDEX tickets_archivedticket_assigned_to_idx ON tickets_archivedticket (assigned_to_id);
+CREATE INDEX tickets_archivedticket_search_gin ON tickets_archivedticket USING gin (search_vector);
+
+CREATE TABLE tickets_archivedcomment (
+    id bigint NOT NULL,
+    content text NOT NULL,
+    attachment varchar(100) NULL,
+    is_internal boolean NOT NULL,
+    created_at timestamp with time zone NOT NULL,
+    updated_at timestamp with time zone NOT NULL,
+    author_id integer NOT NULL,
+    ticket_id bigint NOT NULL,
+    search_vector tsvector NULL,
+    attachment_variants jsonb NOT NULL,
+    ticket_closed_at timestamp with time zone NOT NULL,
+    archived_at timestamp with time zone NOT NULL,
+    PRIMARY KEY (id, ticket_closed_at)
+) PARTITION BY RANGE (ticket_closed_at);
+
+CREATE INDEX tickets_archivedcomment_ticket_idx ON tickets_archivedcomment (ticket_id, created_at);
+CREATE INDEX tickets_archivedcomment_created_idx ON tickets_archivedcomment (created_at, id);
+CREATE INDEX tickets_archivedcomment_author_idx ON tickets_archivedcomment (author_id);
+CREATE INDEX tickets_archivedcomment_search_gin ON tickets_archivedcomment USING gin (search_vector);
+"""
+
+DROP_ARCHIVE_TABLES_SQL = """
+DROP TABLE IF EXISTS tickets_archivedcomment;
+DROP TABLE IF EXISTS tickets_archivedticket;
+"""
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tickets', '0010_jobs'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ArchivedComment',
+            fields=[
+                ('id', models.BigIntegerField(primary_key=True, serialize=False, verbose_name='ID')),
+                ('ticket_closed_at', models.DateTimeField(verbose_name='Cierre del ticket')),
+                ('content', models.TextField(verbose_name='Contenido')),
+                ('attachment', models.FileField(blank=True, null=True, storage=tickets.storage.ContentAddressedStorage(), upload_to='attachments/%Y/%m/%d/', verbose_name='Adjunto')),
+                ('attachment_variants', models.JSONField(blank=True, default=dict, verbose_name='Variantes del adjunto')),
+                ('is_internal', models.BooleanField(default=False, verbose_name='Comentario interno')),
+                ('created_at', models.DateTimeField(verbose_name='Fecha de creación')),
+                ('updated_at', models.DateTimeField(verbose_name='Última edición')),
+                ('search_vector', django.contrib.postgres.search.SearchVectorField(null=True, verbose_name='Vector de búsqueda')),
+                ('archived_at', models.DateTimeField(verbose_name='Fecha de archivo')),
+            ],
+            options={
+                'verbose_name': 'Comentario archivado',
+                'verbose_name_plural': 'Comentarios archivados',
+                'ordering': ['created_at'],
+                'managed': False,
+            },
+        ),
+        migrations.CreateModel(
+            name='ArchivedTicket',
+            fields=[
+                ('id', models.BigIntegerField(primary_key=True, serialize=False, verbose_name='ID')),
+                ('title', models.CharField(max_length=200, verbose_name='Título')),
+                ('description', models.TextField(verbose_name='Descripción')),
+                ('status', models.CharField(choices=[('abierto', 'Abierto'), ('en_progreso', 'En Progreso'), ('cerrado', 'Cerrado')], max_length=20, verbose_name='Estado')),
+                ('priority', models.CharField(choices=[('alta', 'Alta'), ('media', 'Media'), ('baja', 'Baja')], max_length=10, verbose_name='Prioridad')),
+                ('created_at', models.DateTimeField(verbose_name='Fecha de creación')),
+                ('updated_at', models.DateTimeField(verbose_name='Última actualización')),
+                ('closed_at', models.DateTimeField(verbose_name='Fecha de cierre')),
+                ('search_vector', django.contrib.postgres.search.SearchVectorField(null=True, verbose_name='Vector de búsqueda')),
+                ('archived_at', models.DateTimeField(verbose_name='Fecha de archivo')),
+            ],
+            options={
+                'verbose_name': 'Ticket archivado',
+                'verbose_name_plural': 'Tickets archivados',
+                'ordering': ['-created_at'],
+                'managed': False,
+            },
+        ),
+        migrations.AddIndex(
+            model_name='ticket',
+            index=models.Index(condition=models.Q(('status', 'cerrado')), fields=['closed_at', 'id'], name='tickets_ticket_closed_idx'),
+        ),
+        migrations.RunSQL(ARCHIVE_TABLES_SQL, DROP_ARCHIVE_TABLES_SQL),
+    ]
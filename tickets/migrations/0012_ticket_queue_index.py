@@ -0,0 +1,17 @@
+# Generated by Django 4.2.30 on 2026-10-17 12:51
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tickets', '0011_ticket_archive'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='ticket',
+            index=models.Index(models.Case(models.When(priority='alta', then=models.Value(0)), models.When(priority='media', then=models.Value(1)), default=models.Value(2)), models.F('created_at'), models.F('id'), condition=models.Q(('assigned_to__isnull', True), ('status', 'abierto')), name='tickets_ticket_queue_idx'),
+        ),
+    ]
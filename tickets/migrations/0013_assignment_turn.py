@@ -0,0 +1,20 @@
+from django.db import migrations
+
+
+# Turno de la asignación round_robin (ver tickets/assignment.py). Una
+# secuencia no bloquea ni se revierte: cada creación concurrente recibe un
+# turno distinto sin esperar a las demás.
+TURN_SEQUENCE_SQL = 'CREATE SEQUENCE tickets_assignment_turn_seq'
+
+DROP_TURN_SEQUENCE_SQL = 'DROP SEQUENCE IF EXISTS tickets_assignment_turn_seq'
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tickets', '0012_ticket_queue_index'),
+    ]
+
+    operations = [
+        migrations.RunSQL(TURN_SEQUENCE_SQL, DROP_TURN_SEQUENCE_SQL),
+    ]
@@ -0,0 +1,22 @@
+# Generated by Django 4.2.30 on 2026-10-17 12:59
+
+from django.db import migrations, models
+import django.db.models.expressions
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tickets', '0013_assignment_turn'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='ticket',
+            index=models.Index(condition=models.Q(('status__in', ['abierto', 'en_progreso'])), fields=['priority', 'created_at'], name='tickets_ticket_open_age_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='ticket',
+            index=models.Index(models.F('priority'), django.db.models.expressions.CombinedExpression(models.F('closed_at'), '-', models.F('created_at')), condition=models.Q(('status', 'cerrado')), name='tickets_ticket_resolution_idx'),
+        ),
+    ]
@@ -0,0 +1,53 @@
+# Generated by Django 4.2.30 on 2026-10-17 13:11
+
+from django.db import migrations, models
+import django.db.models.deletion
+import django.utils.timezone
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tickets', '0014_ticket_age_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Escalation',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('rule', models.CharField(choices=[('unanswered', 'Sin respuesta'), ('unassigned', 'Sin asignar')], max_length=20, verbose_name='Regla')),
+                ('since', models.DateTimeField(verbose_name='Plazo contado desde')),
+                ('actions', models.JSONField(blank=True, default=dict, verbose_name='Acciones')),
+                ('created_at', models.DateTimeField(default=django.utils.timezone.now, verbose_name='Fecha de escalamiento')),
+            ],
+            options={
+                'verbose_name': 'Escalamiento',
+                'verbose_name_plural': 'Escalamientos',
+            },
+        ),
+        migrations.CreateModel(
+            name='EscalationCheckpoint',
+            fields=[
+                ('rule', models.CharField(choices=[('unanswered', 'Sin respuesta'), ('unassigned', 'Sin asignar')], max_length=20, primary_key=True, serialize=False, verbose_name='Regla')),
+                ('checked_until', models.DateTimeField(verbose_name='Revisado hasta')),
+            ],
+            options={
+                'verbose_name': 'Avance de escalamiento',
+                'verbose_name_plural': 'Avances de escalamiento',
+            },
+        ),
+        migrations.AddIndex(
+            model_name='comment',
+            index=models.Index(fields=['created_at', 'ticket'], name='tickets_com_created_c245ad_idx'),
+        ),
+        migrations.AddField(
+            model_name='escalation',
+            name='ticket',
+            field=models.ForeignKey(db_constraint=False, on_delete=django.db.models.deletion.CASCADE, related_name='escalations', to='tickets.ticket', verbose_name='Ticket'),
+        ),
+        migrations.AddConstraint(
+            model_name='escalation',
+            constraint=models.UniqueConstraint(fields=('ticket', 'rule', 'since'), name='tickets_escalation_unique'),
+        ),
+    ]
@@ -0,0 +1,51 @@
+# Generated by Django 4.2.30 on 2026-10-17 13:32
+
+from django.db import migrations, models
+
+
+# Posición de cada fila en el feed de cambios (ver tickets/sync.py): el ID
+# de la transacción que la insertó o modificó por última vez
+# (pg_current_xact_id(), de 64 bits). No es un campo del modelo: la asigna
+# la base de datos, y el archivo de tickets no la copia (al restaurar un
+# ticket se le asigna una nueva). Las filas anteriores quedan en NULL, que
+# el feed nunca lee: son anteriores a cualquier watermark.
+CHANGE_XID_TABLES = ['tickets_ticket', 'tickets_comment', 'tickets_tombstone']
+
+CHANGE_XID_SQL = """
+CREATE OR REPLACE FUNCTION tickets_change_xid_trigger() RETURNS trigger AS $$
+BEGIN
+    NEW.change_xid := pg_current_xact_id()::text::bigint;
+    RETURN NEW;
+END;
+$$ LANGUAGE plpgsql;
+""" + "".join(f"""
+ALTER TABLE {table} ADD COLUMN change_xid bigint;
+ALTER TABLE {table} ALTER COLUMN change_xid SET DEFAULT pg_current_xact_id()::text::bigint;
+CREATE INDEX {table}_change_xid_idx ON {table} (change_xid, id);
+CREATE TRIGGER {table}_change_xid
+    BEFORE UPDATE ON {table}
+    FOR EACH ROW EXECUTE FUNCTION tickets_change_xid_trigger();
+""" for table in CHANGE_XID_TABLES)
+
+DROP_CHANGE_XID_SQL = "".join(f"""
+DROP TRIGGER IF EXISTS {table}_change_xid ON {table};
+ALTER TABLE {table} DROP COLUMN IF EXISTS change_xid;
+""" for table in CHANGE_XID_TABLES) + """
+DROP FUNCTION IF EXISTS tickets_change_xid_trigger();
+"""
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tickets', '0015_escalation'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='tombstone',
+            name='is_internal',
+            field=models.BooleanField(default=False, verbose_name='Comentario interno'),
+        ),
+        migrations.RunSQL(CHANGE_XID_SQL, DROP_CHANGE_XID_SQL),
+    ]
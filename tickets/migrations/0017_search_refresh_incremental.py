@@ -0,0 +1,147 @@
+from django.db import migrations
+
+
+# Vector de búsqueda de los tickets sin reconstruir todo el documento en
+# cada escritura:
+# - Un comentario público nuevo agrega su vector (ya calculado por el
+#   trigger del comentario) al de su ticket con ||, sin leer los demás.
+# - Editar, mover, ocultar o eliminar un comentario público recalcula el
+#   documento; las escrituras que no cambian el texto visible no lo tocan.
+# - save() escribe todas las columnas del ticket: si el título y la
+#   descripción no cambiaron se conserva el vector anterior.
+# Un tsvector no puede pasar de 1 MB. El documento usa a lo sumo 100.000
+# caracteres de comentarios (los más antiguos), y si al agregar un
+# comentario el vector pasaría del límite, el comentario se guarda pero no
+# se agrega al vector de su ticket.
+INCREMENTAL_REFRESH_SQL = """
+CREATE OR REPLACE FUNCTION tickets_ticket_document(
+    p_ticket_id bigint, p_title text, p_description text
+) RETURNS tsvector AS $$
+    SELECT setweight(to_tsvector('spanish', coalesce(p_title, '')), 'A')
+        || setweight(to_tsvector('spanish', coalesce(p_description, '')), 'B')
+        || setweight(to_tsvector('spanish', left(coalesce((
+            SELECT string_agg(c.content, ' ' ORDER BY c.created_at, c.id)
+            FROM tickets_comment c
+            WHERE c.ticket_id = p_ticket_id AND NOT c.is_internal
+        ), ''), 100000)), 'C');
+$$ LANGUAGE sql STABLE;
+
+CREATE OR REPLACE FUNCTION tickets_ticket_search_vector_trigger() RETURNS trigger AS $$
+BEGIN
+    IF current_setting('tickets.skip_search_refresh', true) = 'on'
+            AND NEW.search_vector IS NOT NULL THEN
+        RETURN NEW;
+    END IF;
+
+    IF TG_OP = 'UPDATE'
+            AND OLD.search_vector IS NOT NULL
+            AND NEW.title IS NOT DISTINCT FROM OLD.title
+            AND NEW.description IS NOT DISTINCT FROM OLD.description THEN
+        NEW.search_vector := OLD.search_vector;
+        RETURN NEW;
+    END IF;
+
+    NEW.search_vector := tickets_ticket_document(NEW.id, NEW.title, NEW.description);
+    RETURN NEW;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE OR REPLACE FUNCTION tickets_comment_refresh_ticket_trigger() RETURNS trigger AS $$
+BEGIN
+    IF current_setting('tickets.skip_search_refresh', true) = 'on' THEN
+        RETURN NULL;
+    END IF;
+
+    IF TG_OP = 'INSERT' THEN
+        IF NOT NEW.is_internal THEN
+            BEGIN
+                UPDATE tickets_ticket t
+                SET search_vector = CASE
+                    WHEN t.search_vector IS NULL
+                        THEN tickets_ticket_document(t.id, t.title, t.description)
+                    ELSE t.search_vector || setweight(NEW.search_vector, 'C')
+                END
+                WHERE t.id = NEW.ticket_id;
+            EXCEPTION WHEN program_limit_exceeded THEN
+                -- El vector del ticket llegó a 1 MB
+                NULL;
+            END;
+        END IF;
+        RETURN NULL;
+    END IF;
+
+    IF TG_OP = 'DELETE' AND OLD.is_internal THEN
+        RETURN NULL;
+    END IF;
+
+    IF TG_OP = 'UPDATE' AND NEW.ticket_id = OLD.ticket_id AND (
+        (NEW.is_internal AND OLD.is_internal)
+        OR (NEW.is_internal = OLD.is_internal AND NEW.content IS NOT DISTINCT FROM OLD.content)
+    ) THEN
+        RETURN NULL;
+    END IF;
+
+    UPDATE tickets_ticket t
+    SET search_vector = tickets_ticket_document(t.id, t.title, t.description)
+    WHERE t.id IN (
+        CASE WHEN TG_OP = 'DELETE' THEN NULL ELSE NEW.ticket_id END,
+        CASE WHEN TG_OP = 'INSERT' THEN NULL ELSE OLD.ticket_id END
+    );
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+"""
+
+# Versiones de 0002_search_vector y 0004_search_refresh_skip
+FULL_REFRESH_SQL = """
+CREATE OR REPLACE FUNCTION tickets_ticket_document(
+    p_ticket_id bigint, p_title text, p_description text
+) RETURNS tsvector AS $$
+    SELECT setweight(to_tsvector('spanish', coalesce(p_title, '')), 'A')
+        || setweight(to_tsvector('spanish', coalesce(p_description, '')), 'B')
+        || setweight(to_tsvector('spanish', coalesce((
+            SELECT string_agg(c.content, ' ')
+            FROM tickets_comment c
+            WHERE c.ticket_id = p_ticket_id AND NOT c.is_internal
+        ), '')), 'C');
+$$ LANGUAGE sql STABLE;
+
+CREATE OR REPLACE FUNCTION tickets_ticket_search_vector_trigger() RETURNS trigger AS $$
+BEGIN
+    IF current_setting('tickets.skip_search_refresh', true) = 'on'
+            AND NEW.search_vector IS NOT NULL THEN
+        RETURN NEW;
+    END IF;
+
+    NEW.search_vector := tickets_ticket_document(NEW.id, NEW.title, NEW.description);
+    RETURN NEW;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE OR REPLACE FUNCTION tickets_comment_refresh_ticket_trigger() RETURNS trigger AS $$
+BEGIN
+    IF current_setting('tickets.skip_search_refresh', true) = 'on' THEN
+        RETURN NULL;
+    END IF;
+
+    UPDATE tickets_ticket t
+    SET search_vector = tickets_ticket_document(t.id, t.title, t.description)
+    WHERE t.id IN (
+        CASE WHEN TG_OP = 'DELETE' THEN NULL ELSE NEW.ticket_id END,
+        CASE WHEN TG_OP = 'INSERT' THEN NULL ELSE OLD.ticket_id END
+    );
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+"""
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tickets', '0016_sync_change_xid'),
+    ]
+
+    operations = [
+        migrations.RunSQL(INCREMENTAL_REFRESH_SQL, FULL_REFRESH_SQL),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 4.2.30 on 2026-10-17 14:08
+
+from django.db import migrations
+
+
+# El feed de cambios lee por (change_xid, id) desde la migración 0016: los
+# índices (updated_at, id) de 0005 ya no se usan y cada escritura los mantiene.
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tickets', '0017_search_refresh_incremental'),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='comment',
+            name='tickets_com_updated_add816_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='ticket',
+            name='tickets_tic_updated_a117e3_idx',
+        ),
+    ]
@@ -5,10 +5,29 @@ Este paquete contiene todos los modelos de datos:
 - Ticket: Modelo principal de tickets
 - Comment: Comentarios en tickets
 - UserProfile: Perfiles extendidos de usuario
+- TicketCounter: Contadores de tickets para el dashboard
+- Tombstone: Registro de tickets y comentarios eliminados
+- Blob: Adjuntos deduplicados por contenido
+- UploadSession: Subidas de adjuntos por partes
+- Job: Cola de tareas en segundo plano
+- ArchivedTicket: Tickets cerrados movidos al archivo
+- ArchivedComment: Comentarios de los tickets archivados
+- Escalation: Tickets escalados automáticamente
+- EscalationCheckpoint: Avance de las reglas de escalamiento
 """
 
 from .ticket import Ticket
 from .comment import Comment
 from .user_profile import UserProfile
+from .ticket_counter import TicketCounter
+from .tombstone import Tombstone
+from .blob import Blob
+from .upload_session import UploadSession
+from .job import Job
+from .archived_ticket import ArchivedTicket
+from .archived_comment import ArchivedComment
+from .escalation import Escalation
+from .escalation_checkpoint import EscalationCheckpoint
 
-__all__ = ['Ticket', 'Comment', 'UserProfile']
+__all__ = ['Ticket', 'Comment', 'UserProfile', 'TicketCounter', 'Tombstone', 'Blob', 'UploadSession', 'Job',
+           'ArchivedTicket', 'ArchivedComment', 'Escalation', 'EscalationCheckpoint']
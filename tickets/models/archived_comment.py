@@ -0,0 +1,88 @@
+"""
+Modelo ArchivedComment - Comentarios de los tickets archivados.
+"""
+
+from django.db import models
+from django.contrib.auth.models import User
+from django.contrib.postgres.search import SearchVectorField
+
+from ..storage import attachment_storage
+from .archived_ticket import ArchivedTicket
+
+
+class ArchivedComment(models.Model):
+    """
+    Comentario de un ticket archivado (ver ArchivedTicket).
+
+    Se particiona por mes igual que su ticket, usando ``ticket_closed_at``
+    (el ``closed_at`` del ticket): los comentarios de un ticket quedan en
+    una sola partición y filtrar por ``ticket_closed_at`` evita recorrer
+    las demás. La clave primaria en la base de datos es
+    (id, ticket_closed_at).
+    """
+
+    id = models.BigIntegerField(primary_key=True, verbose_name='ID')
+
+    # Sin restricciones en la base de datos: la clave de ArchivedTicket
+    # incluye closed_at, y auth_user se vacía con TRUNCATE en las pruebas
+    ticket = models.ForeignKey(
+        ArchivedTicket,
+        on_delete=models.CASCADE,
+        related_name='comments',
+        db_constraint=False,
+        verbose_name='Ticket'
+    )
+
+    ticket_closed_at = models.DateTimeField(verbose_name='Cierre del ticket')
+
+    author = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        related_name='+',
+        db_constraint=False,
+        verbose_name='Autor'
+    )
+
+    content = models.TextField(verbose_name='Contenido')
+
+    attachment = models.FileField(
+        upload_to='attachments/%Y/%m/%d/',
+        storage=attachment_storage,
+        null=True,
+        blank=True,
+        verbose_name='Adjunto'
+    )
+
+    attachment_variants = models.JSONField(
+        default=dict,
+        blank=True,
+        verbose_name='Variantes del adjunto'
+    )
+
+    is_internal = models.BooleanField(default=False, verbose_name='Comentario interno')
+
+    created_at = models.DateTimeField(verbose_name='Fecha de creación')
+
+    updated_at = models.DateTimeField(verbose_name='Última edición')
+
+    search_vector = SearchVectorField(null=True, verbose_name='Vector de búsqueda')
+
+    archived_at = models.DateTimeField(verbose_name='Fecha de archivo')
+
+    class Meta:
+        managed = False
+        verbose_name = 'Comentario archivado'
+        verbose_name_plural = 'Comentarios archivados'
+        ordering = ['created_at']
+
+    def __str__(self):
+        return f"Comentario archivado en Ticket #{self.ticket_id}"
+
+    @classmethod
+    def restore(cls, pk):
+        """
+        Devuelve a las tablas activas el ticket del comentario archivado
+        ``pk``. Retorna False si el comentario no estaba archivado.
+        """
+        ticket_id = cls.objects.filter(pk=pk).values_list('ticket_id', flat=True).first()
+        return ticket_id is not None and ArchivedTicket.restore(ticket_id)
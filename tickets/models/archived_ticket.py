@@ -0,0 +1,279 @@
+"""
+Modelo ArchivedTicket - Tickets cerrados movidos al archivo.
+"""
+
+from datetime import datetime, timedelta, timezone as dt_timezone
+
+from django.conf import settings
+from django.db import connections, models, router, transaction
+from django.contrib.auth.models import User
+from django.contrib.postgres.search import SearchVectorField
+from django.utils import timezone
+
+from .comment import Comment
+from .ticket import Ticket
+
+
+def month_start(value):
+    """Primer instante (UTC) del mes de ``value``."""
+    value = value.astimezone(dt_timezone.utc)
+    return datetime(value.year, value.month, 1, tzinfo=dt_timezone.utc)
+
+
+def next_month(start):
+    if start.month == 12:
+        return start.replace(year=start.year + 1, month=1)
+    return start.replace(month=start.month + 1)
+
+
+class ArchivedTicket(models.Model):
+    """
+    Ticket cerrado hace más de TICKETS_ARCHIVE_AFTER_DAYS días.
+
+    ``archive()`` mueve los tickets con sus comentarios (ArchivedComment)
+    de las tablas activas a estas, particionadas por mes de ``closed_at``,
+    para que las tablas activas y sus índices conserven un tamaño
+    pequeño. Las columnas son las mismas que las de Ticket; el ticket
+    conserva su ID, sus contadores (TicketCounter) y las referencias de
+    sus adjuntos.
+
+    Las tablas se crean en la migración 0011 (Django no crea tablas
+    particionadas) y las particiones de cada mes se crean al archivar.
+    La clave primaria en la base de datos es (id, closed_at).
+
+    Cualquier escritura sobre un ticket archivado lo devuelve primero a
+    las tablas activas con ``restore()``.
+    """
+
+    id = models.BigIntegerField(primary_key=True, verbose_name='ID')
+
+    title = models.CharField(max_length=200, verbose_name='Título')
+
+    description = models.TextField(verbose_name='Descripción')
+
+    status = models.CharField(
+        max_length=20,
+        choices=Ticket.STATUS_CHOICES,
+        verbose_name='Estado'
+    )
+
+    priority = models.CharField(
+        max_length=10,
+        choices=Ticket.PRIORITY_CHOICES,
+        verbose_name='Prioridad'
+    )
+
+    # Sin restricciones en la base de datos (ver la migración 0011); al
+    # eliminar un usuario Django aplica on_delete
+    created_by = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        related_name='+',
+        db_constraint=False,
+        verbose_name='Creado por'
+    )
+
+    assigned_to = models.ForeignKey(
+        User,
+        on_delete=models.SET_NULL,
+        null=True,
+        related_name='+',
+        db_constraint=False,
+        verbose_name='Asignado a'
+    )
+
+    created_at = models.DateTimeField(verbose_name='Fecha de creación')
+
+    updated_at = models.DateTimeField(verbose_name='Última actualización')
+
+    closed_at = models.DateTimeField(verbose_name='Fecha de cierre')
+
+    search_vector = SearchVectorField(null=True, verbose_name='Vector de búsqueda')
+
+    archived_at = models.DateTimeField(verbose_name='Fecha de archivo')
+
+    # Mismas propiedades que Ticket (las usan los serializadores)
+    is_open = Ticket.is_open
+    is_closed = Ticket.is_closed
+    days_open = Ticket.days_open
+
+    class Meta:
+        managed = False
+        verbose_name = 'Ticket archivado'
+        verbose_name_plural = 'Tickets archivados'
+        ordering = ['-created_at']
+
+    def __str__(self):
+        return f"#{self.id} - {self.title} [archivado]"
+
+    @staticmethod
+    def partition_name(table, start):
+        return f'{table}_{start:%Y_%m}'
+
+    @classmethod
+    def create_partitions(cls, months, using=None):
+        """
+        Crea las particiones mensuales que falten para los meses
+        ``months`` (primer instante de cada mes, en UTC), en las tablas de
+        tickets y de comentarios archivados.
+        """
+        from .archived_comment import ArchivedComment
+
+        using = using or router.db_for_write(cls)
+        tables = [cls._meta.db_table, ArchivedComment._meta.db_table]
+        with connections[using].cursor() as cursor:
+            for start in sorted(months):
+                for table in tables:
+                    cursor.execute(
+                        f'CREATE TABLE IF NOT EXISTS {cls.partition_name(table, start)} '
+                        f'PARTITION OF {table} FOR VALUES FROM (%s) TO (%s)',
+                        [start, next_month(start)]
+                    )
+
+    @classmethod
+    def missing_partitions(cls, months, using=None):
+        """Retorna los meses de ``months`` que aún no tienen partición."""
+        using = using or router.db_for_write(cls)
+        names = {cls.partition_name(cls._meta.db_table, start): start for start in months}
+        with connections[using].cursor() as cursor:
+            cursor.execute('SELECT relname FROM pg_class WHERE relname = ANY(%s)', [list(names)])
+            existing = {name for name, in cursor.fetchall()}
+        return {start for name, start in names.items() if name not in existing}
+
+    @classmethod
+    def archive(cls, before, batch_size=500, using=None):
+        """
+        Archiva los tickets cerrados antes de ``before``, en lotes de
+        ``batch_size`` tickets con sus comentarios, cada uno en su propia
+        transacción. Retorna cuántos tickets se archivaron.
+        """
+        using = using or router.db_for_write(cls)
+        total = 0
+        while True:
+            moved, missing = cls._archive_batch(before, batch_size, using)
+            if missing:
+                # Se crean fuera del lote: crear una partición bloquea la tabla
+                cls.create_partitions(missing, using=using)
+                continue
+            total += moved
+            if moved < batch_size:
+                return total
+
+    @classmethod
+    def _archive_batch(cls, before, batch_size, using):
+        """
+        Mueve un lote. Retorna (tickets movidos, meses sin partición); si
+        falta alguna partición no mueve nada.
+        """
+        from .archived_comment import ArchivedComment
+
+        ticket_columns = ', '.join(field.column for field in Ticket._meta.concrete_fields)
+        comment_columns = [field.column for field in Comment._meta.concrete_fields]
+
+        with transaction.atomic(using=using), connections[using].cursor() as cursor:
+            # Los tickets que se están editando quedan para el siguiente lote
+            cursor.execute(
+                f"""
+                SELECT id, closed_at FROM {Ticket._meta.db_table}
+                WHERE status = 'cerrado' AND closed_at < %s
+                ORDER BY closed_at, id
+                LIMIT %s
+                FOR UPDATE SKIP LOCKED
+                """,
+                [before, batch_size]
+            )
+            rows = cursor.fetchall()
+            if not rows:
+                return 0, set()
+
+            missing = cls.missing_partitions({month_start(closed_at) for _, closed_at in rows}, using)
+            if missing:
+                return 0, missing
+
+            ids = [ticket_id for ticket_id, _ in rows]
+            closed = [closed_at for _, closed_at in rows]
+
+            # Los vectores de búsqueda se copian tal cual; borrar los
+            # comentarios no debe recalcular el de su ticket
+            cursor.execute("SET LOCAL tickets.skip_search_refresh = 'on'")
+            cursor.execute(
+                f"""
+                WITH moved AS (
+                    DELETE FROM {Comment._meta.db_table} c
+                    USING unnest(%s::bigint[], %s::timestamptz[]) AS t(id, closed_at)
+                    WHERE c.ticket_id = t.id
+                    RETURNING {', '.join(f'c.{column}' for column in comment_columns)}, t.closed_at
+                )
+                INSERT INTO {ArchivedComment._meta.db_table}
+                    ({', '.join(comment_columns)}, ticket_closed_at, archived_at)
+                SELECT moved.*, now() FROM moved
+                """,
+                [ids, closed]
+            )
+            cursor.execute(
+                f"""
+                WITH moved AS (
+                    DELETE FROM {Ticket._meta.db_table}
+                    WHERE id = ANY(%s)
+                    RETURNING {ticket_columns}
+                )
+                INSERT INTO {cls._meta.db_table} ({ticket_columns}, archived_at)
+                SELECT moved.*, now() FROM moved
+                """,
+                [ids]
+            )
+            return cursor.rowcount, set()
+
+    @classmethod
+    def restore(cls, pk, using=None):
+        """
+        Devuelve el ticket archivado ``pk`` y sus comentarios a las tablas
+        activas. Retorna False si el ticket no estaba archivado.
+        """
+        from .archived_comment import ArchivedComment
+
+        using = using or router.db_for_write(cls)
+        ticket_columns = ', '.join(field.column for field in Ticket._meta.concrete_fields)
+        comment_columns = ', '.join(field.column for field in Comment._meta.concrete_fields)
+
+        with transaction.atomic(using=using), connections[using].cursor() as cursor:
+            # El ticket vuelve igual: sin recalcular su vector de búsqueda
+            # ni publicar eventos en vivo
+            cursor.execute("SET LOCAL tickets.skip_search_refresh = 'on'")
+            cursor.execute("SET LOCAL tickets.skip_notify = 'on'")
+            cursor.execute(
+                f"""
+                WITH moved AS (
+                    DELETE FROM {cls._meta.db_table}
+                    WHERE id = %s
+                    RETURNING {ticket_columns}
+                )
+                INSERT INTO {Ticket._meta.db_table} ({ticket_columns})
+                SELECT * FROM moved
+                RETURNING closed_at
+                """,
+                [pk]
+            )
+            row = cursor.fetchone()
+            if row is None:
+                return False
+            cursor.execute(
+                f"""
+                WITH moved AS (
+                    DELETE FROM {ArchivedComment._meta.db_table}
+                    WHERE ticket_id = %s AND ticket_closed_at = %s
+                    RETURNING {comment_columns}
+                )
+                INSERT INTO {Comment._meta.db_table} ({comment_columns})
+                SELECT * FROM moved
+                """,
+                [pk, row[0]]
+            )
+        return True
+
+    @classmethod
+    def cutoff(cls, days=None):
+        """Fecha antes de la cual se archivan los tickets cerrados."""
+        if days is None:
+            days = settings.TICKETS_ARCHIVE_AFTER_DAYS
+        return timezone.now() - timedelta(days=days)
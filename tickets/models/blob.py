@@ -0,0 +1,185 @@
+"""
+Modelo Blob - Archivos adjuntos deduplicados y su conteo de referencias.
+"""
+
+import os
+from datetime import timedelta
+
+from django.db import models, transaction
+from django.db.models import F
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import receiver
+from django.utils import timezone
+
+from .archived_comment import ArchivedComment
+from .comment import Comment
+
+
+class Blob(models.Model):
+    """
+    Archivo guardado una sola vez por su contenido (ver tickets/storage.py).
+
+    ``ref_count`` es el número de comentarios cuyo adjunto es este blob.
+    Cuando llega a cero, el archivo y la fila se eliminan al confirmar la
+    transacción.
+
+    Las filas con ``ref_count`` cero que quedan de subidas cuya
+    transacción no se confirmó se limpian con ``manage.py purge_blobs``.
+    """
+
+    # Antigüedad mínima de lo que elimina purge(), para no tocar subidas en curso
+    GRACE = timedelta(hours=24)
+
+    name = models.CharField(
+        max_length=255,
+        primary_key=True,
+        verbose_name='Nombre'
+    )
+
+    digest = models.CharField(
+        max_length=64,
+        verbose_name='SHA-256'
+    )
+
+    size = models.PositiveBigIntegerField(
+        verbose_name='Tamaño (bytes)'
+    )
+
+    ref_count = models.PositiveIntegerField(
+        default=0,
+        verbose_name='Referencias'
+    )
+
+    created_at = models.DateTimeField(
+        auto_now_add=True,
+        verbose_name='Fecha de creación'
+    )
+
+    class Meta:
+        verbose_name = 'Blob'
+        verbose_name_plural = 'Blobs'
+
+    def __str__(self):
+        return f"{self.name} ({self.ref_count} referencias)"
+
+    @classmethod
+    def claim(cls, name, digest, size):
+        """
+        Crea el blob si no existe y bloquea su fila hasta el final de la
+        transacción.
+        """
+        cls.objects.bulk_create(
+            [cls(name=name, digest=digest, size=size)],
+            update_conflicts=True,
+            unique_fields=['name'],
+            update_fields=['size']
+        )
+
+    @classmethod
+    def acquire(cls, name):
+        """Agrega una referencia al blob ``name``."""
+        cls.objects.filter(name=name).update(ref_count=F('ref_count') + 1)
+
+    @classmethod
+    def release(cls, name):
+        """
+        Quita una referencia al blob ``name``; si era la última, el
+        archivo se elimina al confirmar la transacción.
+        """
+        updated = cls.objects.filter(name=name, ref_count__gt=0).update(
+            ref_count=F('ref_count') - 1
+        )
+        if updated:
+            transaction.on_commit(lambda: cls.collect(name))
+
+    @classmethod
+    def collect(cls, name):
+        """
+        Elimina el blob ``name``, su archivo y sus variantes reducidas si ya
+        no tiene referencias.
+        """
+        from ..thumbnails import delete_variants
+
+        field = Comment._meta.get_field('attachment')
+        with transaction.atomic():
+            blob = cls.objects.select_for_update().filter(name=name, ref_count=0).first()
+            if blob is None:
+                return False
+            blob.delete()
+            field.storage.delete(name)
+            delete_variants(name)
+        return True
+
+    @classmethod
+    def purge(cls, before=None):
+        """
+        Elimina los blobs sin referencias, los archivos de ``blobs/`` sin
+        fila y los temporales de subidas interrumpidas anteriores a
+        ``before`` (por defecto, los que superan GRACE). Los temporales de
+        las subidas por partes no se tocan.
+
+        Retorna (blobs eliminados, archivos huérfanos eliminados).
+        """
+        storage = Comment._meta.get_field('attachment').storage
+        before = before or timezone.now() - cls.GRACE
+
+        unreferenced = cls.objects.filter(ref_count=0, created_at__lt=before)
+        blobs = sum(cls.collect(name) for name in unreferenced.values_list('name', flat=True))
+
+        files = 0
+        cutoff = before.timestamp()
+        root = storage.path(storage.prefix)
+        for directory, _, filenames in os.walk(root):
+            for filename in filenames:
+                path = os.path.join(directory, filename)
+                name = os.path.relpath(path, storage.location).replace(os.sep, '/')
+                if os.path.getmtime(path) >= cutoff:
+                    continue
+                if os.path.basename(directory) == storage.temp_dir:
+                    if filename.startswith('upload-'):
+                        continue
+                elif cls.objects.filter(name=name).exists():
+                    continue
+                os.remove(path)
+                files += 1
+
+        return blobs, files
+
+
+def _is_blob(name):
+    return Comment._meta.get_field('attachment').storage.is_blob(name)
+
+
+@receiver(pre_save, sender=Comment)
+def remember_previous_attachment(sender, instance, update_fields=None, **kwargs):
+    """Signal que guarda el adjunto anterior de un comentario que se edita."""
+    instance._previous_attachment = ''
+    if instance._state.adding or instance.pk is None:
+        return
+    if update_fields is not None and 'attachment' not in update_fields:
+        return
+    instance._previous_attachment = Comment.objects.filter(
+        pk=instance.pk
+    ).values_list('attachment', flat=True).first() or ''
+
+
+@receiver(post_save, sender=Comment)
+def count_attachment_references(sender, instance, **kwargs):
+    """Signal que actualiza las referencias si cambió el adjunto."""
+    previous = getattr(instance, '_previous_attachment', '')
+    current = instance.attachment.name or ''
+    if previous == current:
+        return
+    if _is_blob(current):
+        Blob.acquire(current)
+    if _is_blob(previous):
+        Blob.release(previous)
+
+
+@receiver(post_delete, sender=Comment)
+@receiver(post_delete, sender=ArchivedComment)
+def release_attachment(sender, instance, **kwargs):
+    """Signal que quita la referencia del adjunto de un comentario eliminado."""
+    name = instance.attachment.name or ''
+    if _is_blob(name):
+        Blob.release(name)
@@ -2,10 +2,14 @@
 Modelo Comment - Comentarios en tickets.
 """
 
-from django.db import models
+from django.db import models, transaction
 from django.contrib.auth.models import User
+from django.contrib.postgres.indexes import GinIndex
+from django.contrib.postgres.search import SearchVectorField
 from django.core.validators import MinLengthValidator
 
+from ..storage import attachment_storage
+
 
 class Comment(models.Model):
     """
@@ -37,14 +41,25 @@ class Comment(models.Model):
         validators=[MinLengthValidator(3, 'El comentario debe tener al menos 3 caracteres')]
     )
     
+    # Deduplicado por contenido; ver tickets/storage.py y el modelo Blob
     attachment = models.FileField(
         upload_to='attachments/%Y/%m/%d/',
+        storage=attachment_storage,
         null=True,
         blank=True,
         verbose_name='Adjunto',
         help_text='Archivo adjunto opcional (máximo 10MB)'
     )
     
+    # {variante: nombre del archivo WebP} si el adjunto es una imagen,
+    # generado en segundo plano (ver tickets/thumbnails.py)
+    attachment_variants = models.JSONField(
+        default=dict,
+        blank=True,
+        editable=False,
+        verbose_name='Variantes del adjunto'
+    )
+    
     is_internal = models.BooleanField(
         default=False,
         verbose_name='Comentario interno',
@@ -61,18 +76,36 @@ class Comment(models.Model):
         verbose_name='Última edición'
     )
     
+    # Búsqueda de texto completo, mantenido por un trigger de PostgreSQL
+    search_vector = SearchVectorField(
+        null=True,
+        editable=False,
+        verbose_name='Vector de búsqueda'
+    )
+    
     class Meta:
         verbose_name = 'Comentario'
         verbose_name_plural = 'Comentarios'
         ordering = ['created_at']
         indexes = [
             models.Index(fields=['ticket', 'created_at']),
+            # Comentarios de un rango de fechas (escalamiento, ver tickets/escalation.py)
+            models.Index(fields=['created_at', 'ticket']),
             models.Index(fields=['author']),
+            GinIndex(fields=['search_vector'], name='tickets_comment_search_gin'),
         ]
     
     def __str__(self):
         return f"Comentario de {self.author.username} en Ticket #{self.ticket.id}"
     
+    def save(self, *args, **kwargs):
+        """
+        Guarda el comentario, su adjunto y las referencias del blob en una
+        sola transacción.
+        """
+        with transaction.atomic(using=kwargs.get('using')):
+            super().save(*args, **kwargs)
+    
     @property
     def is_edited(self):
         """Retorna True si el comentario fue editado después de su creación."""
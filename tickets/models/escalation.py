@@ -0,0 +1,71 @@
+"""
+Modelo Escalation - Tickets escalados automáticamente.
+"""
+
+from django.db import models
+from django.utils import timezone
+
+from .ticket import Ticket
+
+
+class Escalation(models.Model):
+    """
+    Escalamiento automático de un ticket (ver tickets/escalation.py).
+
+    Hay uno por ticket, regla y ``since`` (desde cuándo cuenta el plazo):
+    revisar dos veces el mismo periodo no escala dos veces el ticket, y un
+    comentario nuevo abre un periodo distinto.
+    """
+
+    RULE_UNANSWERED = 'unanswered'
+    RULE_UNASSIGNED = 'unassigned'
+
+    RULE_CHOICES = [
+        (RULE_UNANSWERED, 'Sin respuesta'),
+        (RULE_UNASSIGNED, 'Sin asignar'),
+    ]
+
+    # Sin restricción en la base de datos: el archivo mueve los tickets con
+    # DELETE y conservan su ID (ver ArchivedTicket)
+    ticket = models.ForeignKey(
+        Ticket,
+        on_delete=models.CASCADE,
+        related_name='escalations',
+        db_constraint=False,
+        verbose_name='Ticket'
+    )
+
+    rule = models.CharField(
+        max_length=20,
+        choices=RULE_CHOICES,
+        verbose_name='Regla'
+    )
+
+    since = models.DateTimeField(
+        verbose_name='Plazo contado desde'
+    )
+
+    # {'priority': nueva prioridad} o {'assigned_to': ID del agente}
+    actions = models.JSONField(
+        default=dict,
+        blank=True,
+        verbose_name='Acciones'
+    )
+
+    created_at = models.DateTimeField(
+        default=timezone.now,
+        verbose_name='Fecha de escalamiento'
+    )
+
+    class Meta:
+        verbose_name = 'Escalamiento'
+        verbose_name_plural = 'Escalamientos'
+        constraints = [
+            models.UniqueConstraint(
+                fields=['ticket', 'rule', 'since'],
+                name='tickets_escalation_unique'
+            ),
+        ]
+
+    def __str__(self):
+        return f"Ticket #{self.ticket_id} escalado ({self.get_rule_display()})"
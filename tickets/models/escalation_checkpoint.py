@@ -0,0 +1,50 @@
+"""
+Modelo EscalationCheckpoint - Avance de las reglas de escalamiento.
+"""
+
+from django.db import models, router
+
+from .escalation import Escalation
+
+
+class EscalationCheckpoint(models.Model):
+    """
+    Momento hasta el que se revisó cada regla de escalamiento (ver
+    tickets/escalation.py). La siguiente revisión solo busca los tickets
+    cuyo plazo venció después.
+    """
+
+    rule = models.CharField(
+        max_length=20,
+        primary_key=True,
+        choices=Escalation.RULE_CHOICES,
+        verbose_name='Regla'
+    )
+
+    checked_until = models.DateTimeField(
+        verbose_name='Revisado hasta'
+    )
+
+    class Meta:
+        verbose_name = 'Avance de escalamiento'
+        verbose_name_plural = 'Avances de escalamiento'
+
+    def __str__(self):
+        return f"{self.rule} revisado hasta {self.checked_until}"
+
+    @classmethod
+    def checked(cls, rule, using=None):
+        """Retorna hasta cuándo se revisó ``rule``, o None si nunca."""
+        using = using or router.db_for_write(cls)
+        return cls.objects.using(using).filter(rule=rule).values_list(
+            'checked_until', flat=True
+        ).first()
+
+    @classmethod
+    def advance(cls, rule, checked_until, using=None):
+        """Registra que ``rule`` se revisó hasta ``checked_until``."""
+        using = using or router.db_for_write(cls)
+        cls.objects.using(using).update_or_create(
+            rule=rule,
+            defaults={'checked_until': checked_until}
+        )
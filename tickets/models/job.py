@@ -0,0 +1,214 @@
+"""
+Modelo Job - Cola de tareas en segundo plano.
+"""
+
+from datetime import timedelta
+
+from django.db import models, router
+from django.db.models import Q
+from django.utils import timezone
+
+
+class Job(models.Model):
+    """
+    Tarea pendiente de ejecutar fuera de la petición (ver tickets/jobs.py).
+
+    Los workers (``manage.py run_jobs``) reclaman las tareas vencidas con
+    ``SELECT ... FOR UPDATE SKIP LOCKED``: cada tarea la toma un solo
+    worker y ninguno espera a los demás. Una tarea que falla se reintenta
+    más tarde hasta ``max_attempts`` veces; una que quedó ``running``
+    porque su worker murió se vuelve a encolar tras
+    TICKETS_JOBS_TIMEOUT.
+
+    Las tareas terminadas o fallidas se conservan ``RETENTION``.
+    """
+
+    STATUS_PENDING = 'pending'
+    STATUS_RUNNING = 'running'
+    STATUS_DONE = 'done'
+    STATUS_FAILED = 'failed'
+
+    STATUS_CHOICES = [
+        (STATUS_PENDING, 'Pendiente'),
+        (STATUS_RUNNING, 'En ejecución'),
+        (STATUS_DONE, 'Terminada'),
+        (STATUS_FAILED, 'Fallida'),
+    ]
+
+    RETENTION = timedelta(days=7)
+
+    task = models.CharField(
+        max_length=100,
+        verbose_name='Tarea'
+    )
+
+    kwargs = models.JSONField(
+        default=dict,
+        blank=True,
+        verbose_name='Argumentos'
+    )
+
+    status = models.CharField(
+        max_length=10,
+        choices=STATUS_CHOICES,
+        default=STATUS_PENDING,
+        verbose_name='Estado'
+    )
+
+    run_at = models.DateTimeField(
+        default=timezone.now,
+        verbose_name='Ejecutar a partir de'
+    )
+
+    attempts = models.PositiveIntegerField(
+        default=0,
+        verbose_name='Intentos'
+    )
+
+    max_attempts = models.PositiveIntegerField(
+        default=5,
+        verbose_name='Intentos máximos'
+    )
+
+    last_error = models.TextField(
+        blank=True,
+        verbose_name='Último error'
+    )
+
+    locked_by = models.CharField(
+        max_length=100,
+        blank=True,
+        verbose_name='Worker'
+    )
+
+    locked_at = models.DateTimeField(
+        null=True,
+        blank=True,
+        verbose_name='Inicio de la ejecución'
+    )
+
+    created_at = models.DateTimeField(
+        auto_now_add=True,
+        verbose_name='Fecha de creación'
+    )
+
+    finished_at = models.DateTimeField(
+        null=True,
+        blank=True,
+        verbose_name='Fecha de término'
+    )
+
+    class Meta:
+        verbose_name = 'Tarea'
+        verbose_name_plural = 'Tareas'
+        indexes = [
+            # Solo las pendientes: la consulta de los workers no recorre
+            # el historial de tareas terminadas
+            models.Index(
+                fields=['run_at', 'id'],
+                condition=Q(status='pending'),
+                name='tickets_job_pending_idx'
+            ),
+            models.Index(
+                fields=['locked_at'],
+                condition=Q(status='running'),
+                name='tickets_job_running_idx'
+            ),
+            models.Index(fields=['task', 'status']),
+        ]
+
+    def __str__(self):
+        return f"{self.task} #{self.pk} ({self.get_status_display()})"
+
+    @classmethod
+    def claim(cls, worker, limit=1, pk=None):
+        """
+        Marca como ``running`` hasta ``limit`` tareas vencidas (o solo la
+        tarea ``pk``) que ningún otro worker tenga bloqueadas y las retorna.
+        """
+        table = cls._meta.db_table
+        only = 'AND id = %s' if pk is not None else ''
+        params = [cls.STATUS_RUNNING, worker, cls.STATUS_PENDING]
+        if pk is not None:
+            params.append(pk)
+        params.append(limit)
+
+        return list(cls.objects.db_manager(router.db_for_write(cls)).raw(
+            f"""
+            UPDATE {table}
+            SET status = %s, attempts = attempts + 1,
+                locked_by = %s, locked_at = now()
+            WHERE id IN (
+                SELECT id FROM {table}
+                WHERE status = %s AND run_at <= now() {only}
+                ORDER BY run_at, id
+                LIMIT %s
+                FOR UPDATE SKIP LOCKED
+            )
+            RETURNING *
+            """,
+            params
+        ))
+
+    def finish(self):
+        """Marca la tarea como terminada."""
+        self._release(status=self.STATUS_DONE, finished_at=timezone.now())
+
+    def retry(self, run_at, error='', count_attempt=True):
+        """
+        Devuelve la tarea a la cola para ``run_at``. Sin ``count_attempt``
+        el intento no cuenta (la tarea no llegó a ejecutarse).
+        """
+        fields = {'status': self.STATUS_PENDING, 'run_at': run_at, 'last_error': error}
+        if not count_attempt:
+            fields['attempts'] = models.F('attempts') - 1
+        self._release(**fields)
+
+    def fail(self, error):
+        """Marca la tarea como fallida definitivamente."""
+        self._release(
+            status=self.STATUS_FAILED,
+            last_error=error,
+            finished_at=timezone.now()
+        )
+
+    def _release(self, **fields):
+        # Solo si sigue siendo de este worker: si se volvió a encolar por
+        # tiempo agotado, otro worker ya pudo tomarla
+        Job.objects.filter(
+            pk=self.pk,
+            status=self.STATUS_RUNNING,
+            locked_by=self.locked_by
+        ).update(locked_by='', locked_at=None, **fields)
+
+    @classmethod
+    def requeue_stale(cls, before):
+        """
+        Devuelve a la cola las tareas ``running`` desde antes de ``before``
+        (su worker murió o se colgó), o las marca como fallidas si ya
+        agotaron sus intentos. Retorna cuántas se recuperaron.
+        """
+        stale = cls.objects.filter(status=cls.STATUS_RUNNING, locked_at__lt=before)
+        error = 'Tiempo de ejecución agotado'
+        failed = stale.filter(attempts__gte=models.F('max_attempts')).update(
+            status=cls.STATUS_FAILED, last_error=error,
+            locked_by='', locked_at=None, finished_at=timezone.now()
+        )
+        requeued = stale.update(
+            status=cls.STATUS_PENDING, last_error=error,
+            locked_by='', locked_at=None, run_at=timezone.now()
+        )
+        return failed + requeued
+
+    @classmethod
+    def purge(cls, before=None):
+        """
+        Elimina las tareas terminadas o fallidas antes de ``before`` (por
+        defecto, las que superan RETENTION). Retorna cuántas se eliminaron.
+        """
+        before = before or timezone.now() - cls.RETENTION
+        deleted, _ = cls.objects.filter(
+            status__in=[cls.STATUS_DONE, cls.STATUS_FAILED],
+            finished_at__lt=before
+        ).delete()
+        return deleted
@@ -2,11 +2,24 @@
 Modelo Ticket - Gestión de tickets de soporte.
 """
 
-from django.db import models
+from django.db import models, router, transaction
 from django.contrib.auth.models import User
+from django.contrib.postgres.indexes import GinIndex
+from django.contrib.postgres.search import SearchVectorField
 from django.core.validators import MinLengthValidator
 
 
+# Estados en los que el ticket sigue abierto
+OPEN_STATUSES = ['abierto', 'en_progreso']
+
+# Orden de atención por prioridad (el orden alfabético no sirve: alta,
+# baja, media). Lo usan el índice de la cola y Ticket.claim_next().
+PRIORITY_RANK = models.Case(
+    models.When(priority='alta', then=models.Value(0)),
+    models.When(priority='media', then=models.Value(1)),
+    default=models.Value(2),
+)
+
 class Ticket(models.Model):
     """
     Modelo principal para gestionar tickets en el sistema.
@@ -96,6 +109,15 @@ class Ticket(models.Model):
         verbose_name='Fecha de cierre'
     )
     
+    # Búsqueda de texto completo
+    # Mantenido por un trigger de PostgreSQL (ver migración 0002):
+    # título (A) > descripción (B) > comentarios públicos (C)
+    search_vector = SearchVectorField(
+        null=True,
+        editable=False,
+        verbose_name='Vector de búsqueda'
+    )
+    
     class Meta:
         verbose_name = 'Ticket'
         verbose_name_plural = 'Tickets'
@@ -103,6 +125,34 @@ class Ticket(models.Model):
         indexes = [
             models.Index(fields=['-created_at', 'status']),
             models.Index(fields=['priority', 'status']),
+            GinIndex(fields=['search_vector'], name='tickets_ticket_search_gin'),
+            # Tickets por archivar (ver ArchivedTicket.archive())
+            models.Index(
+                fields=['closed_at', 'id'],
+                condition=models.Q(status='cerrado'),
+                name='tickets_ticket_closed_idx'
+            ),
+            # Cola de soporte: abiertos sin asignar (ver claim_next())
+            models.Index(
+                PRIORITY_RANK,
+                models.F('created_at'),
+                models.F('id'),
+                condition=models.Q(status='abierto', assigned_to__isnull=True),
+                name='tickets_ticket_queue_idx'
+            ),
+            # Edad y SLA (ver tickets/sla.py): abiertos por fecha de
+            # creación y cerrados por tiempo de resolución, por prioridad
+            models.Index(
+                fields=['priority', 'created_at'],
+                condition=models.Q(status__in=OPEN_STATUSES),
+                name='tickets_ticket_open_age_idx'
+            ),
+            models.Index(
+                models.F('priority'),
+                models.F('closed_at') - models.F('created_at'),
+                condition=models.Q(status='cerrado'),
+                name='tickets_ticket_resolution_idx'
+            ),
         ]
     
     def __str__(self):
@@ -112,20 +162,73 @@ class Ticket(models.Model):
         """
         Override para actualizar automáticamente la fecha de cierre
         cuando el ticket cambia a estado 'cerrado'.
+        
+        También actualiza los contadores del dashboard (TicketCounter) en
+        la misma transacción. Los valores anteriores se leen con
+        SELECT ... FOR UPDATE para que dos guardados concurrentes del mismo
+        ticket no descuenten dos veces el mismo estado.
         """
         from django.utils import timezone
+        from .ticket_counter import TicketCounter
         
         if self.status == 'cerrado' and not self.closed_at:
             self.closed_at = timezone.now()
         elif self.status != 'cerrado' and self.closed_at:
             self.closed_at = None
         
-        super().save(*args, **kwargs)
+        using = kwargs.get('using') or router.db_for_write(type(self), instance=self)
+        update_fields = kwargs.get('update_fields')
+        
+        with transaction.atomic(using=using):
+            old = None
+            if not self._state.adding and self.pk is not None:
+                old = type(self)._base_manager.using(using).select_for_update().filter(
+                    pk=self.pk
+                ).values(*TicketCounter.TRACKED_FIELDS).first()
+            
+            super().save(*args, **kwargs)
+            # Las anotaciones de edad y SLA (tickets/sla.py) ya no valen
+            for name in ('age', 'sla_due_at', 'sla_breached'):
+                self.__dict__.pop(name, None)
+            
+            new = {}
+            for field in TicketCounter.TRACKED_FIELDS:
+                name = field[:-3] if field.endswith('_id') else field
+                if old is not None and update_fields is not None \
+                        and field not in update_fields and name not in update_fields:
+                    new[field] = old[field]
+                else:
+                    new[field] = getattr(self, field)
+            
+            TicketCounter.apply_change(old, new, using=using)
+    
+    @classmethod
+    def claim_next(cls, user, using=None):
+        """
+        Asigna a ``user`` el ticket abierto sin asignar de mayor prioridad
+        y más antiguo, y lo pasa a 'en_progreso'. Retorna el ticket, o
+        None si la cola está vacía.
+        
+        Con FOR UPDATE SKIP LOCKED cada agente salta los tickets que otro
+        está tomando en ese momento: dos agentes nunca reciben el mismo
+        ticket y ninguno espera al otro.
+        """
+        using = using or router.db_for_write(cls)
+        with transaction.atomic(using=using):
+            ticket = cls.objects.using(using).select_for_update(skip_locked=True).filter(
+                status='abierto', assigned_to__isnull=True
+            ).order_by(PRIORITY_RANK, 'created_at', 'id').defer('search_vector').first()
+            if ticket is None:
+                return None
+            ticket.assigned_to = user
+            ticket.status = 'en_progreso'
+            ticket.save(using=using, update_fields=['assigned_to', 'status', 'updated_at'])
+        return ticket
     
     @property
     def is_open(self):
         """Retorna True si el ticket está abierto o en progreso."""
-        return self.status in ['abierto', 'en_progreso']
+        return self.status in OPEN_STATUSES
     
     @property
     def is_closed(self):
@@ -134,8 +237,17 @@ class Ticket(models.Model):
     
     @property
     def days_open(self):
-        """Calcula los días que el ticket ha estado abierto."""
+        """
+        Calcula los días que el ticket ha estado abierto.
+        
+        Usa la anotación ``age`` (calculada en SQL, ver tickets/sla.py) si
+        la consulta la incluye.
+        """
         from django.utils import timezone
         
+        age = getattr(self, 'age', None)
+        if age is not None:
+            return age.days
+        
         end_date = self.closed_at if self.closed_at else timezone.now()
         return (end_date - self.created_at).days
@@ -0,0 +1,245 @@
+"""
+Modelo TicketCounter - Contadores de tickets para el dashboard.
+"""
+
+from collections import Counter
+
+from django.db import models, connections, router, transaction
+from django.db.models.signals import post_delete
+from django.dispatch import receiver
+
+from .archived_ticket import ArchivedTicket
+from .ticket import Ticket
+
+
+class TicketCounter(models.Model):
+    """
+    Tabla resumen con el número de tickets por estado y prioridad.
+
+    Cada ticket suma 1 en tres filas: el total general, la de su usuario
+    asignado (``user_id=0`` si no tiene) y la de su creador. Ticket.save()
+    y la eliminación de tickets actualizan los contadores en la misma
+    transacción, de modo que las estadísticas se leen sin recorrer la
+    tabla de tickets. ``manage.py rebuild_ticket_stats`` los recalcula
+    desde cero.
+    """
+
+    SCOPE_ALL = 'all'
+    SCOPE_ASSIGNED_TO = 'assigned_to'
+    SCOPE_CREATED_BY = 'created_by'
+
+    SCOPE_CHOICES = [
+        (SCOPE_ALL, 'Todos'),
+        (SCOPE_ASSIGNED_TO, 'Asignado a'),
+        (SCOPE_CREATED_BY, 'Creado por'),
+    ]
+
+    # Campos de Ticket que determinan en qué contadores cuenta
+    TRACKED_FIELDS = ('status', 'priority', 'assigned_to_id', 'created_by_id')
+
+    scope = models.CharField(
+        max_length=20,
+        choices=SCOPE_CHOICES,
+        verbose_name='Ámbito'
+    )
+
+    user_id = models.BigIntegerField(
+        default=0,
+        verbose_name='Usuario',
+        help_text='ID del usuario del ámbito (0 = sin usuario)'
+    )
+
+    status = models.CharField(
+        max_length=20,
+        choices=Ticket.STATUS_CHOICES,
+        verbose_name='Estado'
+    )
+
+    priority = models.CharField(
+        max_length=10,
+        choices=Ticket.PRIORITY_CHOICES,
+        verbose_name='Prioridad'
+    )
+
+    count = models.IntegerField(
+        default=0,
+        verbose_name='Cantidad'
+    )
+
+    class Meta:
+        verbose_name = 'Contador de tickets'
+        verbose_name_plural = 'Contadores de tickets'
+        constraints = [
+            models.UniqueConstraint(
+                fields=['scope', 'user_id', 'status', 'priority'],
+                name='tickets_counter_unique_key'
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.scope}:{self.user_id} {self.status}/{self.priority} = {self.count}"
+
+    @classmethod
+    def keys_for(cls, values):
+        """
+        Retorna las claves de contador de un ticket.
+
+        ``values`` es un diccionario con los campos de TRACKED_FIELDS.
+        """
+        status = values['status']
+        priority = values['priority']
+        return [
+            (cls.SCOPE_ALL, 0, status, priority),
+            (cls.SCOPE_ASSIGNED_TO, values['assigned_to_id'] or 0, status, priority),
+            (cls.SCOPE_CREATED_BY, values['created_by_id'], status, priority),
+        ]
+
+    @classmethod
+    def apply_change(cls, old=None, new=None, using=None):
+        """
+        Ajusta los contadores cuando un ticket pasa de ``old`` a ``new``.
+
+        ``old`` es None al crear un ticket y ``new`` es None al eliminarlo.
+        """
+        deltas = Counter()
+        if old is not None:
+            for key in cls.keys_for(old):
+                deltas[key] -= 1
+        if new is not None:
+            for key in cls.keys_for(new):
+                deltas[key] += 1
+        cls.apply_deltas(deltas, using=using)
+
+    @classmethod
+    def apply_deltas(cls, deltas, using=None):
+        """
+        Suma ``deltas`` ({clave: incremento}) a los contadores con un
+        solo INSERT ... ON CONFLICT.
+
+        Las filas se escriben ordenadas por clave para que transacciones
+        concurrentes las bloqueen siempre en el mismo orden.
+        """
+        rows = sorted((key, delta) for key, delta in deltas.items() if delta)
+        if not rows:
+            return
+
+        using = using or router.db_for_write(cls)
+        table = cls._meta.db_table
+        placeholders = ', '.join(['(%s, %s, %s, %s, %s)'] * len(rows))
+        params = [value for key, delta in rows for value in (*key, delta)]
+
+        with connections[using].cursor() as cursor:
+            cursor.execute(
+                f'INSERT INTO {table} (scope, user_id, status, priority, count) '
+                f'VALUES {placeholders} '
+                f'ON CONFLICT (scope, user_id, status, priority) '
+                f'DO UPDATE SET count = {table}.count + EXCLUDED.count',
+                params
+            )
+
+    @classmethod
+    def rebuild(cls, using=None):
+        """
+        Recalcula todos los contadores a partir de los tickets activos y
+        archivados.
+
+        Bloquea las escrituras sobre tickets mientras dura la transacción
+        para que ningún cambio se pierda entre el borrado y el recálculo.
+        """
+        using = using or router.db_for_write(cls)
+        table = cls._meta.db_table
+        columns = ', '.join(cls.TRACKED_FIELDS)
+        active = Ticket._meta.db_table
+        archived = ArchivedTicket._meta.db_table
+        tickets = f'(SELECT {columns} FROM {active} UNION ALL SELECT {columns} FROM {archived}) t'
+
+        with transaction.atomic(using=using), connections[using].cursor() as cursor:
+            cursor.execute(f'LOCK TABLE {active}, {archived} IN SHARE MODE')
+            cursor.execute(f'DELETE FROM {table}')
+            cursor.execute(
+                f"""
+                INSERT INTO {table} (scope, user_id, status, priority, count)
+                SELECT %s, 0, status, priority, COUNT(*)
+                FROM {tickets} GROUP BY status, priority
+                UNION ALL
+                SELECT %s, COALESCE(assigned_to_id, 0), status, priority, COUNT(*)
+                FROM {tickets} GROUP BY COALESCE(assigned_to_id, 0), status, priority
+                UNION ALL
+                SELECT %s, created_by_id, status, priority, COUNT(*)
+                FROM {tickets} GROUP BY created_by_id, status, priority
+                """,
+                [cls.SCOPE_ALL, cls.SCOPE_ASSIGNED_TO, cls.SCOPE_CREATED_BY]
+            )
+
+    @staticmethod
+    def _status_counts():
+        counts = {status: 0 for status, _ in Ticket.STATUS_CHOICES}
+        counts['total'] = 0
+        return counts
+
+    @classmethod
+    def summary(cls, user):
+        """
+        Retorna las estadísticas del dashboard para ``user``.
+
+        Lee solo filas de contadores: el tamaño de la consulta depende del
+        número de agentes, no del número de tickets.
+        """
+        from django.contrib.auth.models import User
+
+        by_status = cls._status_counts()
+        by_priority = {
+            priority: cls._status_counts()
+            for priority, _ in Ticket.PRIORITY_CHOICES
+        }
+        by_assignee = {}
+        me = {'created': cls._status_counts(), 'assigned': cls._status_counts()}
+
+        rows = cls.objects.filter(
+            models.Q(scope__in=[cls.SCOPE_ALL, cls.SCOPE_ASSIGNED_TO])
+            | models.Q(scope=cls.SCOPE_CREATED_BY, user_id=user.pk)
+        ).exclude(count=0).values_list('scope', 'user_id', 'status', 'priority', 'count')
+
+        for scope, user_id, status, priority, count in rows:
+            if scope == cls.SCOPE_ALL:
+                targets = [by_status, by_priority[priority]]
+            elif scope == cls.SCOPE_CREATED_BY:
+                targets = [me['created']]
+            else:
+                targets = [by_assignee.setdefault(user_id, cls._status_counts())]
+                if user_id == user.pk:
+                    targets.append(me['assigned'])
+
+            for target in targets:
+                target[status] += count
+                target['total'] += count
+
+        usernames = dict(
+            User.objects.filter(pk__in=by_assignee).values_list('pk', 'username')
+        )
+
+        return {
+            'by_status': by_status,
+            'by_priority': by_priority,
+            'by_assignee': [
+                {
+                    'user_id': user_id or None,
+                    'username': usernames.get(user_id),
+                    **counts,
+                }
+                for user_id, counts in sorted(by_assignee.items())
+            ],
+            'me': me,
+        }
+
+
+@receiver(post_delete, sender=Ticket)
+@receiver(post_delete, sender=ArchivedTicket)
+def decrement_ticket_counters(sender, instance, using, **kwargs):
+    """
+    Signal que descuenta el ticket eliminado de los contadores.
+    """
+    TicketCounter.apply_change(
+        old={field: getattr(instance, field) for field in TicketCounter.TRACKED_FIELDS},
+        using=using
+    )
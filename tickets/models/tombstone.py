@@ -0,0 +1,101 @@
+"""
+Modelo Tombstone - Registro de tickets y comentarios eliminados.
+"""
+
+from datetime import timedelta
+
+from django.db import models
+from django.db.models.signals import post_delete
+from django.dispatch import receiver
+from django.utils import timezone
+
+from .archived_comment import ArchivedComment
+from .archived_ticket import ArchivedTicket
+from .comment import Comment
+from .ticket import Ticket
+
+
+class Tombstone(models.Model):
+    """
+    Marca de eliminación de un ticket o comentario.
+
+    Permite que el feed de cambios (/api/tickets/changes/) informe las
+    eliminaciones a los clientes que sincronizan por delta. Las marcas
+    se conservan ``RETENTION`` y luego se pueden purgar con
+    ``manage.py purge_tombstones``; un cliente con un watermark más
+    antiguo debe recargar los listados completos.
+
+    ``is_internal`` indica si el comentario eliminado era interno: esas
+    marcas solo se informan al staff.
+    """
+
+    KIND_TICKET = 'ticket'
+    KIND_COMMENT = 'comment'
+
+    KIND_CHOICES = [
+        (KIND_TICKET, 'Ticket'),
+        (KIND_COMMENT, 'Comentario'),
+    ]
+
+    RETENTION = timedelta(days=30)
+
+    kind = models.CharField(
+        max_length=10,
+        choices=KIND_CHOICES,
+        verbose_name='Tipo'
+    )
+
+    object_id = models.BigIntegerField(
+        verbose_name='ID eliminado'
+    )
+
+    is_internal = models.BooleanField(
+        default=False,
+        verbose_name='Comentario interno'
+    )
+
+    deleted_at = models.DateTimeField(
+        default=timezone.now,
+        verbose_name='Fecha de eliminación'
+    )
+
+    class Meta:
+        verbose_name = 'Eliminación'
+        verbose_name_plural = 'Eliminaciones'
+        indexes = [
+            models.Index(fields=['deleted_at', 'id']),
+        ]
+
+    def __str__(self):
+        return f"{self.kind} #{self.object_id} eliminado"
+
+    @classmethod
+    def purge(cls, before=None):
+        """
+        Elimina las marcas anteriores a ``before`` (por defecto, las que
+        superan RETENTION). Retorna cuántas se eliminaron.
+        """
+        before = before or timezone.now() - cls.RETENTION
+        deleted, _ = cls.objects.filter(deleted_at__lt=before).delete()
+        return deleted
+
+
+@receiver(post_delete, sender=Ticket)
+@receiver(post_delete, sender=ArchivedTicket)
+def record_ticket_tombstone(sender, instance, using, **kwargs):
+    """Signal que registra la eliminación de un ticket."""
+    Tombstone.objects.using(using).create(
+        kind=Tombstone.KIND_TICKET,
+        object_id=instance.pk
+    )
+
+
+@receiver(post_delete, sender=Comment)
+@receiver(post_delete, sender=ArchivedComment)
+def record_comment_tombstone(sender, instance, using, **kwargs):
+    """Signal que registra la eliminación de un comentario."""
+    Tombstone.objects.using(using).create(
+        kind=Tombstone.KIND_COMMENT,
+        object_id=instance.pk,
+        is_internal=instance.is_internal
+    )
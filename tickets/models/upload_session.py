@@ -0,0 +1,178 @@
+"""
+Modelo UploadSession - Subidas de adjuntos por partes.
+"""
+
+import os
+import uuid
+from datetime import timedelta
+
+from django.contrib.auth.models import User
+from django.db import models, transaction
+from django.db.models.signals import post_delete
+from django.dispatch import receiver
+from django.utils import timezone
+
+from .comment import Comment
+
+
+class UploadSession(models.Model):
+    """
+    Subida reanudable de un adjunto.
+
+    El cliente declara el nombre y el tamaño del archivo, envía las partes
+    con PUT y Content-Range (se escriben directo a un temporal, sin pasar
+    por memoria) y al completar el archivo se adjunta a un comentario
+    nuevo. ``received`` es el número de bytes recibidos de forma continua
+    desde el inicio: tras una desconexión, el cliente sigue desde ahí.
+
+    Las sesiones sin actividad durante ``TTL`` se eliminan con
+    ``manage.py purge_uploads``.
+    """
+
+    # Igual que el límite de CommentSerializer.validate_attachment
+    MAX_SIZE = 10 * 1024 * 1024
+
+    TTL = timedelta(hours=24)
+
+    id = models.UUIDField(
+        primary_key=True,
+        default=uuid.uuid4,
+        editable=False
+    )
+
+    user = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        related_name='upload_sessions',
+        verbose_name='Usuario'
+    )
+
+    filename = models.CharField(
+        max_length=255,
+        verbose_name='Nombre del archivo'
+    )
+
+    size = models.PositiveBigIntegerField(
+        verbose_name='Tamaño (bytes)'
+    )
+
+    received = models.PositiveBigIntegerField(
+        default=0,
+        verbose_name='Bytes recibidos'
+    )
+
+    created_at = models.DateTimeField(
+        auto_now_add=True,
+        verbose_name='Fecha de creación'
+    )
+
+    updated_at = models.DateTimeField(
+        auto_now=True,
+        verbose_name='Última actividad'
+    )
+
+    class Meta:
+        verbose_name = 'Subida por partes'
+        verbose_name_plural = 'Subidas por partes'
+        indexes = [
+            models.Index(fields=['updated_at']),
+        ]
+
+    def __str__(self):
+        return f"{self.filename} ({self.received}/{self.size} bytes)"
+
+    @property
+    def storage(self):
+        return Comment._meta.get_field('attachment').storage
+
+    @property
+    def temp_path(self):
+        """Ruta del archivo temporal donde se ensamblan las partes."""
+        return os.path.join(self.storage.temp_directory(), f'upload-{self.pk}')
+
+    @property
+    def is_complete(self):
+        return self.received == self.size
+
+    @property
+    def expires_at(self):
+        return self.updated_at + self.TTL
+
+    @classmethod
+    def active(cls):
+        """Sesiones que no han vencido."""
+        return cls.objects.filter(updated_at__gte=timezone.now() - cls.TTL)
+
+    def write(self, start, stream, length, chunk_size=64 * 1024):
+        """
+        Escribe en el temporal hasta ``length`` bytes de ``stream`` a
+        partir de ``start``, por bloques.
+
+        Retorna el número de bytes escritos: menos que ``length`` si la
+        conexión se cortó, y lo recibido hasta ahí se conserva.
+        """
+        flags = os.O_WRONLY | os.O_CREAT
+        descriptor = os.open(self.temp_path, flags, 0o600)
+        written = 0
+        with os.fdopen(descriptor, 'wb') as temp_file:
+            temp_file.seek(start)
+            while written < length:
+                try:
+                    chunk = stream.read(min(chunk_size, length - written))
+                except OSError:
+                    break
+                if not chunk:
+                    break
+                temp_file.write(chunk)
+                written += len(chunk)
+        return written
+
+    def advance(self, start, end):
+        """
+        Marca como recibidos los bytes hasta ``end`` (exclusivo) si
+        continúan lo ya recibido. Retorna la sesión actualizada.
+        """
+        UploadSession.objects.filter(
+            pk=self.pk,
+            received__gte=start,
+            received__lt=end
+        ).update(received=end, updated_at=timezone.now())
+        self.refresh_from_db(fields=['received', 'updated_at'])
+        return self
+
+    def reset(self):
+        """
+        Descarta lo recibido (por ejemplo, si se perdió el temporal): el
+        cliente debe enviar el archivo desde el inicio.
+        """
+        UploadSession.objects.filter(pk=self.pk).update(received=0, updated_at=timezone.now())
+        self.refresh_from_db(fields=['received', 'updated_at'])
+        return self
+
+    @classmethod
+    def purge(cls, before=None):
+        """
+        Elimina las sesiones sin actividad desde ``before`` (por defecto,
+        las que superan TTL) y sus temporales. Retorna cuántas se
+        eliminaron.
+        """
+        before = before or timezone.now() - cls.TTL
+        deleted, _ = cls.objects.filter(updated_at__lt=before).delete()
+        return deleted
+
+
+def _remove_file(path):
+    try:
+        os.remove(path)
+    except FileNotFoundError:
+        pass
+
+
+@receiver(post_delete, sender=UploadSession)
+def delete_upload_file(sender, instance, using, **kwargs):
+    """
+    Signal que elimina el temporal de una sesión eliminada, al confirmar
+    la transacción: si se revierte, la sesión sigue teniendo su archivo.
+    """
+    path = instance.temp_path
+    transaction.on_commit(lambda: _remove_file(path), using=using)
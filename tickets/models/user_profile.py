@@ -46,6 +46,15 @@ class UserProfile(models.Model):
         help_text='Imagen de perfil del usuario (máximo 5MB)'
     )
     
+    # {variante: nombre del archivo WebP}, generado en segundo plano
+    # (ver tickets/thumbnails.py)
+    avatar_variants = models.JSONField(
+        default=dict,
+        blank=True,
+        editable=False,
+        verbose_name='Variantes del avatar'
+    )
+    
     is_support_staff = models.BooleanField(
         default=False,
         verbose_name='Personal de soporte',
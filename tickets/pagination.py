@@ -0,0 +1,327 @@
+"""
+Clases de paginación para la API de tickets.
+
+- KeysetPagination: paginación por cursor que busca directamente sobre
+  los índices ordenados (sin OFFSET ni COUNT).
+- EstimatedCountPaginator: paginador que usa las estadísticas del
+  planificador de PostgreSQL en lugar de COUNT(*).
+- TicketPagination / CommentPagination: paginación por número de página
+  con modo cursor y conteo estimado opcionales.
+"""
+import json
+from base64 import b64decode, b64encode
+
+from asgiref.sync import sync_to_async
+from django.core.exceptions import ValidationError
+from django.core.paginator import InvalidPage, Paginator
+from django.db import connections, models
+from django.db.models import Q
+from django.utils.functional import cached_property
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination, PageNumberPagination
+from rest_framework.response import Response
+from rest_framework.settings import api_settings
+from rest_framework.utils.urls import remove_query_param, replace_query_param
+
+
+def estimate_count(queryset):
+    """
+    Estima el número de filas de un queryset con EXPLAIN.
+
+    Usa las estadísticas del planificador de PostgreSQL, por lo que el
+    resultado es aproximado pero no recorre la tabla.
+    """
+    sql, params = queryset.order_by().query.sql_with_params()
+    with connections[queryset.db].cursor() as cursor:
+        cursor.execute('EXPLAIN (FORMAT JSON) ' + sql, params)
+        plan = cursor.fetchone()[0]
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+    return int(plan[0]['Plan']['Plan Rows'])
+
+
+class EstimatedCountPaginator(Paginator):
+    """
+    Paginador de Django que estima el total de resultados.
+
+    Si la estimación es menor que ``exact_count_threshold`` se hace el
+    COUNT(*) exacto, ya que en conjuntos pequeños es barato y la
+    estimación del planificador es poco precisa.
+    """
+    exact_count_threshold = 1000
+
+    @cached_property
+    def count(self):
+        """Retorna el número estimado de resultados."""
+        estimated = estimate_count(self.object_list)
+        if estimated < self.exact_count_threshold:
+            return self.object_list.count()
+        return estimated
+
+
+class KeysetPagination(BasePagination):
+    """
+    Paginación por cursor (keyset).
+
+    Ordena por ``ordering`` y cada página continúa a partir de los valores
+    de la última fila de la anterior, de modo que la consulta usa el índice
+    correspondiente sin OFFSET. El último campo de ``ordering`` debe ser
+    único (normalmente ``id``) para desempatar filas con el mismo valor.
+    """
+    cursor_query_param = 'cursor'
+    page_size = api_settings.PAGE_SIZE
+    ordering = ('-created_at', '-id')
+    invalid_cursor_message = 'Cursor inválido.'
+
+    def paginate_queryset(self, queryset, request, view=None):
+        queryset, position, reverse = self.seek_queryset(queryset, request)
+        return self.set_page(list(queryset), position, reverse)
+
+    async def apaginate_queryset(self, queryset, request, view=None):
+        """Versión async de paginate_queryset() (ver tickets/async_views.py)."""
+        queryset, position, reverse = self.seek_queryset(queryset, request)
+        return self.set_page([row async for row in queryset], position, reverse)
+
+    def seek_queryset(self, queryset, request):
+        """
+        Retorna (queryset de la página, posición, reverse) según el cursor
+        de la petición.
+        """
+        self.request = request
+        self.base_url = request.build_absolute_uri()
+        self.model = queryset.model
+
+        position, reverse = self.decode_cursor(request)
+        ordering = self.get_ordering(reverse)
+
+        queryset = queryset.order_by(*ordering)
+        if position is not None:
+            queryset = queryset.filter(self.seek_filter(position, ordering))
+
+        # Se pide una fila de más para saber si existe otra página
+        return queryset[:self.page_size + 1], position, reverse
+
+    def set_page(self, results, position, reverse):
+        """Recorta ``results`` a la página y calcula los enlaces."""
+        has_more = len(results) > self.page_size
+        results = results[:self.page_size]
+
+        if reverse:
+            results.reverse()
+            self.has_next = position is not None
+            self.has_previous = has_more
+        else:
+            self.has_next = has_more
+            self.has_previous = position is not None
+
+        self.page = results
+        return results
+
+    def get_paginated_response(self, data):
+        return Response({
+            'next': self.get_next_link(),
+            'previous': self.get_previous_link(),
+            'results': data,
+        })
+
+    def get_paginated_response_schema(self, schema):
+        return {
+            'type': 'object',
+            'required': ['results'],
+            'properties': {
+                'next': {'type': 'string', 'nullable': True, 'format': 'uri'},
+                'previous': {'type': 'string', 'nullable': True, 'format': 'uri'},
+                'results': schema,
+            },
+        }
+
+    def get_ordering(self, reverse=False):
+        """Retorna el orden de la consulta, invertido para ir hacia atrás."""
+        if not reverse:
+            return list(self.ordering)
+        return [
+            field[1:] if field.startswith('-') else '-' + field
+            for field in self.ordering
+        ]
+
+    def seek_filter(self, position, ordering):
+        """
+        Construye la condición que selecciona las filas posteriores a
+        ``position`` según ``ordering``.
+
+        Equivale a la comparación lexicográfica ``(a, b) < (x, y)`` e
+        incluye además un rango sobre el primer campo para que PostgreSQL
+        pueda recorrer el índice directamente.
+        """
+        lookups = [
+            (field.lstrip('-'), 'lt' if field.startswith('-') else 'gt')
+            for field in ordering
+        ]
+
+        name, lookup = lookups[0]
+        condition = Q(**{f'{name}__{lookup}e': position[0]})
+
+        seek = Q()
+        equal = {}
+        for (name, lookup), value in zip(lookups, position):
+            seek |= Q(**equal, **{f'{name}__{lookup}': value})
+            equal[name] = value
+
+        return condition & seek
+
+    def get_fields(self, model=None):
+        model = model or self.model
+        return [
+            model._meta.get_field(field.lstrip('-'))
+            for field in self.ordering
+        ]
+
+    def encode_token(self, obj, reverse=False):
+        """
+        Retorna el cursor que apunta a la posición de ``obj``: una instancia
+        del modelo o una fila de ``values_list(named=True)`` del queryset
+        paginado.
+        """
+        model = type(obj) if isinstance(obj, models.Model) else None
+        position = [field.value_to_string(obj) for field in self.get_fields(model)]
+        data = json.dumps({'p': position, 'r': int(reverse)})
+        return b64encode(data.encode('utf-8'), altchars=b'-_').decode('ascii')
+
+    def encode_cursor(self, obj, reverse):
+        token = self.encode_token(obj, reverse)
+        return replace_query_param(self.base_url, self.cursor_query_param, token)
+
+    def decode_cursor(self, request):
+        """Retorna la posición y dirección del cursor, o (None, False)."""
+        token = request.query_params.get(self.cursor_query_param)
+        if not token:
+            return None, False
+
+        try:
+            data = json.loads(b64decode(token.encode('ascii'), altchars=b'-_'))
+            fields = self.get_fields()
+            if len(data['p']) != len(fields):
+                raise ValueError
+            position = [
+                field.to_python(value)
+                for field, value in zip(fields, data['p'])
+            ]
+            return position, bool(data['r'])
+        except (TypeError, ValueError, KeyError, ValidationError) as exc:
+            raise NotFound(self.invalid_cursor_message) from exc
+
+    def get_next_link(self):
+        if not self.has_next or not self.page:
+            return None
+        return self.encode_cursor(self.page[-1], reverse=False)
+
+    def get_previous_link(self):
+        if not self.has_previous:
+            return None
+        if not self.page:
+            return remove_query_param(self.base_url, self.cursor_query_param)
+        return self.encode_cursor(self.page[0], reverse=True)
+
+
+class TicketKeysetPagination(KeysetPagination):
+    """Cursor sobre el índice (-created_at, status) con id como desempate."""
+    ordering = ('-created_at', '-id')
+
+
+class CommentKeysetPagination(KeysetPagination):
+    """Cursor sobre el índice (ticket, created_at) con id como desempate."""
+    ordering = ('created_at', 'id')
+
+
+class FlexiblePagination(PageNumberPagination):
+    """
+    Paginación por número de página con dos modos opcionales.
+
+    - ``?pagination=cursor`` (o cualquier ``?cursor=``) usa paginación por
+      cursor con ``keyset_class``. En este modo se ignora ``?ordering=``.
+    - ``?count=estimated`` mantiene los números de página pero estima el
+      total con las estadísticas del planificador en lugar de COUNT(*).
+    """
+    keyset_class = None
+    pagination_query_param = 'pagination'
+    count_query_param = 'count'
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.keyset = None
+        self.count_estimated = False
+
+        if self.keyset_class is not None and self.use_cursor(request):
+            self.keyset = self.keyset_class()
+            return self.keyset.paginate_queryset(queryset, request, view)
+
+        if request.query_params.get(self.count_query_param) == 'estimated':
+            self.count_estimated = True
+            self.django_paginator_class = EstimatedCountPaginator
+
+        return super().paginate_queryset(queryset, request, view)
+
+    async def apaginate_queryset(self, queryset, request, view=None):
+        """
+        Versión async de paginate_queryset() (ver tickets/async_views.py):
+        el total y la página se consultan con la API async del ORM.
+        """
+        self.keyset = None
+        self.count_estimated = False
+
+        if self.keyset_class is not None and self.use_cursor(request):
+            self.keyset = self.keyset_class()
+            return await self.keyset.apaginate_queryset(queryset, request, view)
+
+        self.request = request
+        page_size = self.get_page_size(request)
+        if not page_size:
+            return None
+
+        if request.query_params.get(self.count_query_param) == 'estimated':
+            self.count_estimated = True
+            paginator = EstimatedCountPaginator(queryset, page_size)
+            # EXPLAIN no tiene equivalente async
+            await sync_to_async(lambda: paginator.count)()
+        else:
+            paginator = self.django_paginator_class(queryset, page_size)
+            paginator.count = await queryset.acount()
+
+        page_number = self.get_page_number(request, paginator)
+        try:
+            self.page = paginator.page(page_number)
+        except InvalidPage as exc:
+            raise NotFound(self.invalid_page_message.format(
+                page_number=page_number, message=str(exc)
+            ))
+
+        if paginator.num_pages > 1 and self.template is not None:
+            self.display_page_controls = True
+
+        self.page.object_list = [row async for row in self.page.object_list]
+        return list(self.page)
+
+    def use_cursor(self, request):
+        """Indica si el cliente pidió paginación por cursor."""
+        return (
+            request.query_params.get(self.pagination_query_param) == 'cursor'
+            or self.keyset_class.cursor_query_param in request.query_params
+        )
+
+    def get_paginated_response(self, data):
+        if self.keyset is not None:
+            return self.keyset.get_paginated_response(data)
+
+        response = super().get_paginated_response(data)
+        if self.count_estimated:
+            response.data['count_estimated'] = True
+        return response
+
+
+class TicketPagination(FlexiblePagination):
+    """Paginación de tickets."""
+    keyset_class = TicketKeysetPagination
+
+
+class CommentPagination(FlexiblePagination):
+    """Paginación de comentarios."""
+    keyset_class = CommentKeysetPagination
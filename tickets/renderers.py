@@ -0,0 +1,143 @@
+"""
+Renderers adicionales para la API de tickets.
+"""
+import csv
+import io
+import json
+
+import msgpack
+import orjson
+from django.core.serializers.json import DjangoJSONEncoder
+from django.utils import timezone
+from rest_framework import renderers
+from rest_framework.utils.encoders import JSONEncoder
+
+
+def export_value(value):
+    """Convierte un valor de la base de datos al formato de la API."""
+    if hasattr(value, 'tzinfo') and value.tzinfo is not None:
+        return timezone.localtime(value).isoformat()
+    return value
+
+
+def encoder_default(obj):
+    """
+    Convierte los tipos que orjson y msgpack no manejan (fechas, Decimal,
+    textos traducibles...) igual que el JSONEncoder de DRF.
+    """
+    return JSONEncoder().default(obj)
+
+
+class ORJSONRenderer(renderers.JSONRenderer):
+    """
+    JSONRenderer que usa orjson.
+
+    Produce la misma salida que el JSONRenderer de DRF en modo compacto:
+    las fechas y los tipos especiales pasan por el encoder de DRF. Si el
+    cliente pide indentación (por ejemplo, la API navegable), usa el
+    renderer original.
+    """
+    options = orjson.OPT_PASSTHROUGH_DATETIME | orjson.OPT_NON_STR_KEYS
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b''
+
+        renderer_context = renderer_context or {}
+        if self.get_indent(accepted_media_type, renderer_context) is not None:
+            return super().render(data, accepted_media_type, renderer_context)
+
+        content = orjson.dumps(data, default=encoder_default, option=self.options)
+
+        # Igual que DRF, se escapan los separadores de línea de JavaScript
+        if b'\xe2\x80\xa8' in content or b'\xe2\x80\xa9' in content:
+            content = content.replace(b'\xe2\x80\xa8', b'\\u2028').replace(b'\xe2\x80\xa9', b'\\u2029')
+        return content
+
+
+class MessagePackRenderer(renderers.BaseRenderer):
+    """
+    Renderer MessagePack (Accept: application/msgpack o ?format=msgpack).
+
+    Las fechas y los tipos especiales se convierten a texto como en JSON.
+    """
+    media_type = 'application/msgpack'
+    format = 'msgpack'
+    charset = None
+    render_style = 'binary'
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b''
+        return msgpack.packb(data, default=encoder_default, use_bin_type=True, datetime=False)
+
+
+class StreamingRenderer(renderers.BaseRenderer):
+    """
+    Renderer para exportaciones en streaming.
+
+    ``stream()`` genera el archivo por bloques a partir de un iterable de
+    filas, para usarlo con StreamingHttpResponse. ``render()`` solo se usa
+    para respuestas normales (por ejemplo, errores) y las devuelve como
+    JSON.
+    """
+    charset = 'utf-8'
+    rows_per_chunk = 500
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b''
+        return json.dumps(data, cls=DjangoJSONEncoder, ensure_ascii=False).encode(self.charset)
+
+    def stream(self, header, rows):
+        """Genera bloques de bytes con ``header`` y luego ``rows``."""
+        raise NotImplementedError
+
+
+class CSVStreamRenderer(StreamingRenderer):
+    """Exportación en CSV con una fila de encabezado."""
+    media_type = 'text/csv'
+    format = 'csv'
+
+    def stream(self, header, rows):
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+
+        writer.writerow(header)
+        yield buffer.getvalue().encode(self.charset)
+
+        pending = 0
+        buffer.seek(0)
+        buffer.truncate()
+        for row in rows:
+            writer.writerow([export_value(value) for value in row])
+            pending += 1
+            if pending >= self.rows_per_chunk:
+                yield buffer.getvalue().encode(self.charset)
+                buffer.seek(0)
+                buffer.truncate()
+                pending = 0
+
+        if pending:
+            yield buffer.getvalue().encode(self.charset)
+
+
+class NDJSONStreamRenderer(StreamingRenderer):
+    """Exportación en NDJSON: un objeto JSON por línea."""
+    media_type = 'application/x-ndjson'
+    format = 'ndjson'
+
+    def stream(self, header, rows):
+        lines = []
+        for row in rows:
+            lines.append(json.dumps(
+                {name: export_value(value) for name, value in zip(header, row)},
+                cls=DjangoJSONEncoder,
+                ensure_ascii=False
+            ))
+            if len(lines) >= self.rows_per_chunk:
+                yield ('\n'.join(lines) + '\n').encode(self.charset)
+                lines = []
+
+        if lines:
+            yield ('\n'.join(lines) + '\n').encode(self.charset)
@@ -0,0 +1,289 @@
+"""
+Réplicas de lectura de PostgreSQL.
+
+ReplicaRouter envía las lecturas de las peticiones GET, HEAD y OPTIONS a
+una réplica (las bases ``replica_*`` de DATABASES, ver DB_REPLICAS en
+config/settings.py), elegida al azar según su peso entre las que están
+sanas. Todo lo demás usa la base principal: escrituras, lecturas dentro
+de una transacción, lecturas posteriores a una escritura en la misma
+petición, y lo que se ejecuta fuera de una petición (comandos, workers).
+
+Para que un usuario vea lo que acaba de escribir aunque la réplica vaya
+atrasada, ReplicaMiddleware lo fija a la base principal durante
+TICKETS_REPLICA_PIN_SECONDS después de cada petición en la que escribió
+(por ejemplo, cerrar un ticket y luego recargar el listado). La marca se
+guarda por ID de usuario en el caché ``tickets``, que en producción es
+compartido por todos los procesos (ver config/settings.py), así que vale
+también para clientes JWT que no envían cookies. Además viaja en una
+cookie firmada (``tickets_pin``, con el ID del usuario y vencimiento),
+que vale en cualquier proceso aunque el caché sea por proceso.
+
+Una réplica se considera sana si acepta conexiones y su retraso no
+supera TICKETS_REPLICA_MAX_LAG segundos; se revisa cada
+TICKETS_REPLICA_CHECK_INTERVAL segundos por proceso. Sin réplicas sanas,
+las lecturas van a la base principal.
+
+``use_primary()`` fuerza la base principal en lecturas que no toleran
+retraso: las que llenan un caché o calculan un watermark.
+"""
+import random
+import threading
+import time
+from contextlib import closing, contextmanager
+from contextvars import ContextVar
+
+import psycopg2
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction, sync_to_async
+from django.conf import settings
+from django.core.cache import caches
+from django.db import DEFAULT_DB_ALIAS, connections
+from django.utils.functional import SimpleLazyObject, empty
+
+
+SAFE_METHODS = ('GET', 'HEAD', 'OPTIONS')
+
+# Apps cuyas lecturas siempre van a la base principal (la sesión se lee
+# antes de saber quién es el usuario)
+PRIMARY_APPS = {'sessions'}
+
+# Marca que fija al usuario a la base principal: entrada del caché y
+# cookie firmada
+PIN_CACHE = 'tickets'
+PIN_COOKIE = 'tickets_pin'
+PIN_SALT = 'tickets.routers.pin'
+
+_request_state = ContextVar('tickets_replica_request', default=None)
+_force_primary = ContextVar('tickets_replica_force_primary', default=False)
+
+
+class ReplicaPool:
+    """Réplicas configuradas, sus pesos y su estado de salud."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._checked_at = None
+        self._healthy = []
+
+    @property
+    def weights(self):
+        return getattr(settings, 'TICKETS_REPLICA_WEIGHTS', {})
+
+    def healthy(self):
+        """Réplicas sanas según la última revisión (la repite si venció)."""
+        interval = getattr(settings, 'TICKETS_REPLICA_CHECK_INTERVAL', 10)
+        now = time.monotonic()
+        if self._checked_at is None or now - self._checked_at >= interval:
+            if self._lock.acquire(blocking=self._checked_at is None):
+                try:
+                    # Las demás peticiones siguen con el resultado anterior
+                    self._checked_at = now
+                    self._healthy = [alias for alias in self.weights if self.check(alias)]
+                finally:
+                    self._lock.release()
+        return self._healthy
+
+    def check(self, alias):
+        """Indica si la réplica ``alias`` responde y no va atrasada."""
+        params = connections[alias].get_connection_params()
+        params['connect_timeout'] = 2
+        try:
+            with closing(psycopg2.connect(**params)) as connection, connection.cursor() as cursor:
+                # Sin WAL pendiente de aplicar no hay retraso, aunque la
+                # última transacción aplicada sea antigua
+                cursor.execute(
+                    """
+                    SELECT CASE
+                        WHEN NOT pg_is_in_recovery()
+                          OR pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0
+                        ELSE EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp())
+                    END
+                    """
+                )
+                lag = cursor.fetchone()[0]
+        except psycopg2.Error:
+            return False
+        return lag is None or lag <= getattr(settings, 'TICKETS_REPLICA_MAX_LAG', 5)
+
+    def choose(self):
+        """Réplica sana al azar según su peso, o None si no hay."""
+        healthy = self.healthy()
+        if not healthy:
+            return None
+        return random.choices(healthy, weights=[self.weights[alias] for alias in healthy])[0]
+
+    def reset(self):
+        with self._lock:
+            self._checked_at = None
+            self._healthy = []
+
+
+replicas = ReplicaPool()
+
+
+def _pin_seconds():
+    return getattr(settings, 'TICKETS_REPLICA_PIN_SECONDS', 10)
+
+
+def _pin_key(user_id):
+    return f'replica-pin:{user_id}'
+
+
+class RequestState:
+    """Decisiones de enrutamiento de una petición."""
+
+    def __init__(self, request):
+        self.request = request
+        self.reads_from_replica = request.method in SAFE_METHODS
+        self.wrote = False
+        self.replica = empty
+        self.pinned = None
+
+    def user_id(self):
+        """
+        ID del usuario autenticado, o None si todavía no se sabe.
+
+        DRF reemplaza ``request.user`` por el usuario que autenticó; el
+        objeto diferido de AuthenticationMiddleware no se evalúa aquí
+        porque consultaría la base de datos.
+        """
+        user = self.request.__dict__.get('user')
+        if type(user) is SimpleLazyObject:
+            user = user._wrapped
+            if user is empty:
+                return None
+        return getattr(user, 'pk', None)
+
+    def is_pinned(self):
+        if self.pinned is None:
+            user_id = self.user_id()
+            if user_id is None:
+                return False
+            self.pinned = is_pinned(self.request, user_id)
+        return self.pinned
+
+    def database(self):
+        """Base para una lectura de esta petición."""
+        if not self.reads_from_replica or self.wrote or self.is_pinned():
+            return DEFAULT_DB_ALIAS
+        if self.replica is empty:
+            # Una sola réplica por petición: todas sus lecturas ven el mismo estado
+            self.replica = replicas.choose()
+        return self.replica or DEFAULT_DB_ALIAS
+
+
+@contextmanager
+def use_primary():
+    """Lee de la base principal dentro del bloque (o de la función decorada)."""
+    token = _force_primary.set(True)
+    try:
+        yield
+    finally:
+        _force_primary.reset(token)
+
+
+def pin_user(request, response, user_id):
+    """
+    Fija al usuario a la base principal durante TICKETS_REPLICA_PIN_SECONDS,
+    en el caché y con la cookie de la respuesta.
+    """
+    seconds = _pin_seconds()
+    if seconds > 0:
+        caches[PIN_CACHE].set(_pin_key(user_id), True, timeout=seconds)
+        response.set_signed_cookie(
+            PIN_COOKIE,
+            str(user_id),
+            salt=PIN_SALT,
+            max_age=seconds,
+            secure=request.is_secure(),
+            httponly=True,
+            samesite='Lax'
+        )
+
+
+def pinned_user(request):
+    """ID (texto) del usuario fijado por la cookie de la petición, o None."""
+    seconds = _pin_seconds()
+    if seconds <= 0:
+        return None
+    # La firma incluye la fecha: una cookie vencida o alterada no fija
+    # aunque el cliente la siga enviando
+    return request.get_signed_cookie(PIN_COOKIE, default=None, salt=PIN_SALT, max_age=seconds)
+
+
+def is_pinned(request, user_id):
+    """Indica si ``user_id`` está fijado por su cookie o por el caché."""
+    if pinned_user(request) == str(user_id):
+        return True
+    return _pin_seconds() > 0 and caches[PIN_CACHE].get(_pin_key(user_id)) is not None
+
+
+class ReplicaRouter:
+    """Router de Django que reparte las lecturas entre las réplicas."""
+
+    def db_for_read(self, model, **hints):
+        state = _request_state.get()
+        if (
+            state is None
+            or _force_primary.get()
+            or model._meta.app_label in PRIMARY_APPS
+            or connections[DEFAULT_DB_ALIAS].in_atomic_block
+        ):
+            return DEFAULT_DB_ALIAS
+        return state.database()
+
+    def db_for_write(self, model, **hints):
+        state = _request_state.get()
+        if state is not None:
+            state.wrote = True
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # Las réplicas tienen los mismos datos que la base principal
+        databases = {DEFAULT_DB_ALIAS, *replicas.weights}
+        if obj1._state.db in databases and obj2._state.db in databases:
+            return True
+        return None
+
+
+class ReplicaMiddleware:
+    """
+    Habilita las réplicas en las lecturas de la petición y, si la petición
+    escribió, fija al usuario a la base principal.
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.async_mode = iscoroutinefunction(get_response)
+        if self.async_mode:
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if self.async_mode:
+            return self.__acall__(request)
+        state = RequestState(request)
+        token = _request_state.set(state)
+        try:
+            response = self.get_response(request)
+        finally:
+            _request_state.reset(token)
+        if state.wrote:
+            self.pin(request, response)
+        return response
+
+    async def __acall__(self, request):
+        state = RequestState(request)
+        token = _request_state.set(state)
+        try:
+            response = await self.get_response(request)
+        finally:
+            _request_state.reset(token)
+        if state.wrote:
+            await sync_to_async(self.pin)(request, response)
+        return response
+
+    def pin(self, request, response):
+        user = getattr(request, 'user', None)
+        if user is not None and user.is_authenticated:
+            pin_user(request, response, user.pk)
@@ -1,9 +1,147 @@
 from rest_framework import serializers
 from django.contrib.auth.models import User
-from .models import Ticket, Comment, UserProfile
+from django.core.exceptions import FieldDoesNotExist
+from django.db import router, transaction
+from .models import Ticket, Comment, UserProfile, UploadSession
+from .models.ticket import OPEN_STATUSES
+from .assignment import choose_agent
+from . import sla
 
 
-class UserSerializer(serializers.ModelSerializer):
+_datetime_field = serializers.DateTimeField()
+
+
+def format_datetime(value):
+    """Fecha en el formato de DateTimeField (ISO 8601), o None."""
+    return _datetime_field.to_representation(value) if value is not None else None
+
+
+def display_name(first_name, last_name, username):
+    """Nombre completo del usuario (como User.get_full_name()) o su username."""
+    return ('%s %s' % (first_name, last_name)).strip() or username
+
+
+class SearchResultMixin:
+    """
+    Agrega ``search_rank`` y ``search_headline`` a la representación
+    cuando el objeto proviene de una búsqueda de texto completo.
+    """
+    
+    def to_representation(self, instance):
+        data = super().to_representation(instance)
+        if hasattr(instance, 'search_rank'):
+            data['search_rank'] = instance.search_rank
+            data['search_headline'] = getattr(instance, 'search_headline', None)
+        return data
+
+
+class ImageVariantsField(serializers.Field):
+    """
+    URLs de las variantes WebP reducidas de una imagen, como
+    {variante: URL}. Vacío mientras se generan o si no es una imagen.
+    """
+    
+    def __init__(self, **kwargs):
+        kwargs['read_only'] = True
+        super().__init__(**kwargs)
+    
+    def to_representation(self, value):
+        from .thumbnails import variant_urls
+        return variant_urls(value, self.context.get('request'))
+
+
+class SparseFieldsMixin:
+    """
+    Permite serializar solo algunos campos y elegir qué relaciones se
+    expanden.
+    
+    - ``fields``: nombres de los campos a incluir (None = todos).
+    - ``expand``: relaciones de ``expandable_fields`` que se devuelven
+      como objeto anidado; el resto se devuelve como ID. Si es None (y
+      ``fields`` también), se expanden todas, como siempre.
+    
+    ``sparse_sources`` indica qué campos del modelo necesita cada campo
+    calculado, para que la vista cargue solo esas columnas con only().
+    
+    ``compiled_fields`` es la versión de los campos calculados para la
+    serialización compilada de los listados (ver tickets/compiled.py):
+    {campo: (columnas, función que recibe sus valores)}.
+    """
+    # {campo del serializador: columna con el ID de la relación}
+    expandable_fields = {}
+    
+    # {campo del serializador: campos del modelo que necesita}
+    sparse_sources = {}
+    
+    # {campo del serializador: (columnas, función)}
+    compiled_fields = {}
+    
+    def __init__(self, *args, fields=None, expand=None, **kwargs):
+        super().__init__(*args, **kwargs)
+        
+        if fields is not None:
+            for name in set(self.fields) - set(fields):
+                self.fields.pop(name)
+        
+        if fields is not None or expand is not None:
+            expand = set(expand or [])
+            for name, column in self.expandable_fields.items():
+                if name in self.fields and name not in expand:
+                    self.fields[name] = serializers.IntegerField(source=column, read_only=True)
+    
+    @classmethod
+    def sparse_requirements(cls, fields=None, expand=None):
+        """
+        Retorna (columnas, relaciones) que necesita la representación con
+        ``fields`` y ``expand``: las columnas para only() y las relaciones
+        para select_related(). Retorna (None, None) si se necesitan todos
+        los campos.
+        """
+        if fields is None and expand is None:
+            return None, None
+        
+        model = cls.Meta.model
+        serializer = cls()
+        names = [
+            name for name, field in serializer.fields.items()
+            if not field.write_only and (fields is None or name in fields)
+        ]
+        expand = set(expand or [])
+        
+        columns = {model._meta.pk.name}
+        relations = set()
+        for name in names:
+            if name in cls.expandable_fields:
+                if name in expand:
+                    relations.add(name)
+                else:
+                    columns.add(cls.expandable_fields[name])
+                continue
+            
+            if name in cls.sparse_sources:
+                sources = cls.sparse_sources[name]
+            elif isinstance(serializer.fields[name], serializers.PrimaryKeyRelatedField):
+                # Solo necesita la columna con el ID, no la relación
+                sources = [model._meta.get_field(serializer.fields[name].source).attname]
+            else:
+                sources = [serializer.fields[name].source]
+            
+            for source in sources:
+                try:
+                    field = model._meta.get_field(source)
+                except FieldDoesNotExist:
+                    continue
+                if not field.concrete:
+                    continue
+                if field.is_relation and source == field.name:
+                    relations.add(source)
+                else:
+                    columns.add(field.name)
+        
+        return sorted(columns | relations), sorted(relations)
+
+
+class UserSerializer(SparseFieldsMixin, serializers.ModelSerializer):
     """
     Serializador para el modelo User de Django.
     
@@ -11,6 +149,13 @@ class UserSerializer(serializers.ModelSerializer):
     """
     full_name = serializers.SerializerMethodField()
     
+    sparse_sources = {
+        'full_name': ['first_name', 'last_name', 'username'],
+    }
+    compiled_fields = {
+        'full_name': (['first_name', 'last_name', 'username'], display_name),
+    }
+    
     class Meta:
         model = User
         fields = [
@@ -27,10 +172,10 @@ class UserSerializer(serializers.ModelSerializer):
     
     def get_full_name(self, obj):
         """Retorna el nombre completo del usuario."""
-        return obj.get_full_name() or obj.username
+        return display_name(obj.first_name, obj.last_name, obj.username)
 
 
-class UserProfileSerializer(serializers.ModelSerializer):
+class UserProfileSerializer(SparseFieldsMixin, serializers.ModelSerializer):
     """
     Serializador para el modelo UserProfile.
     
@@ -38,6 +183,9 @@ class UserProfileSerializer(serializers.ModelSerializer):
     """
     user = UserSerializer(read_only=True)
     user_id = serializers.IntegerField(write_only=True, required=False)
+    avatar_variants = ImageVariantsField()
+    
+    expandable_fields = {'user': 'user_id'}
     
     class Meta:
         model = UserProfile
@@ -47,6 +195,7 @@ class UserProfileSerializer(serializers.ModelSerializer):
             'department',
             'phone',
             'avatar',
+            'avatar_variants',
             'is_support_staff',
             'created_at',
             'updated_at',
@@ -72,7 +221,7 @@ class UserProfileSerializer(serializers.ModelSerializer):
         return value
 
 
-class CommentSerializer(serializers.ModelSerializer):
+class CommentSerializer(SparseFieldsMixin, SearchResultMixin, serializers.ModelSerializer):
     """
     Serializador para el modelo Comment.
     
@@ -81,6 +230,18 @@ class CommentSerializer(serializers.ModelSerializer):
     author = UserSerializer(read_only=True)
     author_id = serializers.IntegerField(write_only=True, required=False)
     author_name = serializers.SerializerMethodField()
+    attachment_variants = ImageVariantsField()
+    
+    expandable_fields = {'author': 'author_id'}
+    sparse_sources = {
+        'author_name': ['author'],
+    }
+    compiled_fields = {
+        'author_name': (
+            ['author__first_name', 'author__last_name', 'author__username'],
+            display_name
+        ),
+    }
     
     class Meta:
         model = Comment
@@ -92,6 +253,7 @@ class CommentSerializer(serializers.ModelSerializer):
             'author_name',
             'content',
             'attachment',
+            'attachment_variants',
             'is_internal',
             'created_at',
             'updated_at',
@@ -100,7 +262,7 @@ class CommentSerializer(serializers.ModelSerializer):
     
     def get_author_name(self, obj):
         """Retorna el nombre del autor del comentario."""
-        return obj.author.get_full_name() or obj.author.username
+        return display_name(obj.author.first_name, obj.author.last_name, obj.author.username)
     
     def validate_content(self, value):
         """Valida que el contenido del comentario no esté vacío."""
@@ -128,7 +290,47 @@ class CommentSerializer(serializers.ModelSerializer):
         return super().create(validated_data)
 
 
-class TicketSerializer(serializers.ModelSerializer):
+class UploadSessionSerializer(serializers.ModelSerializer):
+    """
+    Serializador para las subidas de adjuntos por partes.
+    
+    Al crear la sesión se indican el nombre y el tamaño total del archivo;
+    ``received`` indica desde qué byte continuar.
+    """
+    expires_at = serializers.DateTimeField(read_only=True)
+    
+    class Meta:
+        model = UploadSession
+        fields = [
+            'id',
+            'filename',
+            'size',
+            'received',
+            'created_at',
+            'updated_at',
+            'expires_at',
+        ]
+        read_only_fields = ['id', 'received', 'created_at', 'updated_at', 'expires_at']
+    
+    def validate_size(self, value):
+        """Valida el tamaño declarado antes de recibir el archivo."""
+        if value <= 0:
+            raise serializers.ValidationError("El archivo está vacío.")
+        if value > UploadSession.MAX_SIZE:
+            raise serializers.ValidationError(
+                "El archivo adjunto no puede exceder 10MB."
+            )
+        return value
+    
+    def validate_filename(self, value):
+        """Conserva solo el nombre del archivo, sin rutas."""
+        value = value.replace('\\', '/').rsplit('/', 1)[-1].strip()
+        if not value:
+            raise serializers.ValidationError("Indica el nombre del archivo.")
+        return value
+
+
+class TicketSerializer(SparseFieldsMixin, SearchResultMixin, serializers.ModelSerializer):
     """
     Serializador para el modelo Ticket.
     
@@ -144,11 +346,38 @@ class TicketSerializer(serializers.ModelSerializer):
     is_open = serializers.BooleanField(read_only=True)
     is_closed = serializers.BooleanField(read_only=True)
     days_open = serializers.IntegerField(read_only=True)
+    sla_due_at = serializers.SerializerMethodField()
+    sla_breached = serializers.SerializerMethodField()
     
     # Campos de texto para mostrar las opciones legibles
     status_display = serializers.CharField(source='get_status_display', read_only=True)
     priority_display = serializers.CharField(source='get_priority_display', read_only=True)
     
+    expandable_fields = {
+        'created_by': 'created_by_id',
+        'assigned_to': 'assigned_to_id',
+    }
+    sparse_sources = {
+        'status_display': ['status'],
+        'priority_display': ['priority'],
+        'is_open': ['status'],
+        'is_closed': ['status'],
+        'days_open': ['created_at', 'closed_at'],
+        'sla_due_at': ['priority', 'created_at'],
+        'sla_breached': ['status', 'priority', 'created_at', 'closed_at'],
+        'comments_count': [],
+    }
+    # Misma lógica que las propiedades de Ticket; comments_count, days_open
+    # y los campos del SLA requieren las anotaciones de la vista
+    compiled_fields = {
+        'comments_count': (['comments_count'], int),
+        'is_open': (['status'], lambda status: status in OPEN_STATUSES),
+        'is_closed': (['status'], lambda status: status == 'cerrado'),
+        'days_open': (['age'], lambda age: age.days),
+        'sla_due_at': (['sla_due_at'], format_datetime),
+        'sla_breached': (['sla_breached'], bool),
+    }
+    
     class Meta:
         model = Ticket
         fields = [
@@ -170,13 +399,30 @@ class TicketSerializer(serializers.ModelSerializer):
             'is_open',
             'is_closed',
             'days_open',
+            'sla_due_at',
+            'sla_breached',
         ]
         read_only_fields = ['id', 'created_at', 'updated_at', 'closed_at']
     
     def get_comments_count(self, obj):
-        """Retorna el número de comentarios del ticket."""
+        """
+        Retorna el número de comentarios del ticket.
+        
+        Usa la anotación ``comments_count`` cuando la consulta la incluye
+        para evitar una consulta adicional por ticket.
+        """
+        if hasattr(obj, 'comments_count'):
+            return obj.comments_count
         return obj.comments.count()
     
+    def get_sla_due_at(self, obj):
+        """Fecha límite del SLA (anotación ``sla_due_at`` si la hay)."""
+        return format_datetime(sla.due_at(obj))
+    
+    def get_sla_breached(self, obj):
+        """Indica si el ticket incumple su SLA (anotación ``sla_breached`` si la hay)."""
+        return sla.is_breached(obj)
+    
     def validate_title(self, value):
         """Valida que el título tenga una longitud mínima."""
         if not value or len(value.strip()) < 5:
@@ -221,13 +467,64 @@ class TicketDetailSerializer(TicketSerializer):
     """
     Serializador detallado para el modelo Ticket.
     
-    Incluye la lista completa de comentarios anidados.
+    Incluye los últimos ``LATEST_COMMENTS`` comentarios visibles, en orden
+    cronológico, y en ``older_comments`` la URL (con cursor) para obtener
+    los anteriores desde /api/tickets/{id}/comments/.
     Se usa para las vistas de detalle individual.
     """
-    comments = CommentSerializer(many=True, read_only=True)
+    LATEST_COMMENTS = 20
+    
+    comments = serializers.SerializerMethodField()
+    older_comments = serializers.SerializerMethodField()
+    
+    sparse_sources = {
+        **TicketSerializer.sparse_sources,
+        'comments': [],
+        'older_comments': [],
+    }
     
     class Meta(TicketSerializer.Meta):
-        fields = TicketSerializer.Meta.fields + ['comments']
+        fields = TicketSerializer.Meta.fields + ['comments', 'older_comments']
+    
+    def get_latest_comments(self, obj):
+        """
+        Retorna los últimos comentarios visibles del ticket, del más nuevo
+        al más antiguo (uno más que LATEST_COMMENTS para saber si hay
+        anteriores).
+        
+        Usa ``latest_comments`` si la vista lo precargó.
+        """
+        if hasattr(obj, 'latest_comments'):
+            return obj.latest_comments
+        
+        queryset = obj.comments.select_related('author')
+        request = self.context.get('request')
+        if not (request and request.user.is_staff):
+            queryset = queryset.filter(is_internal=False)
+        return list(queryset.order_by('-created_at', '-id')[:self.LATEST_COMMENTS + 1])
+    
+    def get_comments(self, obj):
+        """Retorna los últimos comentarios en orden cronológico."""
+        comments = self.get_latest_comments(obj)[:self.LATEST_COMMENTS]
+        return CommentSerializer(
+            reversed(comments),
+            many=True,
+            context=self.context
+        ).data
+    
+    def get_older_comments(self, obj):
+        """Retorna la URL de los comentarios anteriores, o None si no hay."""
+        from rest_framework.reverse import reverse
+        from .pagination import CommentKeysetPagination
+        
+        comments = self.get_latest_comments(obj)
+        if len(comments) <= self.LATEST_COMMENTS:
+            return None
+        
+        oldest = comments[self.LATEST_COMMENTS - 1]
+        token = CommentKeysetPagination().encode_token(oldest, reverse=True)
+        url = reverse('ticket-comments', kwargs={'pk': obj.pk}, request=self.context.get('request'))
+        return f'{url}?cursor={token}'
 
 
 class TicketCreateSerializer(serializers.ModelSerializer):
@@ -263,12 +560,28 @@ class TicketCreateSerializer(serializers.ModelSerializer):
         return value.strip()
     
     def create(self, validated_data):
-        """Crea un nuevo ticket asignando el creador y estado inicial."""
+        """
+        Crea un nuevo ticket asignando el creador y estado inicial.
+        
+        Sin ``assigned_to``, el agente lo elige la estrategia de
+        TICKETS_AUTO_ASSIGN (ver tickets/assignment.py).
+        """
         request = self.context.get('request')
         if request and hasattr(request, 'user'):
             validated_data['created_by'] = request.user
         validated_data['status'] = 'abierto'
-        return super().create(validated_data)
+        
+        created_by = validated_data.get('created_by')
+        if validated_data.get('assigned_to') is not None or created_by is None:
+            return super().create(validated_data)
+        
+        # La elección y el INSERT van en la misma transacción (ver
+        # tickets/assignment.py)
+        using = router.db_for_write(Ticket)
+        with transaction.atomic(using=using):
+            validated_data.pop('assigned_to', None)
+            validated_data['assigned_to_id'] = choose_agent(created_by.pk, using=using)
+            return super().create(validated_data)
 
 
 class TicketStatusUpdateSerializer(serializers.ModelSerializer):
@@ -296,3 +609,54 @@ class TicketStatusUpdateSerializer(serializers.ModelSerializer):
                     )
         
         return value
+
+
+class TicketBulkActionSerializer(serializers.Serializer):
+    """
+    Serializador para operaciones masivas sobre tickets.
+    
+    Los tickets se indican con una lista de IDs (``ids``) o con un filtro
+    (``filter``) que acepta los mismos campos que los filtros del listado.
+    """
+    OPERATION_CHOICES = [
+        ('close', 'Cerrar'),
+        ('assign', 'Asignar'),
+        ('reprioritize', 'Cambiar prioridad'),
+    ]
+    
+    operation = serializers.ChoiceField(choices=OPERATION_CHOICES)
+    ids = serializers.ListField(
+        child=serializers.IntegerField(min_value=1),
+        required=False,
+        allow_empty=False,
+        max_length=10000
+    )
+    filter = serializers.DictField(required=False, allow_empty=False)
+    assigned_to_id = serializers.IntegerField(required=False, allow_null=True)
+    priority = serializers.ChoiceField(choices=Ticket.PRIORITY_CHOICES, required=False)
+    
+    def validate_assigned_to_id(self, value):
+        """Valida que el usuario a asignar exista y esté activo."""
+        if value is not None and not User.objects.filter(pk=value, is_active=True).exists():
+            raise serializers.ValidationError("El usuario no existe o no está activo.")
+        return value
+    
+    def validate(self, attrs):
+        """Valida el conjunto de tickets y los datos de la operación."""
+        if ('ids' in attrs) == ('filter' in attrs):
+            raise serializers.ValidationError(
+                "Indica 'ids' o 'filter', pero no ambos."
+            )
+        
+        operation = attrs['operation']
+        if operation == 'assign' and 'assigned_to_id' not in attrs:
+            raise serializers.ValidationError(
+                {'assigned_to_id': "Este campo es requerido para la operación 'assign'."}
+            )
+        if operation == 'reprioritize' and 'priority' not in attrs:
+            raise serializers.ValidationError(
+                {'priority': "Este campo es requerido para la operación 'reprioritize'."}
+            )
+        
+        return attrs
+
@@ -0,0 +1,106 @@
+"""
+Edad y SLA de los tickets, calculados en PostgreSQL.
+
+Cada prioridad tiene un plazo de resolución (TICKETS_SLA_HOURS). Un
+ticket incumple su SLA si sigue abierto después del plazo, o si se cerró
+después del plazo. Las prioridades sin plazo nunca lo incumplen.
+
+``annotate()`` agrega a un queryset de tickets (activos o archivados):
+
+- ``age``: tiempo desde la creación hasta el cierre, o hasta ahora si
+  sigue abierto (Ticket.days_open la usa si está).
+- ``sla_due_at``: fecha límite según la prioridad.
+- ``sla_breached``: si incumple el SLA.
+
+Los filtros (``breached_q()``, ``age_at_least_q()``) se expresan como
+rangos sobre columnas para que PostgreSQL use los índices parciales de
+Ticket: los abiertos por (prioridad, created_at) y los cerrados por
+(prioridad, closed_at - created_at).
+"""
+from datetime import timedelta
+
+from django.conf import settings
+from django.db.models import (
+    BooleanField, Case, DateTimeField, DurationField, ExpressionWrapper, F, Q, Value, When
+)
+from django.db.models.functions import Coalesce, Now
+from django.db.models.lookups import GreaterThan, GreaterThanOrEqual
+from django.utils import timezone
+
+from .expressions import RowExpression
+from .models.ticket import OPEN_STATUSES
+
+
+def targets():
+    """Retorna {prioridad: plazo (timedelta)}."""
+    return {
+        priority: timedelta(hours=hours)
+        for priority, hours in settings.TICKETS_SLA_HOURS.items()
+    }
+
+
+def _before_now(delta):
+    return ExpressionWrapper(Now() - Value(delta), output_field=DateTimeField())
+
+
+def _resolution():
+    return F('closed_at') - F('created_at')
+
+
+def age_at_least_q(delta):
+    """Tickets con una edad de al menos ``delta``."""
+    return (
+        Q(status__in=OPEN_STATUSES, created_at__lte=_before_now(delta))
+        | Q(GreaterThanOrEqual(_resolution(), delta), status='cerrado')
+    )
+
+
+def breached_q():
+    """Tickets que incumplen su SLA."""
+    condition = Q(pk__in=[])
+    for priority, delta in targets().items():
+        condition |= Q(priority=priority, status__in=OPEN_STATUSES, created_at__lt=_before_now(delta))
+        condition |= Q(GreaterThan(_resolution(), delta), priority=priority, status='cerrado')
+    return condition
+
+
+def annotate(queryset):
+    """Agrega ``age``, ``sla_due_at`` y ``sla_breached`` a ``queryset``."""
+    return queryset.annotate(
+        age=RowExpression(
+            Coalesce('closed_at', Now()) - F('created_at'),
+            output_field=DurationField()
+        ),
+        sla_due_at=RowExpression(
+            Case(
+                *[
+                    When(priority=priority, then=F('created_at') + Value(delta))
+                    for priority, delta in targets().items()
+                ],
+                default=None
+            ),
+            output_field=DateTimeField()
+        ),
+        sla_breached=(
+            RowExpression(breached_q(), output_field=BooleanField())
+            if targets() else Value(False)
+        ),
+    )
+
+
+def due_at(ticket):
+    """Fecha límite de ``ticket`` (sin anotación), o None si no tiene plazo."""
+    if hasattr(ticket, 'sla_due_at'):
+        return ticket.sla_due_at
+    delta = targets().get(ticket.priority)
+    return ticket.created_at + delta if delta is not None else None
+
+
+def is_breached(ticket):
+    """Indica si ``ticket`` incumple su SLA (sin anotación)."""
+    if hasattr(ticket, 'sla_breached'):
+        return ticket.sla_breached
+    due = due_at(ticket)
+    if due is None:
+        return False
+    return (ticket.closed_at or timezone.now()) > due
@@ -0,0 +1,161 @@
+"""
+Almacenamiento de adjuntos direccionado por contenido.
+
+Cada archivo se guarda una sola vez con el nombre de su SHA-256
+(``blobs/ab/cd/<sha256>.<ext>``): si el mismo archivo se adjunta a
+muchos comentarios, todos apuntan al mismo blob. El modelo Blob lleva la
+cuenta de referencias y el archivo se elimina cuando se elimina (o
+cambia de adjunto) el último comentario que lo usa.
+"""
+import hashlib
+import os
+import shutil
+import tempfile
+
+from django.core.files.storage import FileSystemStorage
+from django.utils.deconstruct import deconstructible
+
+
+@deconstructible
+class ContentAddressedStorage(FileSystemStorage):
+    """
+    FileSystemStorage que guarda los archivos por su SHA-256.
+
+    El hash se calcula mientras el archivo se copia a un temporal en el
+    mismo volumen, que luego se mueve (os.replace) a su nombre definitivo
+    o se descarta si el blob ya existe. Así nunca se lee el archivo dos
+    veces ni queda un blob a medio escribir.
+    """
+    prefix = 'blobs'
+    temp_dir = 'tmp'
+
+    # Extensión máxima que se conserva (el nombre cabe en max_length=100)
+    max_extension = 16
+
+    chunk_size = 64 * 1024
+
+    def blob_name(self, digest, name):
+        """Nombre del blob con ``digest`` para un archivo llamado ``name``."""
+        extension = os.path.splitext(name)[1].lower()
+        if len(extension) > self.max_extension or not extension[1:].isalnum():
+            extension = ''
+        return f'{self.prefix}/{digest[:2]}/{digest[2:4]}/{digest}{extension}'
+
+    def is_blob(self, name):
+        return bool(name) and name.startswith(f'{self.prefix}/')
+
+    def get_available_name(self, name, max_length=None):
+        # El nombre definitivo depende del contenido, no de los existentes
+        return name
+
+    def _spool(self, content):
+        """
+        Copia ``content`` a un temporal calculando su SHA-256.
+
+        Retorna (digest, tamaño, ruta del temporal).
+        """
+        digest = hashlib.sha256()
+        size = 0
+        handle, temp_path = tempfile.mkstemp(dir=self.temp_directory())
+        try:
+            with os.fdopen(handle, 'wb') as temp_file:
+                if hasattr(content, 'seek'):
+                    content.seek(0)
+                for chunk in content.chunks():
+                    if isinstance(chunk, str):
+                        chunk = chunk.encode()
+                    digest.update(chunk)
+                    size += len(chunk)
+                    temp_file.write(chunk)
+        except BaseException:
+            os.remove(temp_path)
+            raise
+        return digest.hexdigest(), size, temp_path
+
+    def _save(self, name, content):
+        digest, size, temp_path = self._spool(content)
+        return self._store(temp_path, digest, size, name)
+
+    def save_file(self, path, name):
+        """
+        Guarda como blob el archivo ``path`` (en el directorio temporal de
+        este almacenamiento) sin copiarlo: solo se lee para calcular su
+        SHA-256 y luego se enlaza (hard link) a su blob. Retorna el nombre
+        del blob.
+
+        ``path`` no se elimina: si la transacción que registra el adjunto
+        falla, el llamador puede reintentar con el mismo archivo.
+        """
+        digest = hashlib.sha256()
+        size = 0
+        with open(path, 'rb') as temp_file:
+            for chunk in iter(lambda: temp_file.read(self.chunk_size), b''):
+                digest.update(chunk)
+                size += len(chunk)
+        return self._store(path, digest.hexdigest(), size, name, keep=True)
+
+    def temp_directory(self):
+        """
+        Directorio de los temporales, en el mismo volumen que los blobs
+        para poder moverlos sin copiarlos.
+        """
+        directory = self.path(f'{self.prefix}/{self.temp_dir}')
+        os.makedirs(directory, exist_ok=True)
+        return directory
+
+    def _store(self, temp_path, digest, size, name, keep=False):
+        """
+        Mueve el temporal ``temp_path`` a su blob, o lo descarta si ya
+        existe. Con ``keep`` lo enlaza en lugar de moverlo y lo conserva.
+        """
+        from .models import Blob
+
+        name = self.blob_name(digest, name)
+        try:
+            # Bloquea la fila del blob hasta el commit: un borrado
+            # concurrente del último adjunto no puede eliminar el archivo
+            # mientras se agrega esta referencia
+            Blob.claim(name, digest, size)
+
+            full_path = self.path(name)
+            if not os.path.exists(full_path):
+                directory = os.path.dirname(full_path)
+                os.makedirs(directory, exist_ok=True)
+                if self.directory_permissions_mode is not None:
+                    os.chmod(directory, self.directory_permissions_mode)
+                if keep:
+                    self._link(temp_path, full_path)
+                else:
+                    os.replace(temp_path, full_path)
+                if self.file_permissions_mode is not None:
+                    os.chmod(full_path, self.file_permissions_mode)
+        finally:
+            if not keep and os.path.exists(temp_path):
+                os.remove(temp_path)
+
+        return name
+
+    def _link(self, path, full_path):
+        """
+        Crea ``full_path`` con el contenido de ``path`` sin modificarlo:
+        un hard link o, si el sistema de archivos no los admite, una copia
+        que se mueve al terminar (nunca queda un blob a medio escribir).
+        """
+        try:
+            os.link(path, full_path)
+            return
+        except FileExistsError:
+            return
+        except OSError:
+            pass
+        handle, copy_path = tempfile.mkstemp(dir=self.temp_directory())
+        try:
+            with os.fdopen(handle, 'wb') as copy_file, open(path, 'rb') as source:
+                shutil.copyfileobj(source, copy_file, self.chunk_size)
+            os.replace(copy_path, full_path)
+        except BaseException:
+            os.remove(copy_path)
+            raise
+
+
+attachment_storage = ContentAddressedStorage()
@@ -0,0 +1,195 @@
+"""
+Feed de cambios para sincronización por delta.
+
+Un cliente guarda el ``watermark`` que devuelve /api/tickets/changes/ y en
+la siguiente consulta lo envía como ``since`` para recibir solo los
+tickets y comentarios creados, editados o eliminados desde entonces.
+
+El watermark es un token opaco con la última posición leída de cada
+flujo: tickets, comentarios y eliminaciones (Tombstone) por (change_xid,
+id), de modo que cada consulta es un rango sobre su índice. ``change_xid``
+es el ID de la transacción que escribió la fila por última vez (lo asigna
+la base de datos, ver la migración 0016) y solo se leen filas con
+``change_xid`` menor que el xmin del snapshot actual: todas esas
+transacciones ya terminaron, así que ningún cambio posterior puede quedar
+detrás del watermark, por mucho que tarde en confirmarse su transacción.
+
+La contracara: el xmin del snapshot (``pg_snapshot_xmin``) es la
+transacción con escrituras más antigua que sigue abierta en el servidor.
+Mientras una transacción larga siga abierta (una importación, un
+``migrate``, una sesión ``idle in transaction`` que ya escribió) el feed
+no devuelve ningún cambio posterior a su primera escritura, para ningún
+cliente; los cambios aparecen todos juntos cuando termina. Conviene acotarlas con
+``idle_in_transaction_session_timeout`` y vigilar ``pg_stat_activity``.
+"""
+import json
+from base64 import b64decode, b64encode
+from binascii import Error as BinasciiError
+
+from django.db import connections, router
+from django.db.models import BigIntegerField, Count, Q
+from django.db.models.expressions import RawSQL
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+from .models import Comment, Ticket, Tombstone
+
+
+# Máximo de filas por flujo en una respuesta
+LIMIT = 500
+
+STREAMS = ['tickets', 'comments', 'deleted']
+
+
+class InvalidWatermark(ValueError):
+    """El token ``since`` no es un watermark válido."""
+
+
+class ExpiredWatermark(ValueError):
+    """El watermark es anterior a la retención de eliminaciones."""
+
+
+def encode_watermark(issued_at, positions):
+    """Codifica la fecha de lectura y {flujo: (change_xid, id)} como un token opaco."""
+    data = json.dumps({
+        'issued_at': issued_at.isoformat(),
+        **{stream: list(position) for stream, position in positions.items()},
+    })
+    return b64encode(data.encode('utf-8'), altchars=b'-_').decode('ascii')
+
+
+def decode_watermark(token):
+    """
+    Decodifica un token de ``encode_watermark``. Retorna (fecha de
+    lectura, {flujo: (change_xid, id)}).
+    """
+    try:
+        data = json.loads(b64decode(token.encode('ascii'), altchars=b'-_', validate=True))
+        legacy = 'issued_at' not in data and isinstance(data['tickets'][0], str)
+    except (TypeError, ValueError, KeyError, IndexError, UnicodeError, BinasciiError):
+        raise InvalidWatermark('Watermark inválido.')
+
+    if legacy:
+        # Watermark por fecha de actualización, de antes de la migración 0016
+        raise ExpiredWatermark(
+            'El watermark es de una versión anterior; recarga los listados completos.'
+        )
+
+    try:
+        issued_at = parse_datetime(data['issued_at'])
+        if issued_at is None or timezone.is_naive(issued_at):
+            raise ValueError
+        positions = {}
+        for stream in STREAMS:
+            xid, pk = data[stream]
+            if not isinstance(xid, int) or not isinstance(pk, int):
+                raise ValueError
+            positions[stream] = (xid, pk)
+    except (TypeError, ValueError, KeyError):
+        raise InvalidWatermark('Watermark inválido.')
+    return issued_at, positions
+
+
+def snapshot_xmin(using):
+    """
+    Retorna el xmin del snapshot actual: toda transacción con un ID menor
+    ya se confirmó o se abortó.
+    """
+    with connections[using].cursor() as cursor:
+        cursor.execute('SELECT pg_snapshot_xmin(pg_current_snapshot())::text::bigint')
+        return cursor.fetchone()[0]
+
+
+def current_watermark():
+    """Retorna el watermark de este momento, sin cambios pendientes."""
+    horizon = snapshot_xmin(router.db_for_read(Ticket))
+    return encode_watermark(timezone.now(), {stream: (horizon, 0) for stream in STREAMS})
+
+
+def _read(queryset, position, horizon, limit):
+    """
+    Lee hasta ``limit`` filas posteriores a ``position`` y con
+    ``change_xid`` menor que ``horizon``, ordenadas por (change_xid, id).
+
+    Retorna las filas y la nueva posición del flujo. Si no quedan más
+    filas, la posición avanza hasta ``horizon``.
+    """
+    xid, pk = position
+    change_xid = RawSQL(
+        f'"{queryset.model._meta.db_table}"."change_xid"', [], output_field=BigIntegerField()
+    )
+    rows = list(
+        queryset.annotate(change_xid=change_xid).filter(
+            Q(change_xid__gt=xid) | Q(change_xid=xid, id__gt=pk),
+            change_xid__lt=horizon
+        ).order_by('change_xid', 'id')[:limit + 1]
+    )
+
+    if len(rows) > limit:
+        rows = rows[:limit]
+        last = rows[-1]
+        return rows, (last.change_xid, last.pk), True
+
+    return rows, max(position, (horizon, 0)), False
+
+
+def changes_since(token, user, limit=LIMIT):
+    """
+    Retorna los cambios posteriores al watermark ``token`` visibles para
+    ``user``.
+
+    Resultado: {'tickets': [...], 'comments': [...], 'deleted':
+    {'tickets': [ids], 'comments': [ids]}, 'watermark': token,
+    'has_more': bool}. Tickets y comentarios son instancias de modelo
+    listas para TicketSerializer y CommentSerializer.
+
+    Para usuarios sin staff, un comentario que pasó a ser interno se
+    informa como eliminado, y los comentarios internos eliminados no se
+    informan.
+    """
+    issued_at, positions = decode_watermark(token)
+    now = timezone.now()
+
+    if issued_at < now - Tombstone.RETENTION:
+        raise ExpiredWatermark(
+            'El watermark es demasiado antiguo; recarga los listados completos.'
+        )
+
+    using = router.db_for_read(Ticket)
+    horizon = snapshot_xmin(using)
+
+    tickets, positions['tickets'], more_tickets = _read(
+        Ticket.objects.using(using).select_related('created_by', 'assigned_to').defer(
+            'search_vector'
+        ).annotate(comments_count=Count('comments')),
+        positions['tickets'], horizon, limit
+    )
+
+    comments, positions['comments'], more_comments = _read(
+        Comment.objects.using(using).select_related('author').defer('search_vector'),
+        positions['comments'], horizon, limit
+    )
+
+    tombstones, positions['deleted'], more_deleted = _read(
+        Tombstone.objects.using(using),
+        positions['deleted'], horizon, limit
+    )
+
+    deleted = {'tickets': [], 'comments': []}
+    for tombstone in tombstones:
+        if tombstone.kind == Tombstone.KIND_TICKET:
+            deleted['tickets'].append(tombstone.object_id)
+        elif user.is_staff or not tombstone.is_internal:
+            deleted['comments'].append(tombstone.object_id)
+
+    if not user.is_staff:
+        deleted['comments'] += [comment.pk for comment in comments if comment.is_internal]
+        comments = [comment for comment in comments if not comment.is_internal]
+
+    return {
+        'tickets': tickets,
+        'comments': comments,
+        'deleted': deleted,
+        'watermark': encode_watermark(now, positions),
+        'has_more': more_tickets or more_comments or more_deleted,
+    }
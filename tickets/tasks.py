@@ -0,0 +1,53 @@
+"""
+Tareas periódicas de mantenimiento (ver tickets/jobs.py).
+
+Mientras haya un worker (``manage.py run_jobs``) se ejecutan solas; los
+comandos equivalentes (purge_tombstones, purge_blobs, purge_uploads,
+archive_tickets, escalate_tickets) siguen disponibles para ejecutarlas a
+mano.
+"""
+from datetime import timedelta
+
+from django.conf import settings
+
+from . import escalation
+from .jobs import task
+from .models import ArchivedTicket, Blob, Job, Tombstone, UploadSession
+
+
+@task(every=timedelta(hours=1))
+def purge_uploads():
+    """Elimina las subidas por partes abandonadas."""
+    UploadSession.purge()
+
+
+@task(every=timedelta(hours=6))
+def purge_blobs():
+    """Elimina los blobs sin referencias y los archivos huérfanos."""
+    Blob.purge()
+
+
+@task(every=timedelta(days=1))
+def purge_tombstones():
+    """Elimina las marcas de eliminación que superan su retención."""
+    Tombstone.purge()
+
+
+@task(every=timedelta(hours=1), singleton=True)
+def archive_tickets():
+    """Mueve al archivo los tickets cerrados hace más de TICKETS_ARCHIVE_AFTER_DAYS días."""
+    if settings.TICKETS_ARCHIVE_AFTER_DAYS > 0:
+        ArchivedTicket.archive(ArchivedTicket.cutoff(), batch_size=settings.TICKETS_ARCHIVE_BATCH_SIZE)
+
+
+@task(every=timedelta(minutes=5), singleton=True)
+def escalate_tickets():
+    """Escala los tickets desatendidos según TICKETS_ESCALATION_RULES."""
+    if settings.TICKETS_ESCALATION_RULES:
+        escalation.escalate()
+
+
+@task(every=timedelta(days=1))
+def purge_jobs():
+    """Elimina las tareas terminadas o fallidas que superan su retención."""
+    Job.purge()
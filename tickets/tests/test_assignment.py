@@ -0,0 +1,71 @@
+"""
+Pruebas de la asignación automática de tickets nuevos.
+"""
+import threading
+
+from django.contrib.auth.models import User
+from django.db import connections
+from django.test import TransactionTestCase, override_settings
+from rest_framework.test import APIClient
+
+from tickets.models import Ticket
+
+
+class LeastOpenConcurrencyTests(TransactionTestCase):
+    """Varios usuarios creando tickets a la vez con least_open."""
+
+    creators = 8
+    tickets_per_creator = 5
+    agents = 4
+
+    def setUp(self):
+        for index in range(self.agents):
+            agent = User.objects.create_user(f'agente{index}', password='x')
+            agent.profile.is_support_staff = True
+            agent.profile.save()
+        self.users = [
+            User.objects.create_user(f'usuario{index}', password='x')
+            for index in range(self.creators)
+        ]
+
+    def create_tickets(self, user, barrier, errors):
+        try:
+            client = APIClient()
+            client.force_authenticate(user)
+            barrier.wait()
+            for index in range(self.tickets_per_creator):
+                response = client.post('/api/tickets/', {
+                    'title': f'Ticket de {user.username} {index}',
+                    'description': 'Descripción del ticket',
+                    'priority': 'media'
+                }, format='json')
+                if response.status_code != 201:
+                    errors.append(response.status_code)
+                    return
+        except Exception as exc:
+            errors.append(exc)
+        finally:
+            connections.close_all()
+
+    @override_settings(TICKETS_AUTO_ASSIGN='least_open')
+    def test_load_spread_evenly(self):
+        barrier = threading.Barrier(self.creators)
+        errors = []
+        threads = [
+            threading.Thread(target=self.create_tickets, args=(user, barrier, errors))
+            for user in self.users
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(errors, [])
+        loads = {
+            agent_id: Ticket.objects.filter(assigned_to_id=agent_id).count()
+            for agent_id in User.objects.filter(profile__is_support_staff=True).values_list('pk', flat=True)
+        }
+        total = self.creators * self.tickets_per_creator
+        self.assertEqual(sum(loads.values()), total)
+        # Cada creación vio las anteriores: nadie recibió más de su parte
+        self.assertEqual(set(loads.values()), {total // self.agents})
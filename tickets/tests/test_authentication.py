@@ -0,0 +1,67 @@
+"""
+Pruebas de la autenticación JWT con caché (tickets/authentication.py).
+"""
+from django.contrib.auth.models import User
+from django.test import TestCase
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.exceptions import AuthenticationFailed
+from rest_framework_simplejwt.tokens import AccessToken
+
+from tickets.authentication import CachedJWTAuthentication, user_cache
+from tickets.models import UserProfile
+
+
+class CachedJWTAuthenticationTests(TestCase):
+
+    def setUp(self):
+        user_cache.clear()
+        self.addCleanup(user_cache.clear)
+        self.user = User.objects.create_user('usuario', password='x')
+        self.authentication = CachedJWTAuthentication()
+        self.token = self.authentication.get_validated_token(str(AccessToken.for_user(self.user)))
+
+    def authenticate(self):
+        return self.authentication.get_user(self.token)
+
+    def test_cached_user_needs_one_query(self):
+        self.authenticate()
+        # Solo la huella del usuario y su perfil
+        with self.assertNumQueries(1):
+            user = self.authenticate()
+        self.assertEqual(user.pk, self.user.pk)
+        self.assertEqual(user.profile.user_id, self.user.pk)
+
+    def test_update_deactivation_applies_immediately(self):
+        self.authenticate()
+        User.objects.filter(pk=self.user.pk).update(is_active=False)
+        with self.assertRaises(AuthenticationFailed):
+            self.authenticate()
+
+    def test_profile_update_applies_immediately(self):
+        self.authenticate()
+        UserProfile.objects.filter(user=self.user).update(is_support_staff=True)
+        self.assertTrue(self.authenticate().profile.is_support_staff)
+
+    def test_requests_get_independent_copies(self):
+        first = self.authenticate()
+        first.first_name = 'Otro'
+        first.profile.department = 'Modificado'
+
+        second = self.authenticate()
+        self.assertEqual(second.first_name, '')
+        self.assertEqual(second.profile.department, self.user.profile.department)
+        self.assertIsNot(second.profile, first.profile)
+
+    def test_deleted_user_is_rejected(self):
+        self.authenticate()
+        User.objects.filter(pk=self.user.pk).delete()
+        with self.assertRaises(AuthenticationFailed):
+            self.authenticate()
+
+    def test_api_rejects_deactivated_user(self):
+        client = APIClient()
+        client.credentials(HTTP_AUTHORIZATION=f'Bearer {AccessToken.for_user(self.user)}')
+        self.assertEqual(client.get('/api/profiles/me/').status_code, 200)
+
+        User.objects.filter(pk=self.user.pk).update(is_active=False)
+        self.assertEqual(client.get('/api/profiles/me/').status_code, 401)
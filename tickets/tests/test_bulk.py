@@ -0,0 +1,56 @@
+"""
+Pruebas de las operaciones masivas (POST /api/tickets/bulk/).
+"""
+from django.contrib.auth.models import User
+from django.test import TestCase
+from rest_framework.test import APIClient
+
+from tickets.models import Ticket
+
+
+class BulkOperationTests(TestCase):
+
+    def setUp(self):
+        self.staff = User.objects.create_user('staff', password='x', is_staff=True)
+        self.open = Ticket.objects.create(
+            title='Ticket abierto',
+            description='Descripción del ticket',
+            created_by=self.staff
+        )
+        self.closed = Ticket.objects.create(
+            title='Ticket cerrado',
+            description='Descripción del ticket',
+            status='cerrado',
+            created_by=self.staff
+        )
+        self.client = APIClient()
+        self.client.force_authenticate(self.staff)
+
+    def bulk(self, **data):
+        response = self.client.post('/api/tickets/bulk/', data, format='json')
+        self.assertEqual(response.status_code, 200)
+        return response.data
+
+    def test_close(self):
+        missing = self.closed.pk + 100
+        data = self.bulk(operation='close', ids=[self.open.pk, self.closed.pk, missing])
+
+        self.assertEqual(data['changed'], [self.open.pk])
+        self.assertEqual(data['skipped'], [
+            {'id': self.closed.pk, 'reason': 'unchanged'},
+            {'id': missing, 'reason': 'not_found'},
+        ])
+        self.open.refresh_from_db()
+        self.assertEqual(self.open.status, 'cerrado')
+        self.assertIsNotNone(self.open.closed_at)
+
+    def test_unassign_unassigned_ticket_is_unchanged(self):
+        self.closed.assigned_to = self.staff
+        self.closed.save()
+
+        data = self.bulk(operation='assign', ids=[self.open.pk, self.closed.pk], assigned_to_id=None)
+
+        self.assertEqual(data['changed'], [self.closed.pk])
+        self.assertEqual(data['skipped'], [{'id': self.open.pk, 'reason': 'unchanged'}])
+        self.closed.refresh_from_db()
+        self.assertIsNone(self.closed.assigned_to)
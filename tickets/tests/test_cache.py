@@ -0,0 +1,84 @@
+"""
+Pruebas del caché del detalle de tickets (tickets/cache.py).
+
+Son TransactionTestCase: las invalidaciones se aplican al confirmar la
+transacción de cada cambio.
+"""
+from unittest import mock
+
+from django.contrib.auth.models import User
+from django.core.cache import caches
+from django.test import TransactionTestCase
+from rest_framework.test import APIClient
+
+from tickets.cache import ticket_detail_cache
+from tickets.models import Comment, Ticket
+from tickets.views import TicketViewSet
+
+
+class TicketDetailCacheTests(TransactionTestCase):
+
+    def setUp(self):
+        caches[ticket_detail_cache.cache_alias].clear()
+        self.user = User.objects.create_user('usuario', password='x', first_name='Ana')
+        self.ticket = Ticket.objects.create(
+            title='Ticket en caché',
+            description='Descripción del ticket',
+            created_by=self.user
+        )
+        self.url = f'/api/tickets/{self.ticket.pk}/'
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def get(self):
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, 200)
+        return response
+
+    def write_after_read(self, write):
+        """
+        Ejecuta ``write`` (y lo confirma) justo después de que la vista lee
+        el ticket y antes de que guarde el detalle en el caché.
+        """
+        get_object = TicketViewSet.get_object
+
+        def read_then_write(view):
+            ticket = get_object(view)
+            write()
+            return ticket
+
+        with mock.patch.object(TicketViewSet, 'get_object', read_then_write):
+            self.assertEqual(self.get()['X-Cache'], 'MISS')
+
+    def test_hit_and_invalidation(self):
+        self.assertEqual(self.get()['X-Cache'], 'MISS')
+        self.assertEqual(self.get()['X-Cache'], 'HIT')
+
+        Comment.objects.create(ticket=self.ticket, author=self.user, content='Comentario nuevo')
+        response = self.get()
+        self.assertEqual(response['X-Cache'], 'MISS')
+        self.assertEqual(len(response.data['comments']), 1)
+
+    def test_ticket_changed_during_read_is_not_served(self):
+        def write():
+            ticket = Ticket.objects.get(pk=self.ticket.pk)
+            ticket.status = 'cerrado'
+            ticket.save()
+
+        self.write_after_read(write)
+
+        response = self.get()
+        self.assertEqual(response['X-Cache'], 'MISS')
+        self.assertEqual(response.data['status'], 'cerrado')
+
+    def test_user_changed_during_read_is_not_served(self):
+        def write():
+            user = User.objects.get(pk=self.user.pk)
+            user.first_name = 'Beatriz'
+            user.save()
+
+        self.write_after_read(write)
+
+        response = self.get()
+        self.assertEqual(response['X-Cache'], 'MISS')
+        self.assertEqual(response.data['created_by']['first_name'], 'Beatriz')
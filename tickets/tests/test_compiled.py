@@ -0,0 +1,62 @@
+"""
+Pruebas del caché de CompiledSerializer (tickets/compiled.py).
+"""
+from collections import OrderedDict
+from unittest import mock
+
+from django.test import SimpleTestCase
+
+from tickets.compiled import CompiledSerializer
+from tickets.serializers import TicketSerializer
+
+
+class CompiledSerializerCacheTests(SimpleTestCase):
+    """El caché no crece con los valores de ``?fields=`` y ``?expand=``."""
+
+    def setUp(self):
+        patcher = mock.patch.object(CompiledSerializer, '_cache', OrderedDict())
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def compile(self, fields=None, expand=None):
+        return CompiledSerializer.for_class(TicketSerializer, fields, expand)
+
+    def test_equivalent_params_share_entry(self):
+        compiled = self.compile(['id', 'title', 'created_by'], ['created_by'])
+
+        self.assertIs(self.compile(['title', 'id', 'created_by', 'title'], ['created_by']), compiled)
+        self.assertIs(self.compile(['id', 'title', 'created_by', 'nope'], ['created_by', 'nope']), compiled)
+        # Expandir una relación que no se incluye no cambia nada
+        self.assertIs(
+            self.compile(['id', 'title', 'created_by'], ['created_by', 'assigned_to']),
+            compiled
+        )
+        self.assertEqual(len(CompiledSerializer._cache), 1)
+
+    def test_unknown_params_do_not_grow_cache(self):
+        for index in range(50):
+            self.compile(['id', f'campo{index}'], [f'relacion{index}'])
+            self.compile(None, [f'relacion{index}'])
+        self.assertEqual(len(CompiledSerializer._cache), 2)
+
+    def test_expand_changes_representation(self):
+        plain = self.compile(['id', 'created_by'])
+        expanded = self.compile(['id', 'created_by'], ['created_by'])
+
+        self.assertIsNot(plain, expanded)
+        self.assertEqual([kind for _, kind, _, _ in plain.plan], ['value', 'value'])
+        self.assertEqual([kind for _, kind, _, _ in expanded.plan], ['value', 'nested'])
+
+    def test_cache_is_bounded(self):
+        names = ['title', 'description', 'status', 'priority', 'created_at', 'updated_at']
+        with mock.patch.object(CompiledSerializer, 'cache_size', 4):
+            first = self.compile(['id', names[0]])
+            for name in names[1:]:
+                self.compile(['id', name])
+                self.assertLessEqual(len(CompiledSerializer._cache), 4)
+            self.assertIsNot(self.compile(['id', names[0]]), first)
+
+            # La entrada usada recientemente se conserva
+            recent = self.compile(['id', names[-1]])
+            self.compile(['id', names[1]])
+            self.assertIs(self.compile(['id', names[-1]]), recent)
@@ -0,0 +1,139 @@
+"""
+Pruebas de los eventos en vivo (/api/events/) con el cliente ASGI.
+"""
+import asyncio
+
+from asgiref.sync import sync_to_async
+from django.contrib.auth.models import User
+from django.test import AsyncClient, TransactionTestCase
+from rest_framework_simplejwt.tokens import AccessToken
+
+from config.asgi import application
+from tickets.events import broker
+from tickets.models import Ticket
+
+
+class LiveEventsTests(TransactionTestCase):
+    """
+    Los triggers publican con NOTIFY al confirmar la transacción, así que
+    estas pruebas no pueden correr dentro de una transacción.
+    """
+
+    timeout = 5
+
+    def setUp(self):
+        self.owner = User.objects.create_user('duenio', password='x')
+        self.agent = User.objects.create_user('agente', password='x')
+        self.other = User.objects.create_user('otro', password='x')
+        self.ticket = Ticket.objects.create(
+            title='Ticket observado', description='Descripción del ticket', created_by=self.owner
+        )
+        self.other_ticket = Ticket.objects.create(
+            title='Ticket de otro', description='Descripción del ticket', created_by=self.other
+        )
+        self.client = AsyncClient()
+
+    def tearDown(self):
+        self.assertEqual(broker.subscriptions, set())
+
+    def token(self, user):
+        return str(AccessToken.for_user(user))
+
+    async def subscribe(self, path, user):
+        """Abre el stream y consume el primer mensaje (retry)."""
+        response = await self.client.get(f'{path}?token={self.token(user)}')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response['Content-Type'], 'text/event-stream')
+        stream = response.streaming_content.__aiter__()
+        self.assertTrue((await self.next_message(stream)).startswith('retry:'))
+        return stream
+
+    async def next_message(self, stream):
+        chunk = await asyncio.wait_for(stream.__anext__(), self.timeout)
+        return chunk.decode() if isinstance(chunk, bytes) else chunk
+
+    async def update(self, ticket, **changes):
+        for name, value in changes.items():
+            setattr(ticket, name, value)
+        await sync_to_async(ticket.save)()
+
+    async def test_status_change_reaches_ticket_stream(self):
+        stream = await self.subscribe(f'/api/events/tickets/{self.ticket.pk}/', self.owner)
+        try:
+            await self.update(self.ticket, status='en_progreso')
+            message = await self.next_message(stream)
+            self.assertTrue(message.startswith('event: status\n'))
+            self.assertIn(f'"ticket":{self.ticket.pk}', message)
+            self.assertIn('"status":"en_progreso"', message)
+        finally:
+            await stream.aclose()
+
+    async def test_assignment_reaches_queue_stream(self):
+        stream = await self.subscribe('/api/events/my-queue/', self.agent)
+        try:
+            await self.update(self.ticket, assigned_to=self.agent)
+            message = await self.next_message(stream)
+            self.assertTrue(message.startswith('event: assignment\n'))
+            self.assertIn(f'"ticket":{self.ticket.pk}', message)
+            self.assertIn(f'"assigned_to":{self.agent.pk}', message)
+        finally:
+            await stream.aclose()
+
+    async def test_other_tickets_are_not_delivered(self):
+        ticket_stream = await self.subscribe(f'/api/events/tickets/{self.ticket.pk}/', self.owner)
+        queue_stream = await self.subscribe('/api/events/my-queue/', self.agent)
+        try:
+            # Cambios en un ticket ajeno y una asignación a otro usuario
+            await self.update(self.other_ticket, status='en_progreso', assigned_to=self.other)
+            # Después, un cambio que sí les corresponde: es lo primero que reciben
+            await self.update(self.ticket, status='en_progreso', assigned_to=self.agent)
+
+            message = await self.next_message(ticket_stream)
+            self.assertIn(f'"ticket":{self.ticket.pk}', message)
+            message = await self.next_message(queue_stream)
+            self.assertIn(f'"ticket":{self.ticket.pk}', message)
+            self.assertNotIn(f'"ticket":{self.other_ticket.pk}', message)
+        finally:
+            await ticket_stream.aclose()
+            await queue_stream.aclose()
+
+    async def test_disconnect_releases_subscription(self):
+        # Por la aplicación ASGI completa (config.asgi), con el mensaje
+        # http.disconnect que envía el servidor cuando el cliente se va
+        path = f'/api/events/tickets/{self.ticket.pk}/'
+        scope = {
+            'type': 'http',
+            'asgi': {'version': '3.0'},
+            'http_version': '1.1',
+            'method': 'GET',
+            'scheme': 'http',
+            'path': path,
+            'raw_path': path.encode(),
+            'query_string': f'token={self.token(self.owner)}'.encode(),
+            'root_path': '',
+            'headers': [(b'host', b'testserver')],
+            'client': ('127.0.0.1', 50000),
+            'server': ('testserver', 80),
+        }
+        received = asyncio.Queue()
+        await received.put({'type': 'http.request', 'body': b'', 'more_body': False})
+        sent = asyncio.Queue()
+
+        handler = asyncio.ensure_future(application(scope, received.get, sent.put))
+        start = await asyncio.wait_for(sent.get(), self.timeout)
+        self.assertEqual(start['status'], 200)
+        body = await asyncio.wait_for(sent.get(), self.timeout)
+        self.assertTrue(body['body'].startswith(b'retry:'))
+        self.assertEqual(len(broker.subscriptions), 1)
+        self.assertIsNotNone(broker.connection)
+
+        await received.put({'type': 'http.disconnect'})
+        await asyncio.wait_for(handler, self.timeout)
+
+        self.assertEqual(broker.subscriptions, set())
+        # Sin suscripciones se cierra la conexión LISTEN
+        self.assertIsNone(broker.connection)
+
+    async def test_requires_authentication(self):
+        response = await self.client.get(f'/api/events/tickets/{self.ticket.pk}/')
+        self.assertEqual(response.status_code, 401)
@@ -0,0 +1,90 @@
+"""
+Pruebas de la exportación en streaming (GET /api/tickets/export/).
+"""
+import asyncio
+from unittest import mock
+
+from django.contrib.auth.models import User
+from django.test import TransactionTestCase
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import AccessToken
+
+from config.asgi import application
+from tickets.models import Ticket
+from tickets.renderers import CSVStreamRenderer
+
+
+class ExportTests(TransactionTestCase):
+
+    timeout = 10
+    tickets = 5000
+
+    def setUp(self):
+        self.user = User.objects.create_user('usuario', password='x')
+        Ticket.objects.bulk_create([
+            Ticket(title=f'Ticket {index}', description='Descripción del ticket', created_by=self.user)
+            for index in range(self.tickets)
+        ])
+
+    async def test_asgi_streams_before_reading_all_rows(self):
+        # Por la aplicación ASGI completa (config.asgi), como en producción
+        path = '/api/tickets/export/'
+        scope = {
+            'type': 'http',
+            'asgi': {'version': '3.0'},
+            'http_version': '1.1',
+            'method': 'GET',
+            'scheme': 'http',
+            'path': path,
+            'raw_path': path.encode(),
+            'query_string': b'format=csv',
+            'root_path': '',
+            'headers': [
+                (b'host', b'testserver'),
+                (b'authorization', f'Bearer {AccessToken.for_user(self.user)}'.encode()),
+            ],
+            'client': ('127.0.0.1', 50000),
+            'server': ('testserver', 80),
+        }
+        received = asyncio.Queue()
+        await received.put({'type': 'http.request', 'body': b'', 'more_body': False})
+        sent = asyncio.Queue()
+
+        # Cuenta las filas que el renderer ya leyó del cursor
+        consumed = []
+        stream = CSVStreamRenderer.stream
+
+        def counted_stream(renderer, header, rows):
+            def counted():
+                for row in rows:
+                    consumed.append(row[0])
+                    yield row
+            return stream(renderer, header, counted())
+
+        with mock.patch.object(CSVStreamRenderer, 'stream', counted_stream):
+            handler = asyncio.ensure_future(application(scope, received.get, sent.put))
+            start = await asyncio.wait_for(sent.get(), self.timeout)
+            self.assertEqual(start['status'], 200)
+
+            body = await asyncio.wait_for(sent.get(), self.timeout)
+            self.assertTrue(body['body'].startswith(b'id,title,'))
+            # El primer bloque sale antes de recorrer todas las filas
+            self.assertLess(len(consumed), self.tickets)
+
+            chunks = [body['body']]
+            while body.get('more_body'):
+                body = await asyncio.wait_for(sent.get(), self.timeout)
+                chunks.append(body.get('body', b''))
+            await asyncio.wait_for(handler, self.timeout)
+
+        lines = b''.join(chunks).decode().splitlines()
+        self.assertEqual(len(lines), self.tickets + 1)
+        self.assertEqual(len(set(consumed)), self.tickets)
+
+    def test_sla_ordering(self):
+        client = APIClient()
+        client.force_authenticate(self.user)
+        for ordering in ('age', '-sla_due_at'):
+            response = client.get('/api/tickets/export/', {'format': 'ndjson', 'ordering': ordering})
+            self.assertEqual(response.status_code, 200)
+            self.assertEqual(len(b''.join(response.streaming_content).splitlines()), self.tickets)
@@ -0,0 +1,92 @@
+"""
+Pruebas de la cola de tickets (POST /api/tickets/next/).
+"""
+import threading
+
+from django.contrib.auth.models import User
+from django.db import connections
+from django.test import TransactionTestCase
+from rest_framework.test import APIClient
+
+from tickets.models import Ticket
+
+
+class ClaimNextConcurrencyTests(TransactionTestCase):
+    """Varios agentes tomando tickets de la cola a la vez."""
+
+    claimers = 8
+    tickets = 20
+
+    def setUp(self):
+        creator = User.objects.create_user('creador', password='x')
+        for index in range(self.tickets):
+            Ticket.objects.create(
+                title=f'Ticket en cola {index}',
+                description='Descripción del ticket',
+                priority=['alta', 'media', 'baja'][index % 3],
+                created_by=creator
+            )
+        self.agents = []
+        for index in range(self.claimers):
+            agent = User.objects.create_user(f'agente{index}', password='x')
+            agent.profile.is_support_staff = True
+            agent.profile.save()
+            self.agents.append(agent)
+
+    def claim_until_empty(self, agent, barrier, results, errors):
+        try:
+            client = APIClient()
+            client.force_authenticate(agent)
+            barrier.wait()
+            while True:
+                response = client.post('/api/tickets/next/')
+                if response.status_code == 204:
+                    results.append((agent.pk, None))
+                    return
+                if response.status_code != 200:
+                    errors.append(response.status_code)
+                    return
+                results.append((agent.pk, response.data['id']))
+        except Exception as exc:
+            errors.append(exc)
+        finally:
+            connections.close_all()
+
+    def test_each_ticket_claimed_once(self):
+        barrier = threading.Barrier(self.claimers)
+        results, errors = [], []
+        threads = [
+            threading.Thread(target=self.claim_until_empty, args=(agent, barrier, results, errors))
+            for agent in self.agents
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(errors, [])
+        claimed = [ticket_id for _, ticket_id in results if ticket_id is not None]
+        self.assertEqual(len(claimed), self.tickets)
+        self.assertEqual(len(set(claimed)), self.tickets)
+
+        # Cada agente terminó con la cola vacía (204)
+        empty = [agent_id for agent_id, ticket_id in results if ticket_id is None]
+        self.assertCountEqual(empty, [agent.pk for agent in self.agents])
+
+        # Cada ticket quedó asignado a quien lo tomó
+        owners = dict(Ticket.objects.values_list('pk', 'assigned_to_id'))
+        for agent_id, ticket_id in results:
+            if ticket_id is not None:
+                self.assertEqual(owners[ticket_id], agent_id)
+        self.assertFalse(Ticket.objects.filter(status='abierto').exists())
+
+    def test_empty_queue(self):
+        Ticket.objects.all().delete()
+        client = APIClient()
+        client.force_authenticate(self.agents[0])
+        self.assertEqual(client.post('/api/tickets/next/').status_code, 204)
+
+    def test_requires_support_staff(self):
+        client = APIClient()
+        client.force_authenticate(User.objects.get(username='creador'))
+        self.assertEqual(client.post('/api/tickets/next/').status_code, 403)
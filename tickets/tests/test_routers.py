@@ -0,0 +1,193 @@
+"""
+Pruebas del enrutamiento a réplicas de lectura (tickets/routers.py).
+
+La réplica es un alias más de la base de pruebas, marcado como espejo
+(``TEST: {'MIRROR': 'default'}``) igual que los de DB_REPLICAS en
+config/settings.py: no se crea ni se vacía por separado.
+"""
+import time
+from unittest import mock
+
+from django.contrib.auth.models import User
+from django.core.cache import caches
+from django.db import connections, router
+from django.http import HttpResponse
+from django.test import RequestFactory, TransactionTestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import AccessToken
+
+from tickets.models import Ticket
+from tickets.routers import PIN_CACHE, PIN_COOKIE, ReplicaMiddleware, replicas
+
+
+REPLICA = 'replica_test'
+
+
+@override_settings(TICKETS_REPLICA_WEIGHTS={REPLICA: 1}, TICKETS_REPLICA_PIN_SECONDS=10)
+class ReplicaRoutingTests(TransactionTestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        # El alias se agrega después de crear la base de pruebas y no va en
+        # ``databases``: el runner no lo conoce, y apunta a la misma base
+        default = connections['default'].settings_dict
+        connections.settings[REPLICA] = {
+            **default,
+            'TEST': {**default['TEST'], 'MIRROR': 'default'},
+        }
+
+    @classmethod
+    def tearDownClass(cls):
+        connections[REPLICA].close()
+        del connections[REPLICA]
+        del connections.settings[REPLICA]
+        super().tearDownClass()
+
+    def setUp(self):
+        replicas.reset()
+        self.addCleanup(replicas.reset)
+        caches[PIN_CACHE].clear()
+        self.addCleanup(caches[PIN_CACHE].clear)
+        self.user = User.objects.create_user('usuario', password='x')
+        self.other = User.objects.create_user('otro', password='x')
+        self.factory = RequestFactory()
+
+    def route(self, method, user, cookies=None, write=False):
+        """
+        Pasa una petición por ReplicaMiddleware y retorna la respuesta y
+        las bases elegidas para leer antes y después de escribir.
+        """
+        decisions = []
+
+        def view(request):
+            decisions.append(router.db_for_read(Ticket))
+            if write:
+                router.db_for_write(Ticket)
+                decisions.append(router.db_for_read(Ticket))
+            return HttpResponse()
+
+        request = getattr(self.factory, method.lower())('/api/tickets/')
+        request.COOKIES.update(cookies or {})
+        request.user = user
+        response = ReplicaMiddleware(view)(request)
+        return response, decisions
+
+    def pin_cookie(self, user):
+        response, _ = self.route('POST', user, write=True)
+        return {PIN_COOKIE: response.cookies[PIN_COOKIE].value}
+
+    def test_get_reads_from_replica(self):
+        response, decisions = self.route('GET', self.user)
+        self.assertEqual(decisions, [REPLICA])
+        self.assertNotIn(PIN_COOKIE, response.cookies)
+
+    def test_post_reads_from_primary(self):
+        _, decisions = self.route('POST', self.user)
+        self.assertEqual(decisions, ['default'])
+
+    def test_reads_after_write_use_primary(self):
+        response, decisions = self.route('GET', self.user, write=True)
+        self.assertEqual(decisions, [REPLICA, 'default'])
+        cookie = response.cookies[PIN_COOKIE]
+        self.assertEqual(cookie['max-age'], 10)
+        self.assertTrue(cookie['httponly'])
+
+    def test_pinned_user_reads_from_primary(self):
+        cookies = self.pin_cookie(self.user)
+        # Solo con la cookie, como en otro proceso con un caché local
+        caches[PIN_CACHE].clear()
+
+        _, decisions = self.route('GET', self.user, cookies)
+        self.assertEqual(decisions, ['default'])
+
+        # La cookie solo fija al usuario que escribió
+        _, decisions = self.route('GET', self.other, cookies)
+        self.assertEqual(decisions, [REPLICA])
+
+    def test_pin_without_cookie(self):
+        self.pin_cookie(self.user)
+
+        _, decisions = self.route('GET', self.user)
+        self.assertEqual(decisions, ['default'])
+
+        _, decisions = self.route('GET', self.other)
+        self.assertEqual(decisions, [REPLICA])
+
+    def test_pin_expires(self):
+        cookies = self.pin_cookie(self.user)
+        # Vencen la firma de la cookie y la entrada del caché
+        with mock.patch('time.time', return_value=time.time() + 11):
+            _, decisions = self.route('GET', self.user, cookies)
+        self.assertEqual(decisions, [REPLICA])
+
+    def test_tampered_pin_is_ignored(self):
+        _, decisions = self.route('GET', self.user, {PIN_COOKIE: str(self.user.pk)})
+        self.assertEqual(decisions, [REPLICA])
+
+    def test_unhealthy_replica_reads_from_primary(self):
+        with mock.patch.object(replicas, 'check', return_value=False):
+            _, decisions = self.route('GET', self.user)
+        self.assertEqual(decisions, ['default'])
+
+    def test_outside_request_reads_from_primary(self):
+        self.assertEqual(router.db_for_read(Ticket), 'default')
+
+    def test_api_reads_your_writes(self):
+        client = APIClient()
+        client.force_authenticate(self.user)
+        Ticket.objects.create(
+            title='Ticket existente',
+            description='Descripción del ticket',
+            created_by=self.user
+        )
+
+        with CaptureQueriesContext(connections[REPLICA]) as replica_queries:
+            response = client.get('/api/tickets/')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['count'], 1)
+        self.assertTrue(replica_queries.captured_queries)
+
+        response = client.post('/api/tickets/', {
+            'title': 'Ticket nuevo',
+            'description': 'Descripción del ticket nuevo',
+            'priority': 'alta',
+        })
+        self.assertEqual(response.status_code, 201)
+
+        # El cliente devuelve la cookie: el listado ya incluye el ticket nuevo
+        with CaptureQueriesContext(connections[REPLICA]) as replica_queries:
+            response = client.get('/api/tickets/')
+        self.assertEqual(response.data['count'], 2)
+        self.assertEqual(replica_queries.captured_queries, [])
+
+    def test_jwt_reads_from_replica(self):
+        # Con un token real la autenticación (CachedJWTAuthentication) no
+        # cuenta como escritura
+        client = APIClient()
+        client.credentials(HTTP_AUTHORIZATION=f'Bearer {AccessToken.for_user(self.user)}')
+
+        for _ in range(2):
+            with CaptureQueriesContext(connections[REPLICA]) as replica_queries:
+                response = client.get('/api/tickets/')
+            self.assertEqual(response.status_code, 200)
+            self.assertTrue(replica_queries.captured_queries)
+            self.assertNotIn(PIN_COOKIE, response.cookies)
+
+    def test_jwt_client_without_cookies_reads_your_writes(self):
+        client = APIClient()
+        client.credentials(HTTP_AUTHORIZATION=f'Bearer {AccessToken.for_user(self.user)}')
+
+        response = client.post('/api/tickets/', {
+            'title': 'Ticket nuevo',
+            'description': 'Descripción del ticket nuevo',
+            'priority': 'alta',
+        })
+        self.assertEqual(response.status_code, 201)
+
+        # Un cliente que no guarda cookies
+        client.cookies.clear()
+        with CaptureQueriesContext(connections[REPLICA]) as replica_queries:
+            response = client.get('/api/tickets/')
+        self.assertEqual(response.data['count'], 1)
+        self.assertEqual(replica_queries.captured_queries, [])
@@ -0,0 +1,164 @@
+"""
+Pruebas del feed de cambios (tickets/sync.py, GET /api/tickets/changes/).
+
+Son TransactionTestCase: el feed solo lee cambios de transacciones ya
+terminadas, y en un TestCase todo ocurre dentro de una sola transacción.
+"""
+import json
+from base64 import b64encode
+from datetime import timedelta
+from unittest import mock
+
+import psycopg2
+from django.contrib.auth.models import User
+from django.db import connection
+from django.test import TransactionTestCase
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from tickets import sync
+from tickets.models import Comment, Ticket
+
+
+class ChangesFeedTests(TransactionTestCase):
+
+    def setUp(self):
+        self.user = User.objects.create_user('usuario', password='x')
+        self.staff = User.objects.create_user('staff', password='x', is_staff=True)
+        self.ticket = Ticket.objects.create(
+            title='Ticket existente',
+            description='Descripción del ticket',
+            created_by=self.user
+        )
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def changes(self, watermark=None, client=None):
+        params = {'since': watermark} if watermark else {}
+        response = (client or self.client).get('/api/tickets/changes/', params)
+        self.assertEqual(response.status_code, 200)
+        return response.data
+
+    def test_created_and_updated_rows(self):
+        watermark = self.changes()['watermark']
+
+        ticket = Ticket.objects.create(
+            title='Ticket nuevo',
+            description='Descripción del ticket',
+            created_by=self.user
+        )
+        comment = Comment.objects.create(ticket=self.ticket, author=self.staff, content='Público')
+
+        # El comentario también modifica su ticket (comments_count)
+        data = self.changes(watermark)
+        self.assertEqual([item['id'] for item in data['tickets']], [ticket.pk, self.ticket.pk])
+        self.assertEqual(data['tickets'][1]['comments_count'], 1)
+        self.assertEqual([item['id'] for item in data['comments']], [comment.pk])
+        self.assertFalse(data['has_more'])
+
+        data = self.changes(data['watermark'])
+        self.assertEqual(data['tickets'], [])
+
+        self.ticket.status = 'en_progreso'
+        self.ticket.save()
+        data = self.changes(data['watermark'])
+        self.assertEqual([item['id'] for item in data['tickets']], [self.ticket.pk])
+
+    def test_slow_transaction_is_not_skipped(self):
+        watermark = self.changes()['watermark']
+
+        # Otra conexión modifica el ticket y tarda en confirmar; su
+        # updated_at queda muy atrás de la lectura
+        other = psycopg2.connect(**connection.get_connection_params())
+        self.addCleanup(other.close)
+        with other.cursor() as cursor:
+            cursor.execute(
+                "UPDATE tickets_ticket SET title = %s, updated_at = now() - interval '1 hour' WHERE id = %s",
+                ['Editado en una transacción lenta', self.ticket.pk]
+            )
+
+        data = self.changes(watermark)
+        self.assertEqual(data['tickets'], [])
+
+        other.commit()
+        data = self.changes(data['watermark'])
+        self.assertEqual(
+            [(item['id'], item['title']) for item in data['tickets']],
+            [(self.ticket.pk, 'Editado en una transacción lenta')]
+        )
+
+    def test_internal_comments_hidden_from_non_staff(self):
+        public = Comment.objects.create(ticket=self.ticket, author=self.staff, content='Público')
+        internal = Comment.objects.create(
+            ticket=self.ticket,
+            author=self.staff,
+            content='Interno',
+            is_internal=True
+        )
+        watermark = self.changes()['watermark']
+        staff_client = APIClient()
+        staff_client.force_authenticate(self.staff)
+
+        public_id, internal_id = public.pk, internal.pk
+        public.delete()
+        internal.delete()
+
+        data = self.changes(watermark)
+        self.assertEqual(data['deleted']['comments'], [public_id])
+
+        data = self.changes(watermark, staff_client)
+        self.assertEqual(data['deleted']['comments'], [public_id, internal_id])
+
+    def test_comment_made_internal_is_reported_as_deleted(self):
+        comment = Comment.objects.create(ticket=self.ticket, author=self.staff, content='Público')
+        watermark = self.changes()['watermark']
+
+        comment.is_internal = True
+        comment.save()
+
+        data = self.changes(watermark)
+        self.assertEqual(data['comments'], [])
+        self.assertEqual(data['deleted']['comments'], [comment.pk])
+
+    def test_deleted_ticket(self):
+        watermark = self.changes()['watermark']
+        ticket_id = self.ticket.pk
+        self.ticket.delete()
+
+        data = self.changes(watermark)
+        self.assertEqual(data['deleted']['tickets'], [ticket_id])
+
+    def test_pagination(self):
+        watermark = self.changes()['watermark']
+        created = [
+            Ticket.objects.create(title=f'Ticket {index}', description='Descripción', created_by=self.user).pk
+            for index in range(7)
+        ]
+
+        seen = []
+        with mock.patch.object(sync.changes_since, '__defaults__', (3,)):
+            while True:
+                data = self.changes(watermark)
+                watermark = data['watermark']
+                seen += [item['id'] for item in data['tickets']]
+                if not data['has_more']:
+                    break
+        self.assertEqual(seen, created)
+
+    def test_invalid_and_expired_watermarks(self):
+        response = self.client.get('/api/tickets/changes/', {'since': 'xx'})
+        self.assertEqual(response.status_code, 400)
+
+        expired = sync.encode_watermark(
+            timezone.now() - timedelta(days=40),
+            {stream: (0, 0) for stream in sync.STREAMS}
+        )
+        response = self.client.get('/api/tickets/changes/', {'since': expired})
+        self.assertEqual(response.status_code, 410)
+
+        # Watermark por fecha, de antes de change_xid
+        legacy = b64encode(json.dumps({
+            stream: [timezone.now().isoformat(), 0] for stream in sync.STREAMS
+        }).encode(), altchars=b'-_').decode()
+        response = self.client.get('/api/tickets/changes/', {'since': legacy})
+        self.assertEqual(response.status_code, 410)
@@ -0,0 +1,151 @@
+"""
+Pruebas del listado de tickets (GET /api/tickets/).
+"""
+from unittest import mock
+
+from django.contrib.auth.models import User
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+
+from tickets.models import Comment, Ticket
+from tickets.pagination import TicketPagination
+
+
+class TicketListQueryCountTests(TestCase):
+    """El número de consultas del listado no depende del tamaño de la página."""
+
+    page_sizes = [10, 50, 100]
+
+    # Total de la paginación + la página (con usuarios y comments_count)
+    expected_queries = 2
+
+    @classmethod
+    def setUpTestData(cls):
+        users = [User.objects.create_user(f'usuario{index}', password='x') for index in range(5)]
+        for index in range(120):
+            ticket = Ticket.objects.create(
+                title=f'Ticket {index}',
+                description='Descripción del ticket',
+                created_by=users[index % 5],
+                assigned_to=users[(index + 1) % 5]
+            )
+            Comment.objects.create(ticket=ticket, author=users[0], content='Primer comentario')
+            Comment.objects.create(ticket=ticket, author=users[1], content='Segundo comentario')
+        cls.user = users[0]
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def assert_constant_queries(self, query_string=''):
+        for compiled in (True, False):
+            for page_size in self.page_sizes:
+                with self.subTest(query=query_string, compiled=compiled, page_size=page_size), \
+                        override_settings(TICKETS_COMPILED_SERIALIZERS=compiled), \
+                        mock.patch.object(TicketPagination, 'page_size', page_size):
+                    with self.assertNumQueries(self.expected_queries):
+                        response = self.client.get(f'/api/tickets/{query_string}')
+                    self.assertEqual(response.status_code, 200)
+                    self.assertEqual(len(response.data['results']), page_size)
+                    self.assertEqual(response.data['results'][0]['comments_count'], 2)
+
+    def test_list(self):
+        self.assert_constant_queries()
+
+    def test_list_with_expand(self):
+        self.assert_constant_queries('?expand=created_by,assigned_to')
+
+    def test_list_with_fields_and_expand(self):
+        self.assert_constant_queries('?fields=id,title,comments_count,created_by&expand=created_by')
+
+
+class TicketSearchTests(TestCase):
+    """Búsqueda de texto completo en el listado (?search=)."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user('usuario', password='x')
+        for index in range(3):
+            ticket = Ticket.objects.create(
+                title=f'Impresora del piso {index}',
+                description='La impresora no imprime desde ayer',
+                created_by=cls.user
+            )
+            Comment.objects.create(ticket=ticket, author=cls.user, content='Comentario')
+        Ticket.objects.create(title='Correo caído', description='No llega el correo', created_by=cls.user)
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def test_rank_and_headline_not_grouped(self):
+        for compiled in (True, False):
+            with self.subTest(compiled=compiled), \
+                    override_settings(TICKETS_COMPILED_SERIALIZERS=compiled), \
+                    CaptureQueriesContext(connection) as queries:
+                response = self.client.get('/api/tickets/', {'search': 'impresora'})
+
+            self.assertEqual(response.status_code, 200)
+            self.assertEqual(response.data['count'], 3)
+            result = response.data['results'][0]
+            self.assertIn('<mark>', result['search_headline'])
+            self.assertGreater(result['search_rank'], 0)
+            self.assertEqual(result['comments_count'], 1)
+
+            # Agrupar por ts_rank y ts_headline los calcularía para cada
+            # fila que coincide, no solo para las de la página
+            sql = next(query['sql'] for query in queries if 'ts_headline' in query['sql'])
+            with connection.cursor() as cursor:
+                cursor.execute(f'EXPLAIN (VERBOSE) {sql}')
+                group_keys = [line for line, in cursor.fetchall() if 'Group Key:' in line]
+            self.assertTrue(group_keys)
+            for line in group_keys:
+                self.assertNotIn('ts_rank', line)
+                self.assertNotIn('ts_headline', line)
+
+
+class TicketSearchVectorTests(TestCase):
+    """El vector de búsqueda del ticket sigue a sus comentarios públicos."""
+
+    def setUp(self):
+        self.user = User.objects.create_user('usuario', password='x')
+        self.ticket = Ticket.objects.create(
+            title='Impresora del piso 2',
+            description='La impresora no imprime desde ayer',
+            created_by=self.user
+        )
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def search(self, text):
+        response = self.client.get('/api/tickets/', {'search': text})
+        self.assertEqual(response.status_code, 200)
+        return [item['id'] for item in response.data['results']]
+
+    def test_comments(self):
+        comment = Comment.objects.create(ticket=self.ticket, author=self.user, content='Cambié el tóner')
+        Comment.objects.create(ticket=self.ticket, author=self.user, content='Revisar fusor', is_internal=True)
+        self.assertEqual(self.search('tóner'), [self.ticket.pk])
+        self.assertEqual(self.search('fusor'), [])
+
+        comment.content = 'Cambié el rodillo'
+        comment.save()
+        self.assertEqual(self.search('tóner'), [])
+        self.assertEqual(self.search('rodillo'), [self.ticket.pk])
+
+        comment.delete()
+        self.assertEqual(self.search('rodillo'), [])
+        self.assertEqual(self.search('impresora'), [self.ticket.pk])
+
+    def test_long_thread(self):
+        # Cada comentario agrega unas 15.000 palabras distintas: el vector
+        # del ticket llega al límite de 1 MB antes del último
+        for index in range(8):
+            words = ' '.join(f'c{index}p{word}' for word in range(15000))
+            Comment.objects.create(ticket=self.ticket, author=self.user, content=words)
+
+        self.assertEqual(self.ticket.comments.count(), 8)
+        self.assertEqual(self.search('c0p1'), [self.ticket.pk])
+        self.assertEqual(self.search('impresora'), [self.ticket.pk])
@@ -0,0 +1,100 @@
+"""
+Pruebas de las subidas por partes (POST /api/uploads/{id}/complete/).
+"""
+import os
+import shutil
+import tempfile
+from unittest import mock
+
+from django.contrib.auth.models import User
+from django.db import DatabaseError
+from django.test import TestCase, override_settings
+from rest_framework.test import APIClient
+
+from tickets.models import Blob, Comment, Ticket, UploadSession
+from tickets.serializers import CommentSerializer
+
+
+class UploadCompleteTests(TestCase):
+
+    content = b'linea del log\n' * 1000
+
+    def setUp(self):
+        media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, media_root)
+        settings_override = override_settings(MEDIA_ROOT=media_root)
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+
+        self.user = User.objects.create_user('usuario', password='x')
+        self.ticket = Ticket.objects.create(
+            title='Ticket con log',
+            description='Descripción del ticket',
+            created_by=self.user
+        )
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+        self.session = self.upload()
+
+    def upload(self):
+        response = self.client.post(
+            '/api/uploads/',
+            {'filename': 'servidor.log', 'size': len(self.content)},
+            format='json'
+        )
+        self.assertEqual(response.status_code, 201)
+        session = UploadSession.objects.get(pk=response.data['id'])
+        response = self.client.put(
+            f'/api/uploads/{session.pk}/',
+            self.content,
+            content_type='application/octet-stream',
+            HTTP_CONTENT_RANGE=f'bytes 0-{len(self.content) - 1}/{len(self.content)}'
+        )
+        self.assertEqual(response.data['received'], len(self.content))
+        return session
+
+    def complete(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            return self.client.post(
+                f'/api/uploads/{self.session.pk}/complete/',
+                {'ticket': self.ticket.pk, 'content': 'Log del servidor'},
+                format='json'
+            )
+
+    def test_complete(self):
+        response = self.complete()
+        self.assertEqual(response.status_code, 201)
+
+        comment = Comment.objects.get(pk=response.data['id'])
+        with comment.attachment.open('rb') as attachment:
+            self.assertEqual(attachment.read(), self.content)
+        self.assertFalse(UploadSession.objects.filter(pk=self.session.pk).exists())
+        self.assertFalse(os.path.exists(self.session.temp_path))
+
+    def test_retry_after_failed_save(self):
+        with mock.patch.object(CommentSerializer, 'save', side_effect=DatabaseError):
+            with self.assertRaises(DatabaseError):
+                self.complete()
+
+        # La transacción se revirtió: la sesión conserva su temporal
+        self.assertTrue(UploadSession.objects.filter(pk=self.session.pk).exists())
+        self.assertTrue(os.path.exists(self.session.temp_path))
+        self.assertFalse(Comment.objects.exists())
+
+        response = self.complete()
+        self.assertEqual(response.status_code, 201)
+        comment = Comment.objects.get(pk=response.data['id'])
+        with comment.attachment.open('rb') as attachment:
+            self.assertEqual(attachment.read(), self.content)
+        self.assertEqual(Blob.objects.get(name=comment.attachment.name).ref_count, 1)
+        self.assertFalse(os.path.exists(self.session.temp_path))
+
+    def test_missing_temp_file_resets_session(self):
+        os.remove(self.session.temp_path)
+
+        response = self.complete()
+        self.assertEqual(response.status_code, 409)
+        self.assertEqual(response.data['received'], 0)
+        self.session.refresh_from_db()
+        self.assertEqual(self.session.received, 0)
+        self.assertFalse(Comment.objects.exists())
@@ -0,0 +1,184 @@
+"""
+Versiones reducidas (WebP) de avatares e imágenes adjuntas.
+
+Al guardar un UserProfile con avatar o un Comment con una imagen adjunta,
+se encola una tarea (ver tickets/jobs.py) que genera las variantes de
+VARIANTS con Pillow y guarda sus nombres en ``avatar_variants`` /
+``attachment_variants``. La petición que sube el archivo no espera nada.
+
+Las variantes se guardan en el almacenamiento por defecto con un nombre
+derivado del archivo original (``variants/<original>-<variante>.webp``),
+así que un adjunto deduplicado (ver tickets/storage.py) se procesa una
+sola vez aunque lo usen muchos comentarios.
+
+``manage.py generate_thumbnails`` genera las variantes de los archivos
+existentes.
+"""
+import logging
+import os
+from io import BytesIO
+
+from django.apps import apps
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.db import transaction
+from django.db.models.signals import post_save, pre_save
+from django.dispatch import receiver
+from PIL import Image, ImageOps, UnidentifiedImageError
+
+from .jobs import task
+from .models import Comment, UserProfile
+
+
+logger = logging.getLogger(__name__)
+
+# {variante: lado máximo en píxeles}
+VARIANTS = {
+    'small': 64,
+    'medium': 320,
+    'large': 1280,
+}
+
+WEBP_QUALITY = 80
+
+IMAGE_EXTENSIONS = {'.jpg', '.jpeg', '.png', '.gif', '.webp', '.bmp', '.tif', '.tiff'}
+
+# {modelo: (campo del archivo, campo con las variantes)}
+IMAGE_FIELDS = {
+    UserProfile: ('avatar', 'avatar_variants'),
+    Comment: ('attachment', 'attachment_variants'),
+}
+
+
+def is_image(name):
+    return bool(name) and os.path.splitext(name)[1].lower() in IMAGE_EXTENSIONS
+
+
+def variant_name(name, variant):
+    """Nombre de la variante ``variant`` del archivo ``name``."""
+    return f'variants/{os.path.splitext(name)[0]}-{variant}.webp'
+
+
+def variants_match(name, variants):
+    """Indica si ``variants`` son las del archivo ``name``."""
+    return bool(variants) and all(
+        variants.get(variant) == variant_name(name, variant)
+        for variant in VARIANTS
+    )
+
+
+def variant_urls(variants, request=None):
+    """Retorna {variante: URL} (absoluta si hay ``request``)."""
+    urls = {}
+    for variant, name in variants.items():
+        url = default_storage.url(name)
+        urls[variant] = request.build_absolute_uri(url) if request is not None else url
+    return urls
+
+
+def generate(storage, name):
+    """
+    Genera las variantes que falten del archivo ``name`` de ``storage``.
+
+    Retorna {variante: nombre}, o {} si el archivo no es una imagen válida.
+    """
+    names = {variant: variant_name(name, variant) for variant in VARIANTS}
+    missing = [variant for variant in VARIANTS if not default_storage.exists(names[variant])]
+    if not missing:
+        return names
+
+    try:
+        with storage.open(name, 'rb') as source, Image.open(source) as image:
+            largest = max(VARIANTS[variant] for variant in missing)
+            # En JPEG decodifica directamente a una escala reducida
+            image.draft('RGB', (largest, largest))
+            image = ImageOps.exif_transpose(image)
+            if image.mode not in ('RGB', 'RGBA'):
+                has_alpha = 'A' in image.getbands() or 'transparency' in image.info
+                image = image.convert('RGBA' if has_alpha else 'RGB')
+
+            # De la más grande a la más pequeña, reduciendo la misma imagen
+            for variant in sorted(missing, key=VARIANTS.get, reverse=True):
+                size = VARIANTS[variant]
+                image.thumbnail((size, size), Image.Resampling.LANCZOS)
+                buffer = BytesIO()
+                image.save(buffer, 'WEBP', quality=WEBP_QUALITY)
+                saved = default_storage.save(names[variant], ContentFile(buffer.getvalue()))
+                if saved != names[variant]:
+                    # Otro hilo la generó al mismo tiempo
+                    default_storage.delete(saved)
+    except (OSError, UnidentifiedImageError, Image.DecompressionBombError, ValueError):
+        logger.warning('No se pudieron generar las variantes de %s', name, exc_info=True)
+        return {}
+
+    return names
+
+
+def delete_variants(name):
+    """Elimina las variantes del archivo ``name``."""
+    for variant in VARIANTS:
+        default_storage.delete(variant_name(name, variant))
+
+
+def process(model, pk):
+    """
+    Genera las variantes del archivo de la instancia ``pk`` de ``model`` y
+    las guarda en todas las filas con ese mismo archivo.
+    """
+    file_field, variants_field = IMAGE_FIELDS[model]
+    name = model.objects.filter(pk=pk).values_list(file_field, flat=True).first()
+    if not is_image(name):
+        return
+
+    variants = generate(model._meta.get_field(file_field).storage, name)
+    rows = model.objects.filter(**{file_field: name}).exclude(**{variants_field: variants})
+
+    # update() no pasa por save(): se invalida a mano el caché del detalle
+    # (el de autenticación compara la fila del perfil en cada petición)
+    if model is Comment:
+        from .cache import ticket_detail_cache
+        ticket_ids = set(rows.values_list('ticket_id', flat=True))
+        rows.update(**{variants_field: variants})
+        transaction.on_commit(
+            lambda: ticket_detail_cache.invalidate_tickets(ticket_ids),
+            using=rows.db
+        )
+    else:
+        rows.update(**{variants_field: variants})
+
+
+@task(max_attempts=3)
+def generate_variants(model, pk):
+    """Tarea que ejecuta ``process`` para la instancia ``pk`` de ``model`` (label)."""
+    process(apps.get_model(model), pk)
+
+
+def schedule(model, pk):
+    """Encola la generación de variantes de la instancia ``pk`` de ``model``."""
+    generate_variants.enqueue(model=model._meta.label_lower, pk=pk)
+
+
+@receiver(pre_save, sender=UserProfile)
+@receiver(pre_save, sender=Comment)
+def reset_stale_variants(sender, instance, **kwargs):
+    """Signal que descarta las variantes de un archivo que cambió."""
+    file_field, variants_field = IMAGE_FIELDS[sender]
+    if variants_field in instance.get_deferred_fields():
+        return
+    variants = getattr(instance, variants_field)
+    if variants and not variants_match(getattr(instance, file_field).name, variants):
+        setattr(instance, variants_field, {})
+
+
+@receiver(post_save, sender=UserProfile)
+@receiver(post_save, sender=Comment)
+def schedule_variants(sender, instance, **kwargs):
+    """Signal que programa las variantes de una imagen nueva."""
+    file_field, variants_field = IMAGE_FIELDS[sender]
+    name = getattr(instance, file_field).name
+    if not is_image(name):
+        return
+    if variants_field in instance.get_deferred_fields() or not variants_match(
+        name, getattr(instance, variants_field)
+    ):
+        schedule(sender, instance.pk)
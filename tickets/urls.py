@@ -2,13 +2,18 @@
 URLs de la aplicación tickets.
 Configura los endpoints de la API REST.
 """
+from django.conf import settings
 from django.urls import path, include
 from rest_framework.routers import DefaultRouter
+from .async_views import async_read_urls
 from .views import (
     TicketViewSet,
     CommentViewSet,
     UserProfileViewSet,
-    UserViewSet
+    UserViewSet,
+    UploadSessionViewSet,
+    ticket_events,
+    queue_events
 )
 
 # Crear el router y registrar los ViewSets
@@ -17,12 +22,19 @@ router.register(r'tickets', TicketViewSet, basename='ticket')
 router.register(r'comments', CommentViewSet, basename='comment')
 router.register(r'profiles', UserProfileViewSet, basename='profile')
 router.register(r'users', UserViewSet, basename='user')
+router.register(r'uploads', UploadSessionViewSet, basename='upload')
 
 # Las URLs serán:
 # /api/tickets/
 # /api/tickets/{id}/
 # /api/tickets/my-tickets/
 # /api/tickets/assigned-to-me/
+# /api/tickets/stats/
+# /api/tickets/bulk/
+# /api/tickets/import/
+# /api/tickets/export/
+# /api/tickets/changes/
+# /api/tickets/{id}/comments/
 # /api/tickets/{id}/close/
 # /api/tickets/{id}/reopen/
 # /api/comments/
@@ -32,7 +44,20 @@ router.register(r'users', UserViewSet, basename='user')
 # /api/profiles/me/
 # /api/users/
 # /api/users/{id}/
+# /api/uploads/
+# /api/uploads/{id}/
+# /api/uploads/{id}/complete/
+# /api/events/tickets/{id}/ (SSE, requiere ASGI)
+# /api/events/my-queue/ (SSE, requiere ASGI)
+
+# Con TICKETS_ASYNC_READS las lecturas de tickets, comentarios y
+# /profiles/me/ se atienden con vistas async (ver tickets/async_views.py)
+api_urls = router.urls
+if settings.TICKETS_ASYNC_READS:
+    api_urls = async_read_urls(api_urls)
 
 urlpatterns = [
-    path('', include(router.urls)),
+    path('events/tickets/<int:pk>/', ticket_events, name='ticket-events'),
+    path('events/my-queue/', queue_events, name='queue-events'),
+    path('', include(api_urls)),
 ]
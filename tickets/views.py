@@ -2,42 +2,343 @@
 Vistas (ViewSets) para la API REST del sistema de tickets.
 Los ViewSets manejan las operaciones CRUD (Crear, Leer, Actualizar, Eliminar).
 """
-from rest_framework import viewsets, filters, status
+import asyncio
+import io
+import re
+
+from asgiref.sync import sync_to_async
+from rest_framework import viewsets, filters, mixins, status
 from rest_framework.decorators import action
 from rest_framework.response import Response
-from rest_framework.permissions import IsAuthenticated, IsAdminUser
+from rest_framework.permissions import IsAuthenticated, IsAdminUser, SAFE_METHODS
+from rest_framework.exceptions import AuthenticationFailed
+from rest_framework_simplejwt.exceptions import InvalidToken
 from django_filters.rest_framework import DjangoFilterBackend
+from django.conf import settings
 from django.contrib.auth.models import User
-from .models import Ticket, Comment, UserProfile
+from django.core.exceptions import ValidationError
+from django.shortcuts import get_object_or_404
+from django.db import transaction
+from django.db.models import Count, OuterRef, Prefetch, Subquery
+from django.db.models.functions import Coalesce
+from django.core.handlers.asgi import ASGIRequest
+from django.http import Http404, JsonResponse, StreamingHttpResponse
+from .models import (
+    Ticket, Comment, UserProfile, TicketCounter, UploadSession, ArchivedTicket, ArchivedComment
+)
+from .async_views import AsyncReadViewMixin
+from .authentication import CachedJWTAuthentication
+from .bulk import apply_bulk_operation
+from .cache import ticket_detail_cache
+from .compiled import CompiledSerializer, NotCompilable
+from .events import broker, format_event
+from .filters import FullTextSearchFilter, TicketAgeFilter
+from .importer import FORMATS, IMPORTERS, read_rows
+from .pagination import TicketPagination, CommentPagination
+from .renderers import CSVStreamRenderer, NDJSONStreamRenderer
+from .routers import use_primary
+from . import sla
+from .sync import ExpiredWatermark, InvalidWatermark, changes_since, current_watermark
 from .serializers import (
     TicketSerializer,
     TicketDetailSerializer,
     TicketCreateSerializer,
     TicketStatusUpdateSerializer,
+    TicketBulkActionSerializer,
     CommentSerializer,
     UserProfileSerializer,
-    UserSerializer
+    UserSerializer,
+    UploadSessionSerializer,
+    SparseFieldsMixin
 )
 
 
-class UserViewSet(viewsets.ReadOnlyModelViewSet):
+def visible_comments(user, model=Comment):
+    """
+    Retorna los comentarios que ``user`` puede ver (de ArchivedComment si
+    ``model`` lo indica).
+    
+    Los comentarios internos solo son visibles para staff.
+    """
+    queryset = model.objects.defer('search_vector')
+    if not user.is_staff:
+        queryset = queryset.filter(is_internal=False)
+    return queryset
+
+
+def restore_archived_ticket(ticket_id):
+    """
+    Devuelve a las tablas activas el ticket ``ticket_id`` si está
+    archivado, antes de escribir en él (por ejemplo, un comentario nuevo).
+    """
+    ticket_id = str(ticket_id or '')
+    if ticket_id.isdigit() and not Ticket.objects.filter(pk=ticket_id).exists():
+        ArchivedTicket.restore(int(ticket_id))
+
+
+class SparseFieldsViewMixin(AsyncReadViewMixin):
+    """
+    Soporte de ``?fields=`` y ``?expand=`` en las lecturas.
+    
+    - ?fields=id,title,status - Solo esos campos
+    - ?expand=created_by - Relaciones que se devuelven como objeto; las
+      demás se devuelven como ID
+    
+    Sin ninguno de los dos parámetros la respuesta es la completa, con
+    todas las relaciones expandidas. Con alguno, la consulta carga solo
+    las columnas necesarias (only()) y solo une las relaciones
+    expandidas. Los nombres desconocidos se ignoran.
+    
+    Los listados se serializan con CompiledSerializer (sin instancias del
+    modelo) cuando el serializador lo permite y
+    TICKETS_COMPILED_SERIALIZERS está activo.
+    
+    Los métodos ``a<acción>`` son las versiones async de las lecturas
+    (ver tickets/async_views.py).
+    """
+    # Columnas que siempre se cargan (por ejemplo, las de la paginación)
+    sparse_always = []
+    
+    def get_sparse_params(self):
+        """Retorna (fields, expand) de la petición; None si no se indicó."""
+        request = getattr(self, 'request', None)
+        if request is None or request.method not in SAFE_METHODS:
+            return None, None
+        
+        def parse(value):
+            if value is None:
+                return None
+            return [name.strip() for name in value.split(',') if name.strip()]
+        
+        params = request.query_params
+        return parse(params.get('fields')), parse(params.get('expand'))
+    
+    def get_sparse_kwargs(self, serializer_class=None):
+        """Argumentos ``fields`` y ``expand`` para el serializador."""
+        serializer_class = serializer_class or self.get_serializer_class()
+        if not issubclass(serializer_class, SparseFieldsMixin):
+            return {}
+        fields, expand = self.get_sparse_params()
+        return {'fields': fields, 'expand': expand}
+    
+    def get_serializer(self, *args, **kwargs):
+        kwargs = {**self.get_sparse_kwargs(), **kwargs}
+        return super().get_serializer(*args, **kwargs)
+    
+    def wants_field(self, name):
+        """Retorna True si la respuesta incluye el campo ``name``."""
+        fields, _ = self.get_sparse_params()
+        return fields is None or name in fields
+    
+    def sparse_queryset(self, queryset, serializer_class=None, relations=()):
+        """
+        Limita ``queryset`` a lo que necesita la respuesta.
+        
+        Sin parámetros solo agrega select_related(*relations).
+        """
+        serializer_class = serializer_class or self.get_serializer_class()
+        columns = None
+        if issubclass(serializer_class, SparseFieldsMixin):
+            columns, needed = serializer_class.sparse_requirements(*self.get_sparse_params())
+        
+        if columns is not None:
+            queryset = queryset.only(*columns, *self.sparse_always)
+            relations = needed
+        
+        # select_related() sin argumentos uniría todas las relaciones
+        if relations:
+            queryset = queryset.select_related(*relations)
+        return queryset
+    
+    def list(self, request, *args, **kwargs):
+        return self.list_response(self.filter_queryset(self.get_queryset()))
+    
+    async def alist(self, request, *args, **kwargs):
+        queryset = await sync_to_async(self.filter_queryset)(self.get_queryset())
+        return await self.alist_response(queryset)
+    
+    def get_compiled_serializer(self, serializer_class):
+        """
+        Retorna el CompiledSerializer de la petición, o None si está
+        desactivado o el serializador no se puede compilar.
+        """
+        if not getattr(settings, 'TICKETS_COMPILED_SERIALIZERS', True):
+            return None
+        try:
+            return CompiledSerializer.for_class(
+                serializer_class,
+                **self.get_sparse_kwargs(serializer_class),
+                extra_columns=self.sparse_always
+            )
+        except NotCompilable:
+            return None
+    
+    def list_response(self, queryset, serializer_class=None):
+        """
+        Retorna la respuesta (paginada si corresponde) de un listado.
+        """
+        serializer_class = serializer_class or self.get_serializer_class()
+        compiled = self.get_compiled_serializer(serializer_class)
+        if compiled is not None:
+            try:
+                queryset = compiled.values_list(queryset)
+            except NotCompilable:
+                compiled = None
+        
+        def serialize(rows):
+            if compiled is not None:
+                return compiled.serialize(rows, self.request)
+            return serializer_class(
+                rows,
+                many=True,
+                context=self.get_serializer_context(),
+                **self.get_sparse_kwargs(serializer_class)
+            ).data
+        
+        page = self.paginate_queryset(queryset)
+        if page is not None:
+            return self.get_paginated_response(serialize(page))
+        return Response(serialize(queryset))
+    
+    async def alist_response(self, queryset, serializer_class=None):
+        """
+        Versión async de ``list_response``.
+        
+        Si el listado no se puede compilar, o la paginación no tiene
+        versión async, se usa ``list_response`` con sync_to_async.
+        """
+        serializer_class = serializer_class or self.get_serializer_class()
+        compiled = self.get_compiled_serializer(serializer_class)
+        if compiled is not None:
+            try:
+                rows = compiled.values_list(queryset)
+            except NotCompilable:
+                compiled = None
+        
+        paginator = self.paginator
+        if compiled is None or (
+            paginator is not None and not hasattr(paginator, 'apaginate_queryset')
+        ):
+            return await sync_to_async(self.list_response)(queryset, serializer_class)
+        
+        if paginator is not None:
+            page = await paginator.apaginate_queryset(rows, self.request, view=self)
+            if page is not None:
+                return self.get_paginated_response(compiled.serialize(page, self.request))
+        return Response(compiled.serialize([row async for row in rows], self.request))
+    
+    async def aget_object(self):
+        """Versión async de get_object()."""
+        queryset = await sync_to_async(self.filter_queryset)(self.get_queryset())
+        lookup_url_kwarg = self.lookup_url_kwarg or self.lookup_field
+        try:
+            obj = await queryset.aget(**{self.lookup_field: self.kwargs[lookup_url_kwarg]})
+        except (queryset.model.DoesNotExist, TypeError, ValueError, ValidationError):
+            # Mismo mensaje que get_object_or_404()
+            raise Http404(f'No {queryset.model._meta.object_name} matches the given query.')
+        self.check_object_permissions(self.request, obj)
+        return obj
+    
+    async def aserialize(self, instance):
+        """
+        Datos de ``instance`` con el serializador de la vista.
+        
+        Se ejecuta con sync_to_async: los serializadores de DRF pueden
+        consultar relaciones o campos diferidos.
+        """
+        return await sync_to_async(lambda: self.get_serializer(instance).data)()
+
+
+class ArchiveLookupMixin:
+    """
+    Acceso a los tickets y comentarios archivados (ver ArchivedTicket).
+    
+    - Los listados muestran solo las tablas activas; con ?archived=true
+      muestran el archivo, con los mismos filtros, búsqueda, orden y
+      paginación.
+    - El detalle busca en el archivo lo que no está en las tablas activas.
+    - Una escritura sobre un objeto archivado devuelve su ticket a las
+      tablas activas antes de aplicarse.
+    
+    ``get_queryset(archived=True)`` retorna la consulta sobre el archivo.
+    """
+    # ArchivedTicket o ArchivedComment
+    archived_model = None
+    list_actions = ['list']
+    
+    def wants_archived(self):
+        """Retorna True si el listado se pidió con ?archived=true."""
+        return (
+            self.action in self.list_actions
+            and self.request.query_params.get('archived') == 'true'
+        )
+    
+    def get_object(self):
+        try:
+            return super().get_object()
+        except Http404:
+            if self.request.method in SAFE_METHODS:
+                obj = self.get_archived_object()
+            elif self.restore_archived():
+                obj = super().get_object()
+            else:
+                obj = None
+            if obj is None:
+                raise
+            return obj
+    
+    async def aget_object(self):
+        try:
+            return await super().aget_object()
+        except Http404:
+            obj = await sync_to_async(self.get_archived_object)()
+            if obj is None:
+                raise
+            return obj
+    
+    def get_lookup_value(self):
+        return str(self.kwargs[self.lookup_url_kwarg or self.lookup_field])
+    
+    def get_archived_object(self):
+        """Objeto archivado de la petición, o None si no existe."""
+        lookup = self.get_lookup_value()
+        if not lookup.isdigit():
+            return None
+        queryset = self.filter_queryset(self.get_queryset(archived=True))
+        obj = queryset.filter(**{self.lookup_field: lookup}).first()
+        if obj is not None:
+            self.check_object_permissions(self.request, obj)
+        return obj
+    
+    def restore_archived(self):
+        """Devuelve a las tablas activas el objeto archivado de la petición."""
+        lookup = self.get_lookup_value()
+        return lookup.isdigit() and self.archived_model.restore(int(lookup))
+
+
+class UserViewSet(SparseFieldsViewMixin, viewsets.ReadOnlyModelViewSet):
     """
     ViewSet de solo lectura para usuarios.
     
     Endpoints:
     - GET /api/users/ - Lista todos los usuarios
     - GET /api/users/{id}/ - Detalle de un usuario específico
+    
+    Campos:
+    - ?fields=id,username - Solo los campos indicados
     """
-    queryset = User.objects.all()
     serializer_class = UserSerializer
     permission_classes = [IsAuthenticated]
     filter_backends = [filters.SearchFilter, filters.OrderingFilter]
     search_fields = ['username', 'email', 'first_name', 'last_name']
     ordering_fields = ['username', 'date_joined']
     ordering = ['username']
+    
+    def get_queryset(self):
+        return self.sparse_queryset(User.objects.all())
 
 
-class UserProfileViewSet(viewsets.ModelViewSet):
+class UserProfileViewSet(SparseFieldsViewMixin, viewsets.ModelViewSet):
     """
     ViewSet para perfiles de usuario.
     
@@ -48,8 +349,10 @@ class UserProfileViewSet(viewsets.ModelViewSet):
     - PUT /api/profiles/{id}/ - Actualizar perfil completo
     - PATCH /api/profiles/{id}/ - Actualizar perfil parcial
     - DELETE /api/profiles/{id}/ - Eliminar perfil (solo admin)
+    
+    Campos:
+    - ?fields=department,user&expand=user - Solo los campos indicados
     """
-    queryset = UserProfile.objects.select_related('user').all()
     serializer_class = UserProfileSerializer
     permission_classes = [IsAuthenticated]
     filter_backends = [DjangoFilterBackend, filters.SearchFilter, filters.OrderingFilter]
@@ -58,63 +361,157 @@ class UserProfileViewSet(viewsets.ModelViewSet):
     ordering_fields = ['created_at', 'user__username']
     ordering = ['-created_at']
     
+    def get_queryset(self):
+        return self.sparse_queryset(UserProfile.objects.all(), relations=['user'])
+    
     @action(detail=False, methods=['get'], url_path='me')
     def current_user_profile(self, request):
         """
         Endpoint personalizado para obtener el perfil del usuario actual.
         
         GET /api/profiles/me/
+        
+        El perfil viene precargado con el usuario autenticado
+        (CachedJWTAuthentication), por lo que no hace otra consulta.
         """
-        profile = UserProfile.objects.select_related('user').get(user=request.user)
+        try:
+            profile = request.user.profile
+        except UserProfile.DoesNotExist:
+            profile = UserProfile.objects.select_related('user').get(user=request.user)
         serializer = self.get_serializer(profile)
         return Response(serializer.data)
+    
+    async def acurrent_user_profile(self, request):
+        user = request.user
+        profile = None
+        if User.profile.is_cached(user):
+            profile = getattr(user, 'profile', None)
+        if profile is None:
+            profile = await UserProfile.objects.select_related('user').aget(user=user)
+        return Response(await self.aserialize(profile))
 
 
-class TicketViewSet(viewsets.ModelViewSet):
+class TicketViewSet(ArchiveLookupMixin, SparseFieldsViewMixin, viewsets.ModelViewSet):
     """
     ViewSet completo para tickets.
     
     Endpoints:
     - GET /api/tickets/ - Lista todos los tickets (con filtros)
     - POST /api/tickets/ - Crear nuevo ticket
-    - GET /api/tickets/{id}/ - Detalle de un ticket
+    - GET /api/tickets/{id}/ - Detalle de un ticket (últimos comentarios)
+    - GET /api/tickets/{id}/comments/ - Comentarios del ticket, paginados
     - PUT /api/tickets/{id}/ - Actualizar ticket completo
     - PATCH /api/tickets/{id}/ - Actualizar ticket parcial
     - DELETE /api/tickets/{id}/ - Eliminar ticket (solo admin)
     - POST /api/tickets/{id}/close/ - Cerrar ticket
     - POST /api/tickets/{id}/reopen/ - Reabrir ticket
+    - POST /api/tickets/next/ - Tomar el siguiente ticket de la cola (soporte)
     - GET /api/tickets/my_tickets/ - Tickets creados por el usuario actual
     - GET /api/tickets/assigned_to_me/ - Tickets asignados al usuario actual
+    - GET /api/tickets/stats/ - Contadores por estado, prioridad y asignado
+    - POST /api/tickets/bulk/ - Operaciones masivas (solo staff)
+    - POST /api/tickets/import/ - Importación masiva CSV/NDJSON (solo staff)
+    - GET /api/tickets/export/ - Exportación CSV/NDJSON en streaming
+    - GET /api/tickets/changes/?since=<watermark> - Cambios desde un watermark
+    
+    Búsqueda:
+    - ?search=impresora - Texto completo, ordenado por relevancia
+    - ?search=#123 - Ticket con ID 123
+    
+    Paginación:
+    - ?pagination=cursor - Paginación por cursor (-created_at, id)
+    - ?count=estimated - Total estimado en lugar de COUNT(*)
+    
+    Campos:
+    - ?fields=id,title,status,priority - Solo los campos indicados
+    - ?expand=created_by,assigned_to - Usuarios como objeto (si no, su ID)
+    
+    Archivo:
+    - ?archived=true - Los listados muestran los tickets archivados
+    - El detalle y los comentarios de un ticket archivado se leen igual
+    
+    Edad y SLA (calculados en la consulta, ver tickets/sla.py):
+    - ?sla_breached=true - Tickets que incumplen su SLA
+    - ?min_days_open=3, ?max_days_open=7 - Por días abierto
+    - ?ordering=-age, ?ordering=sla_due_at - Por edad o fecha límite
     """
     permission_classes = [IsAuthenticated]
-    filter_backends = [DjangoFilterBackend, filters.SearchFilter, filters.OrderingFilter]
+    pagination_class = TicketPagination
+    filter_backends = [
+        DjangoFilterBackend, TicketAgeFilter, filters.OrderingFilter, FullTextSearchFilter
+    ]
     filterset_fields = ['status', 'priority', 'created_by', 'assigned_to']
-    search_fields = ['title', 'description', 'id']
-    ordering_fields = ['created_at', 'updated_at', 'priority']
+    search_id_field = 'pk'
+    search_headline_field = 'description'
+    ordering_fields = ['created_at', 'updated_at', 'priority', 'age', 'sla_due_at']
     ordering = ['-created_at']
     
-    def get_queryset(self):
+    sparse_always = ['created_at']
+    
+    # Acciones que devuelven listados con TicketSerializer
+    list_actions = ['list', 'my_tickets', 'assigned_to_me']
+    archived_model = ArchivedTicket
+    
+    def get_queryset(self, archived=None):
         """
         Optimiza las consultas incluyendo relaciones.
+        
+        En los listados el número de comentarios se calcula como anotación
+        en la misma consulta y no se precargan los comentarios, ya que
+        TicketSerializer no los muestra. El resto de acciones precargan
+        en ``latest_comments`` solo los últimos comentarios visibles (uno
+        más de los que muestra TicketDetailSerializer, para saber si hay
+        anteriores), usando el índice (ticket, created_at).
+        
+        Con ?fields= o ?expand= solo se cargan las columnas, relaciones,
+        anotaciones y comentarios que se van a mostrar.
+        
+        Con ``archived`` (por defecto, si se pidió ?archived=true) la
+        consulta es sobre ArchivedTicket y ArchivedComment.
+        
+        La edad y el SLA se anotan siempre: los usan ``days_open``, los
+        campos del SLA y ?ordering=.
         """
-        return Ticket.objects.select_related(
-            'created_by',
-            'assigned_to'
-        ).prefetch_related(
-            'comments',
-            'comments__author'
-        ).all()
+        if archived is None:
+            archived = self.wants_archived()
+        
+        queryset = self.sparse_queryset(
+            sla.annotate((ArchivedTicket if archived else Ticket).objects.defer('search_vector')),
+            relations=['created_by', 'assigned_to']
+        )
+        
+        if self.action in self.list_actions:
+            if self.wants_field('comments_count'):
+                queryset = queryset.annotate(comments_count=Count('comments'))
+            return queryset
+        
+        if not (self.wants_field('comments') or self.wants_field('older_comments')):
+            return queryset
+        
+        comments = visible_comments(
+            self.request.user, ArchivedComment if archived else Comment
+        ).select_related(
+            'author'
+        ).order_by('-created_at', '-id')[:TicketDetailSerializer.LATEST_COMMENTS + 1]
+        
+        return queryset.prefetch_related(
+            Prefetch('comments', queryset=comments, to_attr='latest_comments')
+        )
     
     def get_serializer_class(self):
         """
         Usa diferentes serializadores según la acción.
         """
-        if self.action == 'list':
+        if self.action in self.list_actions:
             return TicketSerializer
         elif self.action == 'create':
             return TicketCreateSerializer
         elif self.action in ['close', 'reopen']:
             return TicketStatusUpdateSerializer
+        elif self.action == 'bulk':
+            return TicketBulkActionSerializer
+        elif self.action == 'comments':
+            return CommentSerializer
         return TicketDetailSerializer
     
     def perform_create(self, serializer):
@@ -123,6 +520,123 @@ class TicketViewSet(viewsets.ModelViewSet):
         """
         serializer.save(created_by=self.request.user)
     
+    def retrieve(self, request, *args, **kwargs):
+        """
+        Detalle de un ticket servido desde caché cuando es posible.
+        
+        Hay una variante para staff y otra para el resto de usuarios. El
+        encabezado X-Cache indica si la respuesta vino del caché (HIT) o
+        se calculó (MISS).
+        """
+        key = self.detail_cache_key()
+        if key is None:
+            return super().retrieve(request, *args, **kwargs)
+        
+        data = ticket_detail_cache.get(*key)
+        if data is not None:
+            return Response(data, headers={'X-Cache': 'HIT'})
+        
+        # Lo que se guarda en caché no puede venir de una réplica atrasada,
+        # y los tokens del caché se leen antes que los datos
+        with use_primary():
+            generations = self.detail_generations(key[0])
+            data = self.get_serializer(self.get_object()).data
+        ticket_detail_cache.set(*key, data, generations)
+        
+        return Response(data, headers={'X-Cache': 'MISS'})
+    
+    async def aretrieve(self, request, *args, **kwargs):
+        key = self.detail_cache_key()
+        if key is None:
+            return Response(await self.aserialize(await self.aget_object()))
+        
+        data = await sync_to_async(ticket_detail_cache.get)(*key)
+        if data is not None:
+            return Response(data, headers={'X-Cache': 'HIT'})
+        
+        with use_primary():
+            generations = await sync_to_async(self.detail_generations)(key[0])
+            data = await self.aserialize(await self.aget_object())
+        await sync_to_async(ticket_detail_cache.set)(*key, data, generations)
+        
+        return Response(data, headers={'X-Cache': 'MISS'})
+    
+    def detail_cache_key(self):
+        """
+        Retorna (ticket_id, variante) del detalle en caché, o None si la
+        petición no se puede servir desde el caché.
+        """
+        ticket_id = str(self.kwargs.get('pk', ''))
+        if not ticket_id.isdigit() or self.get_sparse_params() != (None, None):
+            return None
+        return int(ticket_id), 'staff' if self.request.user.is_staff else 'public'
+    
+    def detail_generations(self, ticket_id):
+        """
+        Lee los tokens del caché para el detalle de ``ticket_id`` antes de
+        consultarlo (ver tickets/cache.py): el del ticket y luego los de
+        los usuarios que aparecen en él (creador, asignado y autores de
+        los últimos comentarios visibles).
+        """
+        def user_ids():
+            for ticket_model, comment_model in ((Ticket, Comment), (ArchivedTicket, ArchivedComment)):
+                users = ticket_model.objects.filter(pk=ticket_id).values_list(
+                    'created_by_id', 'assigned_to_id'
+                ).first()
+                if users is not None:
+                    break
+            else:
+                return []
+            authors = visible_comments(self.request.user, comment_model).filter(
+                ticket_id=ticket_id
+            ).order_by('-created_at', '-id').values_list(
+                'author_id', flat=True
+            )[:TicketDetailSerializer.LATEST_COMMENTS + 1]
+            return [user_id for user_id in [*users, *authors] if user_id is not None]
+        
+        return ticket_detail_cache.generations(ticket_id, user_ids)
+    
+    @action(detail=True, methods=['get'], pagination_class=CommentPagination)
+    def comments(self, request, pk=None):
+        """
+        Retorna los comentarios visibles de un ticket, paginados.
+        
+        GET /api/tickets/{id}/comments/
+        
+        El campo ``older_comments`` del detalle apunta a este endpoint con
+        el cursor del comentario más antiguo que ya incluye.
+        """
+        try:
+            ticket = get_object_or_404(Ticket.objects.only('pk'), pk=pk)
+        except Http404:
+            ticket = ArchivedTicket.objects.only('pk', 'closed_at').filter(pk=pk).first()
+            if ticket is None:
+                raise
+        self.check_object_permissions(request, ticket)
+        return self.list_response(self.ticket_comments(ticket))
+    
+    async def acomments(self, request, pk=None):
+        try:
+            ticket = await Ticket.objects.only('pk').aget(pk=pk)
+        except Ticket.DoesNotExist:
+            ticket = await ArchivedTicket.objects.only('pk', 'closed_at').filter(pk=pk).afirst()
+            if ticket is None:
+                raise Http404('No Ticket matches the given query.')
+        self.check_object_permissions(request, ticket)
+        return await self.alist_response(self.ticket_comments(ticket))
+    
+    def ticket_comments(self, ticket):
+        """Comentarios visibles de ``ticket``, del más antiguo al más reciente."""
+        if isinstance(ticket, ArchivedTicket):
+            # Con ticket_closed_at solo se lee la partición del ticket
+            queryset = visible_comments(self.request.user, ArchivedComment).filter(
+                ticket_id=ticket.pk,
+                ticket_closed_at=ticket.closed_at
+            )
+        else:
+            queryset = visible_comments(self.request.user).filter(ticket=ticket)
+        return self.sparse_queryset(queryset, relations=['author']).order_by('created_at', 'id')
+    
     @action(detail=False, methods=['get'], url_path='my-tickets')
     def my_tickets(self, request):
         """
@@ -135,13 +649,12 @@ class TicketViewSet(viewsets.ModelViewSet):
         # Aplicar filtros de búsqueda y ordenamiento
         tickets = self.filter_queryset(tickets)
         
-        page = self.paginate_queryset(tickets)
-        if page is not None:
-            serializer = TicketSerializer(page, many=True)
-            return self.get_paginated_response(serializer.data)
-        
-        serializer = TicketSerializer(tickets, many=True)
-        return Response(serializer.data)
+        return self.list_response(tickets, TicketSerializer)
+    
+    async def amy_tickets(self, request):
+        tickets = self.get_queryset().filter(created_by=request.user)
+        tickets = await sync_to_async(self.filter_queryset)(tickets)
+        return await self.alist_response(tickets, TicketSerializer)
     
     @action(detail=False, methods=['get'], url_path='assigned-to-me')
     def assigned_to_me(self, request):
@@ -155,12 +668,260 @@ class TicketViewSet(viewsets.ModelViewSet):
         # Aplicar filtros de búsqueda y ordenamiento
         tickets = self.filter_queryset(tickets)
         
-        page = self.paginate_queryset(tickets)
-        if page is not None:
-            serializer = TicketSerializer(page, many=True)
-            return self.get_paginated_response(serializer.data)
+        return self.list_response(tickets, TicketSerializer)
+    
+    async def aassigned_to_me(self, request):
+        tickets = self.get_queryset().filter(assigned_to=request.user)
+        tickets = await sync_to_async(self.filter_queryset)(tickets)
+        return await self.alist_response(tickets, TicketSerializer)
+    
+    @action(detail=False, methods=['post'], permission_classes=[IsAdminUser])
+    def bulk(self, request):
+        """
+        Aplica una operación a muchos tickets a la vez.
         
-        serializer = TicketSerializer(tickets, many=True)
+        POST /api/tickets/bulk/
+        {
+            "operation": "close" | "assign" | "reprioritize",
+            "ids": [1, 2, 3]               (o bien)
+            "filter": {"status": "abierto", "priority": "baja"},
+            "assigned_to_id": 5,           (para assign; null para quitar)
+            "priority": "alta"             (para reprioritize)
+        }
+        
+        Responde con los IDs modificados y los omitidos con su motivo:
+        {
+            "operation": "close",
+            "changed": [1, 2],
+            "skipped": [{"id": 3, "reason": "unchanged" | "not_found"}]
+        }
+        Solo disponible para staff.
+        """
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        data = serializer.validated_data
+        
+        queryset = Ticket.objects.all()
+        if 'ids' in data:
+            queryset = queryset.filter(pk__in=data['ids'])
+        else:
+            # Mismos filtros que el listado (filterset_fields)
+            filterset_class = DjangoFilterBackend().get_filterset_class(self, queryset)
+            filterset = filterset_class(data=data['filter'], queryset=queryset, request=request)
+            unknown = set(data['filter']) - set(filterset.filters)
+            if unknown:
+                return Response(
+                    {'filter': [f"Campos de filtro no válidos: {', '.join(sorted(unknown))}."]},
+                    status=status.HTTP_400_BAD_REQUEST
+                )
+            if not filterset.is_valid():
+                return Response({'filter': filterset.errors}, status=status.HTTP_400_BAD_REQUEST)
+            queryset = filterset.qs
+        
+        result = apply_bulk_operation(
+            queryset,
+            data['operation'],
+            requested_ids=data.get('ids'),
+            assigned_to_id=data.get('assigned_to_id'),
+            priority=data.get('priority')
+        )
+        return Response(result)
+    
+    @action(detail=False, methods=['post'], url_path='import', permission_classes=[IsAdminUser])
+    def import_data(self, request):
+        """
+        Importa tickets o comentarios desde un archivo CSV o NDJSON.
+        
+        POST /api/tickets/import/  (multipart)
+        - file: archivo a importar
+        - kind: 'tickets' (por defecto) o 'comments'
+        - format: 'csv' o 'ndjson' (por defecto se deduce de la extensión)
+        
+        Responde con el total de filas, las importadas y las rechazadas
+        (con su número de línea y errores, hasta 1000). Solo para staff.
+        """
+        upload = request.FILES.get('file')
+        if upload is None:
+            return Response(
+                {'file': ['Este campo es requerido.']},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        
+        kind = request.data.get('kind', 'tickets')
+        if kind not in IMPORTERS:
+            return Response(
+                {'kind': [f'"{kind}" no es una opción válida.']},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        
+        file_format = request.data.get('format')
+        if not file_format:
+            file_format = 'csv' if upload.name.lower().endswith('.csv') else 'ndjson'
+        if file_format not in FORMATS:
+            return Response(
+                {'format': [f'"{file_format}" no es una opción válida.']},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        
+        errors = []
+        
+        def on_reject(line, row_errors):
+            if len(errors) < 1000:
+                errors.append({'line': line, 'errors': row_errors})
+        
+        stream = io.TextIOWrapper(upload.file, encoding='utf-8', newline='')
+        result = IMPORTERS[kind](on_reject=on_reject).run(read_rows(stream, file_format))
+        
+        return Response({**result, 'errors': errors})
+    
+    # Columnas de la exportación: (encabezado, campo)
+    export_columns = [
+        ('id', 'id'),
+        ('title', 'title'),
+        ('description', 'description'),
+        ('status', 'status'),
+        ('priority', 'priority'),
+        ('created_by', 'created_by__username'),
+        ('assigned_to', 'assigned_to__username'),
+        ('created_at', 'created_at'),
+        ('updated_at', 'updated_at'),
+        ('closed_at', 'closed_at'),
+        ('comments_count', 'comments_count'),
+    ]
+    export_chunk_size = 2000
+    
+    @action(
+        detail=False,
+        methods=['get'],
+        renderer_classes=[CSVStreamRenderer, NDJSONStreamRenderer]
+    )
+    def export(self, request):
+        """
+        Exporta los tickets en CSV o NDJSON.
+        
+        GET /api/tickets/export/?format=csv
+        GET /api/tickets/export/?format=ndjson
+        
+        Acepta los mismos filtros, búsqueda y ordenamiento que el listado.
+        Las filas se leen con un cursor del lado del servidor y se envían
+        por bloques, así que la memoria no crece con el tamaño de la
+        exportación. Bajo ASGI el contenido es un iterador async (ver
+        ``_aiter_sync``).
+        """
+        comments_count = Comment.objects.filter(
+            ticket=OuterRef('pk')
+        ).order_by().values('ticket').annotate(count=Count('*')).values('count')
+        
+        # Con las anotaciones de SLA, como get_queryset: el ordenamiento
+        # acepta ``age`` y ``sla_due_at``
+        queryset = self.filter_queryset(
+            sla.annotate(Ticket.objects.annotate(
+                comments_count=Coalesce(Subquery(comments_count), 0)
+            ))
+        )
+        # La base se elige ahora: al enviar el contenido la petición ya
+        # salió de ReplicaMiddleware
+        queryset = queryset.using(queryset.db)
+        
+        renderer = request.accepted_renderer
+        content = _export_stream(
+            renderer,
+            [name for name, _ in self.export_columns],
+            queryset.values_list(*[field for _, field in self.export_columns]),
+            self.export_chunk_size
+        )
+        if isinstance(request._request, ASGIRequest):
+            content = _aiter_sync(content)
+        response = StreamingHttpResponse(
+            content,
+            content_type=f'{renderer.media_type}; charset={renderer.charset}'
+        )
+        response['Content-Disposition'] = f'attachment; filename="tickets.{renderer.format}"'
+        return response
+    
+    @action(detail=False, methods=['get'])
+    @use_primary()
+    def changes(self, request):
+        """
+        Feed de cambios para sincronización por delta.
+        
+        GET /api/tickets/changes/ - Solo retorna el watermark actual
+        GET /api/tickets/changes/?since=<watermark>
+        
+        Retorna los tickets y comentarios creados o editados desde
+        ``since``, los IDs eliminados y el nuevo watermark. El cliente
+        obtiene el watermark inicial antes de cargar los listados y luego
+        aplica primero los cambios y después las eliminaciones. Si
+        ``has_more`` es true, debe volver a consultar de inmediato con el
+        nuevo watermark. Un watermark expirado responde 410 y el cliente
+        debe recargar los listados completos.
+        
+        Siempre lee de la base principal: el watermark depende de las
+        transacciones en curso en ella y una réplica atrasada omitiría
+        cambios.
+        """
+        since = request.query_params.get('since')
+        if not since:
+            return Response({
+                'tickets': [],
+                'comments': [],
+                'deleted': {'tickets': [], 'comments': []},
+                'watermark': current_watermark(),
+                'has_more': False,
+            })
+        
+        try:
+            changes = changes_since(since, request.user)
+        except InvalidWatermark as exc:
+            return Response({'error': str(exc)}, status=status.HTTP_400_BAD_REQUEST)
+        except ExpiredWatermark as exc:
+            return Response({'error': str(exc)}, status=status.HTTP_410_GONE)
+        
+        context = self.get_serializer_context()
+        changes['tickets'] = TicketSerializer(changes['tickets'], many=True, context=context).data
+        changes['comments'] = CommentSerializer(changes['comments'], many=True, context=context).data
+        return Response(changes)
+    
+    @action(detail=False, methods=['get'])
+    def stats(self, request):
+        """
+        Retorna los contadores de tickets para el dashboard.
+        
+        GET /api/tickets/stats/
+        
+        Se leen de la tabla resumen TicketCounter, por lo que el costo
+        no depende del número de tickets.
+        """
+        return Response(TicketCounter.summary(request.user))
+    
+    @action(detail=False, methods=['post'], url_path='next')
+    def claim_next(self, request):
+        """
+        Asigna al usuario actual el siguiente ticket de la cola: el abierto
+        sin asignar de mayor prioridad y más antiguo.
+        
+        POST /api/tickets/next/
+        
+        Nota: Solo personal de soporte. Varios agentes pueden pedir a la
+        vez sin recibir el mismo ticket (ver Ticket.claim_next()). Si la
+        cola está vacía responde 204.
+        """
+        try:
+            is_support_staff = request.user.profile.is_support_staff
+        except UserProfile.DoesNotExist:
+            is_support_staff = False
+        
+        if not is_support_staff:
+            return Response(
+                {'error': 'Solo el personal de soporte puede tomar tickets de la cola.'},
+                status=status.HTTP_403_FORBIDDEN
+            )
+        
+        ticket = Ticket.claim_next(request.user)
+        if ticket is None:
+            return Response(status=status.HTTP_204_NO_CONTENT)
+        
+        serializer = self.get_serializer(ticket)
         return Response(serializer.data)
     
     @action(detail=True, methods=['post'])
@@ -215,7 +976,7 @@ class TicketViewSet(viewsets.ModelViewSet):
         return Response(serializer.data)
 
 
-class CommentViewSet(viewsets.ModelViewSet):
+class CommentViewSet(ArchiveLookupMixin, SparseFieldsViewMixin, viewsets.ModelViewSet):
     """
     ViewSet completo para comentarios.
     
@@ -226,26 +987,45 @@ class CommentViewSet(viewsets.ModelViewSet):
     - PUT /api/comments/{id}/ - Actualizar comentario completo
     - PATCH /api/comments/{id}/ - Actualizar comentario parcial
     - DELETE /api/comments/{id}/ - Eliminar comentario (solo el autor o admin)
+    
+    Búsqueda:
+    - ?search=cable de red - Texto completo, ordenado por relevancia
+    
+    Paginación:
+    - ?pagination=cursor - Paginación por cursor (created_at, id)
+    - ?count=estimated - Total estimado en lugar de COUNT(*)
+    
+    Campos:
+    - ?fields=id,content,author&expand=author - Solo los campos indicados
+    
+    Archivo:
+    - ?archived=true - Lista los comentarios de los tickets archivados
     """
     serializer_class = CommentSerializer
     permission_classes = [IsAuthenticated]
-    filter_backends = [DjangoFilterBackend, filters.SearchFilter, filters.OrderingFilter]
+    pagination_class = CommentPagination
+    filter_backends = [DjangoFilterBackend, filters.OrderingFilter, FullTextSearchFilter]
     filterset_fields = ['ticket', 'author', 'is_internal']
-    search_fields = ['content']
+    search_headline_field = 'content'
     ordering_fields = ['created_at']
     ordering = ['created_at']
+    sparse_always = ['created_at']
+    archived_model = ArchivedComment
     
-    def get_queryset(self):
+    def get_queryset(self, archived=None):
         """
         Optimiza las consultas y filtra comentarios internos según permisos.
         """
-        queryset = Comment.objects.select_related('ticket', 'author').all()
-        
-        # Si no es staff, no mostrar comentarios internos de otros
-        if not self.request.user.is_staff:
-            queryset = queryset.filter(is_internal=False)
-        
-        return queryset
+        if archived is None:
+            archived = self.wants_archived()
+        return self.sparse_queryset(
+            visible_comments(self.request.user, ArchivedComment if archived else Comment),
+            relations=['author']
+        )
+    
+    def create(self, request, *args, **kwargs):
+        restore_archived_ticket(request.data.get('ticket'))
+        return super().create(request, *args, **kwargs)
     
     def perform_create(self, serializer):
         """
@@ -263,3 +1043,279 @@ class CommentViewSet(viewsets.ModelViewSet):
                 status=status.HTTP_403_FORBIDDEN
             )
         instance.delete()
+
+
+class UploadSessionViewSet(mixins.CreateModelMixin,
+                           mixins.RetrieveModelMixin,
+                           mixins.DestroyModelMixin,
+                           viewsets.GenericViewSet):
+    """
+    ViewSet para subir adjuntos por partes (reanudable).
+    
+    Endpoints:
+    - POST /api/uploads/ - Iniciar una subida ({filename, size})
+    - PUT /api/uploads/{id}/ - Enviar una parte (Content-Range: bytes 0-1048575/5242880)
+    - GET /api/uploads/{id}/ - Estado de la subida (``received``: desde dónde continuar)
+    - POST /api/uploads/{id}/complete/ - Crear el comentario con el archivo ({ticket, content, is_internal})
+    - DELETE /api/uploads/{id}/ - Cancelar la subida
+    
+    Cada parte se escribe directo al archivo temporal por bloques, sin
+    cargar el cuerpo de la petición en memoria, y nunca puede superar el
+    tamaño declarado al iniciar.
+    """
+    serializer_class = UploadSessionSerializer
+    permission_classes = [IsAuthenticated]
+    
+    content_range_pattern = re.compile(r'^bytes (\d+)-(\d+)/(\d+)$')
+    
+    def get_queryset(self):
+        """Solo las sesiones vigentes del usuario actual."""
+        return UploadSession.active().filter(user=self.request.user)
+    
+    def perform_create(self, serializer):
+        serializer.save(user=self.request.user)
+    
+    def update(self, request, *args, **kwargs):
+        """
+        Recibe una parte del archivo.
+        
+        PUT /api/uploads/{id}/
+        Content-Range: bytes <inicio>-<fin>/<tamaño total>
+        
+        La parte puede repetir bytes ya recibidos, pero no dejar huecos:
+        si ``inicio`` es mayor que ``received`` responde 409 con el byte
+        desde donde continuar.
+        """
+        session = self.get_object()
+        
+        match = self.content_range_pattern.match(request.headers.get('Content-Range', ''))
+        if match is None:
+            return Response(
+                {'error': 'Indica la parte con el header Content-Range: bytes inicio-fin/total.'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        start, end, total = (int(value) for value in match.groups())
+        
+        if total != session.size or start > end or end >= total:
+            return Response(
+                {'error': f'Rango inválido para un archivo de {session.size} bytes.'},
+                status=status.HTTP_416_REQUESTED_RANGE_NOT_SATISFIABLE
+            )
+        if start > session.received:
+            return Response(
+                {'error': 'La parte deja un hueco.', 'received': session.received},
+                status=status.HTTP_409_CONFLICT
+            )
+        
+        length = end - start + 1
+        content_length = request.META.get('CONTENT_LENGTH')
+        if not content_length or int(content_length) != length:
+            return Response(
+                {'error': 'Content-Length no coincide con Content-Range.'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        
+        written = session.write(start, request.stream, length)
+        session.advance(start, start + written)
+        return Response(self.get_serializer(session).data)
+    
+    @action(detail=True, methods=['post'])
+    def complete(self, request, pk=None):
+        """
+        Crea el comentario con el archivo ya recibido completo.
+        
+        POST /api/uploads/{id}/complete/
+        {"ticket": 1, "content": "Log del servidor", "is_internal": false}
+        """
+        session = self.get_object()
+        if not session.is_complete:
+            return Response(
+                {'error': 'Faltan partes del archivo.', 'received': session.received},
+                status=status.HTTP_409_CONFLICT
+            )
+        
+        restore_archived_ticket(request.data.get('ticket'))
+        serializer = CommentSerializer(data=request.data, context=self.get_serializer_context())
+        serializer.is_valid(raise_exception=True)
+        
+        with transaction.atomic():
+            # Evita que dos peticiones completen la misma sesión
+            session = UploadSession.objects.select_for_update().filter(pk=session.pk).first()
+            if session is None:
+                return Response(
+                    {'error': 'La subida ya se completó.'},
+                    status=status.HTTP_404_NOT_FOUND
+                )
+            try:
+                name = session.storage.save_file(session.temp_path, session.filename)
+            except FileNotFoundError:
+                # Se perdió el temporal: el cliente debe reenviar el archivo
+                session.reset()
+                return Response(
+                    {
+                        'error': 'El archivo recibido ya no está disponible; envíalo de nuevo desde el inicio.',
+                        'received': session.received,
+                    },
+                    status=status.HTTP_409_CONFLICT
+                )
+            comment = serializer.save(author=request.user, attachment=name)
+            # El temporal se elimina al confirmar (ver delete_upload_file)
+            session.delete()
+        
+        return Response(
+            CommentSerializer(comment, context=self.get_serializer_context()).data,
+            status=status.HTTP_201_CREATED
+        )
+
+
+# Eventos en vivo (Server-Sent Events)
+# Son vistas async de Django, no de DRF: cada conexión abierta espera en
+# el event loop sin ocupar un hilo. Requieren el servidor ASGI
+# (config.asgi); con runserver/WSGI responden 501.
+
+SSE_HEARTBEAT = 15
+SSE_MAX_AGE = 600
+SSE_RETRY_MS = 3000
+
+
+def _stream_user(request):
+    """
+    Autentica una conexión de eventos.
+    
+    Acepta el JWT en el header Authorization o en ``?token=`` (EventSource
+    no permite headers), o la sesión de Django. Retorna None si no hay un
+    usuario válido.
+    """
+    authenticator = CachedJWTAuthentication()
+    token = request.GET.get('token')
+    try:
+        if token:
+            return authenticator.get_user(authenticator.get_validated_token(token))
+        result = authenticator.authenticate(request)
+    except (InvalidToken, AuthenticationFailed):
+        return None
+    
+    if result is not None:
+        return result[0]
+    return request.user if request.user.is_authenticated else None
+
+
+async def _event_stream(subscription):
+    """Genera los mensajes SSE de una suscripción hasta SSE_MAX_AGE."""
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + SSE_MAX_AGE
+    try:
+        yield f'retry: {SSE_RETRY_MS}\n\n'
+        while True:
+            timeout = min(SSE_HEARTBEAT, deadline - loop.time())
+            if timeout <= 0:
+                break
+            try:
+                event = await subscription.get(timeout)
+            except asyncio.TimeoutError:
+                yield ': ping\n\n'
+                continue
+            if event is None:
+                break
+            yield format_event(event)
+    finally:
+        broker.unsubscribe(subscription)
+
+
+def _export_stream(renderer, header, queryset, chunk_size):
+    """
+    Genera el archivo de ``queryset`` por bloques con un cursor del lado
+    del servidor.
+
+    El cursor se abre dentro de una transacción: fuera de ella Django lo
+    declara WITH HOLD y PostgreSQL materializa todo el resultado antes de
+    entregar la primera fila.
+    """
+    with transaction.atomic(using=queryset.db):
+        yield from renderer.stream(header, queryset.iterator(chunk_size=chunk_size))
+
+
+async def _aiter_sync(iterator):
+    """
+    Recorre un generador síncrono desde un iterador async.
+
+    Bajo ASGI, StreamingHttpResponse convierte un iterador síncrono en una
+    lista antes de enviar el primer byte. Aquí cada bloque se pide con
+    sync_to_async, que corre siempre en el hilo de la petición: el cursor
+    y su transacción usan la misma conexión de principio a fin.
+    """
+    done = object()
+    try:
+        while True:
+            chunk = await sync_to_async(next)(iterator, done)
+            if chunk is done:
+                break
+            yield chunk
+    finally:
+        await sync_to_async(iterator.close)()
+
+
+async def _events_response(request, match):
+    if not isinstance(request, ASGIRequest):
+        return JsonResponse(
+            {'error': 'Los eventos en vivo requieren el servidor ASGI (config.asgi).'},
+            status=status.HTTP_501_NOT_IMPLEMENTED
+        )
+    
+    subscription = await broker.subscribe(match)
+    response = StreamingHttpResponse(_event_stream(subscription), content_type='text/event-stream')
+    response['Cache-Control'] = 'no-cache'
+    response['X-Accel-Buffering'] = 'no'
+    return response
+
+
+async def ticket_events(request, pk):
+    """
+    Eventos en vivo de un ticket.
+    
+    GET /api/events/tickets/{id}/
+    
+    Eventos: status, assignment, comment y escalation. Cada evento trae
+    los IDs involucrados; los datos completos se piden a la API REST. Los
+    comentarios internos y los escalamientos solo se notifican a staff.
+    """
+    user = await sync_to_async(_stream_user)(request)
+    if user is None:
+        return JsonResponse(
+            {'detail': 'Las credenciales de autenticación no se proveyeron.'},
+            status=status.HTTP_401_UNAUTHORIZED
+        )
+    if not await Ticket.objects.filter(pk=pk).aexists():
+        return JsonResponse({'detail': 'No encontrado.'}, status=status.HTTP_404_NOT_FOUND)
+    
+    def match(event):
+        if event['ticket'] != pk:
+            return False
+        return user.is_staff or not event.get('is_internal')
+    
+    return await _events_response(request, match)
+
+
+async def queue_events(request):
+    """
+    Eventos en vivo de los tickets asignados al usuario actual.
+    
+    GET /api/events/my-queue/
+    
+    Incluye los tickets que se le asignan o se le quitan (evento
+    assignment), sus cambios de estado, sus comentarios nuevos y sus
+    escalamientos.
+    """
+    user = await sync_to_async(_stream_user)(request)
+    if user is None:
+        return JsonResponse(
+            {'detail': 'Las credenciales de autenticación no se proveyeron.'},
+            status=status.HTTP_401_UNAUTHORIZED
+        )
+    
+    def match(event):
+        if user.pk not in (event.get('assigned_to'), event.get('previous_assigned_to')):
+            return False
+        return user.is_staff or not event.get('is_internal')
+    
+    return await _events_response(request, match)